@@ -0,0 +1,73 @@
+"""
+Batch article throughput of GeminiScraper.generate_articles against a stub model.
+
+The stub answers every call after a fixed delay, so the numbers show how well
+the batch overlaps calls, not Gemini's speed. No API key or network is needed.
+
+    python benchmarks/bench_batch.py [topics] [delay_ms]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini import GeminiScraper  # noqa: E402
+from keypool import ApiKeyPool  # noqa: E402
+
+CONCURRENCY = (1, 2, 5, 10, 20)
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Answers generate_content(_async) after ``delay`` seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return StubResponse("Judul artikel\n\n" + "kalimat " * 200)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return StubResponse("Judul artikel\n\n" + "kalimat " * 200)
+
+
+def stub_scraper(delay):
+    """GeminiScraper whose single key is served by a :class:`StubModel` without RPM limits."""
+    scraper = GeminiScraper(api_key="stub-key")
+    scraper.key_pool = ApiKeyPool(["stub-key"], requests_per_minute=1_000_000)
+    scraper.models = {"stub-key": StubModel(delay)}
+    scraper.model = scraper.models["stub-key"]
+    return scraper
+
+
+def main(topic_count, delay):
+    logging.basicConfig(level=logging.WARNING)
+    topics = [f"topik nomor {i}" for i in range(topic_count)]
+    print(f"{topic_count} topics, {delay * 1000:.0f} ms per call")
+    for concurrency in CONCURRENCY:
+        scraper = stub_scraper(delay)
+        start = time.perf_counter()
+        results = scraper.generate_articles(topics, language="id", concurrency=concurrency, use_cache=False)
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for result in results if result.ok)
+        calls = scraper.models["stub-key"].calls
+        print(f"  N={concurrency:<3d} {elapsed:6.2f}s  {ok / elapsed:6.1f} art/s  "
+              f"{ok}/{len(results)} ok, {calls} calls")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 40, (float(args[1]) if len(args) > 1 else 50) / 1000)
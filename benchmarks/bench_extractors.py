@@ -0,0 +1,57 @@
+"""
+Compare the Bing result extractors (bing_parser.py) on saved result pages.
+
+Every extractor must return the expected ``murl`` list of each fixture
+(tests/fixtures/bing_*.html with its .json); the time per page is reported.
+
+    python benchmarks/bench_extractors.py [repeat]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bing_parser import EXTRACTORS  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+
+def load_fixtures():
+    """(name, page HTML, expected URLs) for every saved result page."""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "bing_*.html"))):
+        with open(path, encoding="utf-8") as f:
+            page = f.read()
+        with open(path[:-len(".html")] + ".json", encoding="utf-8") as f:
+            expected = json.load(f)
+        fixtures.append((os.path.basename(path), page, expected))
+    return fixtures
+
+
+def main(repeat):
+    ok = True
+    for name, page, expected in load_fixtures():
+        print(f"{name} ({len(page) // 1024} KB, {len(expected)} results)")
+        for extractor, fn in EXTRACTORS.items():
+            try:
+                urls = fn(page)
+            except ImportError:
+                print(f"  {extractor:6s} not installed")
+                continue
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn(page)
+            elapsed = (time.perf_counter() - start) / repeat * 1000
+            match = urls == expected
+            ok = ok and match
+            print(f"  {extractor:6s} {elapsed:8.2f} ms  {len(urls):3d} urls  {'ok' if match else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,62 @@
+"""
+Cold and warm language detection cost (language.py).
+
+Run in a fresh process: the first detection loads langdetect's profiles,
+cold calls run the detector once per distinct topic, and warm calls repeat
+topics that are already memoized.
+
+    python benchmarks/bench_language.py [topics]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = {
+    "id": "cara membuat kopi yang enak di rumah untuk pemula dengan alat sederhana".split(),
+    "en": "how to brew great coffee at home for beginners with simple tools".split(),
+    "de": "wie man zu hause guten kaffee mit einfachen werkzeugen zubereitet".split(),
+}
+
+
+def make_topics(count):
+    rng = random.Random(0)
+    topics = []
+    for i in range(count):
+        words = WORDS[("id", "en", "de")[i % 3]]
+        topics.append(" ".join(rng.sample(words, 6)) + f" {i}")
+    return topics
+
+
+def main(count):
+    start = time.perf_counter()
+    import language
+    imported = time.perf_counter() - start
+
+    topics = make_topics(count + 1)
+    start = time.perf_counter()
+    language.detect_language(topics[0])
+    first = time.perf_counter() - start
+
+    topics = topics[1:]
+    start = time.perf_counter()
+    language.detect_languages(topics)
+    cold = (time.perf_counter() - start) / count
+
+    start = time.perf_counter()
+    for _ in range(10):
+        language.detect_languages(topics)
+    warm = (time.perf_counter() - start) / (10 * count)
+
+    print(f"{count} topics")
+    print(f"  module import     {imported * 1000:8.1f} ms")
+    print(f"  first detect      {first * 1000:8.1f} ms  (profile load)")
+    print(f"  cold, per topic   {cold * 1000:8.2f} ms")
+    print(f"  warm, per topic   {warm * 1e6:8.2f} us  (memoized)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
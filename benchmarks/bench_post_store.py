@@ -0,0 +1,93 @@
+"""
+PostStore query latency from 100 to 100k posts.
+
+Compares the first page, a page halfway through by keyset cursor (what the
+dashboard does) and by OFFSET (what it used to do), a filtered page and a
+lookup by id.
+
+    python benchmarks/bench_post_store.py [sizes...]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from post_store import PostStore  # noqa: E402
+
+SIZES = (100, 1_000, 10_000, 100_000)
+PAGE_SIZE = 20
+
+
+def timed(fn, repeat=200):
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def make_posts(count):
+    rng = random.Random(count)
+    return [
+        {
+            "id": f"post-{i}",
+            "title": f"Post {i}",
+            "author": f"author-{i % 50}",
+            "date": f"20{10 + i % 16}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "excerpt": "e" * 150,
+            "content": "c" * 4000,
+            "keyword": f"keyword-{i % 500}",
+            "language": rng.choice(("id", "en")),
+            "tags": ["tag"],
+        }
+        for i in range(count)
+    ]
+
+
+def cursor_at(store, index):
+    """Cursor of the page starting at ``index``, found once outside the timing."""
+    return store.page(None, index)[1] if index else None
+
+
+def offset_page(store, offset):
+    """The pre-keyset query, for comparison."""
+    rows = store._conn.execute(
+        "SELECT seq, id, title, author, date, excerpt, generated_by, keyword, language, extra"
+        " FROM posts ORDER BY date DESC, seq DESC LIMIT ? OFFSET ?", (PAGE_SIZE, offset)
+    ).fetchall()
+    return [store._post(row) for row in rows]
+
+
+def main(sizes):
+    print(f"{'posts':>7} | {'insert':>7} | {'page 1':>8} | {'mid keyset':>10} | "
+          f"{'mid offset':>10} | {'filtered':>8} | {'get':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in sizes:
+            store = PostStore(os.path.join(directory, f"posts-{count}.sqlite3"))
+            posts = make_posts(count)
+            start = time.perf_counter()
+            store.save_many(posts)
+            insert = time.perf_counter() - start
+
+            middle = count // 2
+            cursor = cursor_at(store, middle)
+            ids = iter([f"post-{random.randrange(count)}" for _ in range(200)])
+            results = (
+                timed(lambda: store.page(None, PAGE_SIZE)),
+                timed(lambda: store.page(cursor, PAGE_SIZE), 50),
+                timed(lambda: offset_page(store, middle), 50),
+                timed(lambda: store.page(None, PAGE_SIZE, author="author-7", language="id")),
+                timed(lambda: store.get(next(ids))),
+            )
+            print(f"{count:>7} | {insert:6.2f}s | " + " | ".join(
+                f"{value:{width}.0f}us" for value, width in zip(results, (6, 8, 8, 6, 4))
+            ))
+            store.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
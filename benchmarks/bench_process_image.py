@@ -0,0 +1,93 @@
+"""
+Time and peak memory of imaging.process_image on generated 4K inputs.
+
+Each case runs in a fresh process so its peak RSS isn't hidden by an
+earlier one. "full decode" is the previous path (decode at full size, then
+thumbnail) for comparison.
+
+    python benchmarks/bench_process_image.py [repeat]
+"""
+
+import io
+import os
+import sys
+import time
+import resource
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from imaging import MAX_IMAGE_SIZE, JPEG_QUALITY, process_image  # noqa: E402
+
+SIZE_4K = (3840, 2160)
+
+
+def make_image(fmt):
+    """A 4K photo-like image (gradients plus noise), encoded as ``fmt``."""
+    gradient = Image.linear_gradient("L").resize(SIZE_4K)
+    noise = Image.effect_noise(SIZE_4K, 40)
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    out = io.BytesIO()
+    img.save(out, fmt, **({"quality": 90} if fmt == "JPEG" else {}))
+    return out.getvalue()
+
+
+def full_decode(data, max_size=MAX_IMAGE_SIZE, quality=JPEG_QUALITY):
+    """Decode at full resolution, then downscale."""
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=quality)
+        return out.getvalue(), img.size, True
+
+
+def max_rss_mb():
+    """Peak RSS of this process so far."""
+    try:
+        # VmHWM starts afresh at exec; Linux carries ru_maxrss over from the parent
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(name, path, repeat):
+    fn = process_image if name == "process_image" else full_decode
+    with open(path, "rb") as f:
+        data = f.read()
+    before = max_rss_mb()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _, size, _ = fn(data)
+    elapsed = (time.perf_counter() - start) / repeat
+    return size, elapsed, max_rss_mb() - before
+
+
+def main(repeat):
+    context = multiprocessing.get_context("spawn")
+    print(f"{SIZE_4K[0]}x{SIZE_4K[1]} inputs, {repeat} runs each")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in ("JPEG", "PNG"):
+            # Generated here and read from disk, so building the input doesn't
+            # count towards the worker's peak
+            path = os.path.join(directory, f"input.{fmt.lower()}")
+            with open(path, "wb") as f:
+                f.write(make_image(fmt))
+            for name in ("process_image", "full decode"):
+                with context.Pool(1) as pool:
+                    size, elapsed, rss = pool.apply(run_case, (name, path, repeat))
+                print(f"  {fmt:4s} {os.path.getsize(path) / 1024:7.0f} KB  {name:13s} {elapsed * 1000:7.1f} ms  "
+                      f"peak RSS +{rss:6.1f} MB  -> {size[0]}x{size[1]}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
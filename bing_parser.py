@@ -0,0 +1,95 @@
+"""
+Extractors for image URLs on Bing image result pages.
+Each extractor takes the page HTML and returns the ``murl`` of every
+``a.iusc`` result anchor, in page order.
+"""
+
+import re
+import json
+import html
+import logging
+
+logger = logging.getLogger(__name__)
+
+# An <a> tag whose class list contains "iusc", and its m attribute; either quote style
+_IUSC_TAG = re.compile(
+    r"""<a\b[^>]*?\bclass=(?:"(?:[^"]*\s)?iusc(?:\s[^"]*)?"|'(?:[^']*\s)?iusc(?:\s[^']*)?')[^>]*>""",
+    re.IGNORECASE,
+)
+_M_ATTR = re.compile(r"""\sm=(?:"([^"]*)"|'([^']*)')""")
+
+
+def _murl(m_attr):
+    """Pull ``murl`` out of an anchor's (already unescaped) ``m`` JSON."""
+    try:
+        return json.loads(m_attr).get("murl")
+    except (ValueError, AttributeError):
+        return None
+
+
+def extract_with_regex(page):
+    """Targeted scanner: only looks at iusc anchor tags, never builds a tree."""
+    urls = []
+    for tag in _IUSC_TAG.finditer(page):
+        match = _M_ATTR.search(tag.group(0))
+        if match:
+            murl = _murl(html.unescape(match.group(1) if match.group(1) is not None else match.group(2)))
+            if murl:
+                urls.append(murl)
+    return urls
+
+
+def extract_with_bs4(page):
+    """Full BeautifulSoup parse with the stdlib html.parser."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, "html.parser")
+    urls = []
+    for element in soup.find_all("a", {"class": "iusc"}):
+        m_attr = element.get("m")
+        murl = _murl(m_attr) if m_attr else None
+        if murl:
+            urls.append(murl)
+    return urls
+
+
+def extract_with_lxml(page):
+    """lxml parse with an XPath over iusc anchors (optional dependency)."""
+    import lxml.html
+
+    tree = lxml.html.fromstring(page)
+    urls = []
+    for m_attr in tree.xpath("//a[contains(concat(' ', normalize-space(@class), ' '), ' iusc ')]/@m"):
+        murl = _murl(m_attr)
+        if murl:
+            urls.append(murl)
+    return urls
+
+
+EXTRACTORS = {
+    "regex": extract_with_regex,
+    "bs4": extract_with_bs4,
+    "lxml": extract_with_lxml,
+}
+
+
+def get_extractor(name):
+    """
+    Look up an extractor by name, falling back to the regex scanner.
+
+    Args:
+        name (str): "regex", "bs4" or "lxml"
+
+    Returns:
+        callable: Function taking page HTML and returning image URLs
+    """
+    if name == "lxml":
+        try:
+            import lxml.html  # noqa: F401
+        except ImportError:
+            logger.warning("lxml is not installed, using the regex extractor instead")
+            return extract_with_regex
+    if name not in EXTRACTORS:
+        logger.warning(f"Unknown extractor {name!r}, using the regex extractor instead")
+        return extract_with_regex
+    return EXTRACTORS[name]
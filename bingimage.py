@@ -6,27 +6,88 @@ This module handles searching and downloading images from Bing without using Sel
 import os
 import requests
 import time
-import random
-import json
+import threading
+import multiprocessing
 import urllib.parse
-from urllib.parse import urljoin, urlparse
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from PIL import Image
 import logging
-from utils import clean_filename, is_valid_image_url
+from utils import is_valid_image_url
 from config import Config
+from bing_parser import get_extractor
+from cache import DiskCache, make_key
+from ratelimit import HostRateLimiter
+from imaging import (ImageCandidate, ImageProbe, atomic_write, hamming_distance, perceptual_hash,
+                     process_image, suitability, write_variants)
+from image_store import ImageStore
+
+_host_limiter = None
+_host_limiter_lock = threading.Lock()
+
+
+def get_host_limiter():
+    """Per-host rate limiter shared by every scraper in the process."""
+    global _host_limiter
+    with _host_limiter_lock:
+        if _host_limiter is None:
+            config = Config()
+            _host_limiter = HostRateLimiter(
+                rate=config.IMAGE_HOST_RATE,
+                burst=config.IMAGE_HOST_BURST,
+                max_concurrency=config.IMAGE_MAX_CONNECTIONS,
+                host_rates=config.IMAGE_HOST_RATES,
+            )
+        return _host_limiter
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Process pool for CPU-heavy image work, shared by every scraper in the
+    process and sized by ``Config.IMAGE_PROCESS_WORKERS`` (0 = one per CPU).
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # Spawned, not forked: the dashboard process is multithreaded and holds
+            # gRPC channels, which a forked child can inherit mid-use and deadlock on
+            _process_pool = ProcessPoolExecutor(
+                max_workers=Config().IMAGE_PROCESS_WORKERS or None,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
 
 class BingImageScraper:
     """Scraper for Bing image search using requests and BeautifulSoup."""
     
-    def __init__(self):
+    def __init__(self, extractor=None, rate_limiter=None):
         self.logger = logging.getLogger(__name__)
         self.config = Config()
+        self.rate_limiter = rate_limiter or get_host_limiter()
+        self.extract_image_urls = get_extractor(extractor or self.config.IMAGE_EXTRACTOR)
         self.session = requests.Session()
         self._setup_session()
+        self.search_cache = self._open_search_cache()
+        self._image_store_lock = threading.Lock()
+        self._image_store = None
     
     def _setup_session(self):
-        """Setup requests session with appropriate headers."""
+        """Setup requests session with appropriate headers and connection pools."""
+        # Size per-host pools so concurrent downloads don't open throwaway sockets
+        adapter = HTTPAdapter(
+            pool_connections=self.config.IMAGE_POOL_HOSTS,
+            pool_maxsize=max(self.config.IMAGE_DOWNLOAD_CONCURRENCY, self.config.IMAGE_PROBE_CONCURRENCY, 1),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -36,158 +97,593 @@ class BingImageScraper:
             'Upgrade-Insecure-Requests': '1'
         })
     
+    def _open_search_cache(self):
+        """Open the on-disk search result cache, or run without one if that fails."""
+        try:
+            return DiskCache(
+                self.config.IMAGE_SEARCH_CACHE_PATH,
+                max_bytes=self.config.IMAGE_SEARCH_CACHE_MAX_MB * 1024 * 1024,
+                max_age=self.config.IMAGE_SEARCH_CACHE_MAX_AGE,
+            )
+        except Exception as e:
+            self.logger.warning(f"Image search cache disabled: {str(e)}")
+            return None
+    
+    @contextmanager
+    def _get(self, url, timeout, **kwargs):
+        """
+        GET through the shared per-host rate limiter.
+        
+        The host token and connection slot are held until the block exits, so
+        streamed bodies count against the concurrency cap while being read.
+        
+        Raises:
+            ratelimit.RateLimitTimeout: If the host is backed off for longer than ``timeout``
+        """
+        with self.rate_limiter.slot(url, max_wait=timeout):
+            response = self.session.get(url, timeout=timeout, **kwargs)
+            try:
+                self.rate_limiter.record(url, response.status_code, response.headers.get('retry-after'))
+                yield response
+            finally:
+                response.close()
+    
     def get_soup(self, url):
         """Get BeautifulSoup object from URL."""
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, "html.parser")
+            with self._get(url, timeout=30) as response:
+                response.raise_for_status()
+                return BeautifulSoup(response.content, "html.parser")
         except Exception as e:
             self.logger.error(f"Error getting soup from {url}: {str(e)}")
             return None
     
-    def search_images(self, query, max_images=10):
+    def search_images(self, query, max_images=10, use_cache=True):
         """
         Search for images on Bing.
         
+        Enough result pages are fetched in parallel to satisfy large
+        ``max_images`` requests, with duplicates removed by ``murl``.
+        Results are cached on disk per normalized query and count. Entries
+        younger than ``Config.IMAGE_SEARCH_CACHE_TTL`` are served without
+        contacting Bing; older ones are refreshed, but still served if Bing
+        is slow, rate-limits or returns nothing.
+        
         Args:
             query (str): Search query
             max_images (int): Maximum number of images to find
+            use_cache (bool): Read and write the search result cache
             
         Returns:
             list: List of image URLs
         """
+        cache = self.search_cache if use_cache else None
+        key = make_key("bing", " ".join(query.lower().split()), max_images)
+        entry = self._cache_get(cache, key)
+        if entry is not None and entry[1] <= self.config.IMAGE_SEARCH_CACHE_TTL:
+            self.logger.info(f"Image search cache hit: {query}")
+            return entry[0]
+        
+        # With a stale result to fall back on, don't wait long for Bing
+        timeout = self.config.IMAGE_SEARCH_STALE_TIMEOUT if entry else self.config.IMAGE_SEARCH_TIMEOUT
         try:
-            # Format query for URL
-            query_encoded = '+'.join(query.split())
-            search_url = f"https://www.bing.com/images/search?q={query_encoded}&form=HDRSC2&first=1&tsc=ImageBasicHover"
-            
-            self.logger.info(f"Searching for images: {query}")
-            
-            # Get the search page
-            soup = self.get_soup(search_url)
-            if not soup:
-                return []
-            
-            # Find image elements with JSON data
-            image_elements = soup.find_all("a", {"class": "iusc"})
+            image_urls = self._fetch_search(query, max_images, timeout)
+        except Exception as e:
+            image_urls = None
+            self.logger.error(f"Error searching images: {str(e)}")
+        
+        if image_urls:
+            self._cache_set(cache, key, image_urls)
+            return image_urls
+        if entry is not None:
+            self.logger.warning(f"Serving stale image search result ({entry[1] / 3600:.1f}h old): {query}")
+            return entry[0]
+        return image_urls or []
+    
+    def _cache_get(self, cache, key):
+        """Cached (value, age) for a key, up to the cache's retention age."""
+        if cache is None:
+            return None
+        try:
+            return cache.get_entry(key)
+        except Exception as e:
+            self.logger.warning(f"Image search cache read failed: {str(e)}")
+            return None
+    
+    def _cache_set(self, cache, key, value):
+        if cache is None:
+            return
+        try:
+            cache.set(key, value)
+        except Exception as e:
+            self.logger.warning(f"Image search cache write failed: {str(e)}")
+    
+    def _fetch_search(self, query, max_images, timeout):
+        """
+        Query Bing for image URLs, reading as many result pages as needed.
+        
+        Raises:
+            requests.RequestException: On timeouts and HTTP errors such as 429
+                on the first results page
+        """
+        self.logger.info(f"Searching for images: {query}")
+        
+        # Get more than needed to filter out invalid ones
+        page_size = self.config.IMAGE_SEARCH_PAGE_SIZE
+        pages = min(self.config.IMAGE_SEARCH_MAX_PAGES, max(1, -(-max_images * 2 // page_size)))
+        image_urls = []
+        for img_url in self._iter_search(query, timeout, pages):
+            image_urls.append(img_url)
+            if len(image_urls) >= max_images:
+                break
+        
+        self.logger.info(f"Found {len(image_urls)} image URLs")
+        return image_urls
+    
+    def iter_image_urls(self, query, exclude=None):
+        """
+        Lazily stream distinct image URLs for a query across result pages.
+        
+        Pages are fetched a few at a time in parallel, ahead of the consumer,
+        and fetching stops as soon as the caller stops iterating.
+        
+        Args:
+            query (str): Search query
+            exclude (set): URLs to skip; every yielded URL is added to it, so
+                one set shared across posts keeps their images distinct
             
-            image_urls = []
-            for element in image_elements[:max_images * 2]:  # Get more to filter out invalid ones
+        Yields:
+            str: Image URL
+        """
+        try:
+            for img_url in self._iter_search(query, self.config.IMAGE_SEARCH_TIMEOUT, self.config.IMAGE_SEARCH_MAX_PAGES):
+                if exclude is not None:
+                    if img_url in exclude:
+                        continue
+                    exclude.add(img_url)
+                yield img_url
+        except Exception as e:
+            self.logger.error(f"Error searching images: {str(e)}")
+    
+    def _iter_search(self, query, timeout, max_pages):
+        """
+        Yield valid image URLs from up to ``max_pages`` result pages,
+        deduplicated by ``murl``.
+        
+        Raises:
+            requests.RequestException: If the first page cannot be fetched;
+                later page failures just end the results
+        """
+        page_size = self.config.IMAGE_SEARCH_PAGE_SIZE
+        concurrency = max(1, min(max_pages, self.config.IMAGE_SEARCH_PAGE_CONCURRENCY))
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bing-page")
+        pending = deque()
+        next_page = 0
+        seen = set()
+        try:
+            while True:
+                # Keep a window of pages in flight ahead of the one being consumed
+                while next_page < max_pages and len(pending) < concurrency:
+                    offset = next_page * page_size + 1
+                    pending.append((next_page, executor.submit(self._fetch_page, query, offset, timeout)))
+                    next_page += 1
+                if not pending:
+                    return
+                
+                page, future = pending.popleft()
                 try:
-                    # Extract JSON data from the element
-                    m_attr = element.get("m")
-                    if m_attr:
-                        m_data = json.loads(m_attr)
-                        img_url = m_data.get("murl")  # Main image URL
-                        
-                        if img_url and is_valid_image_url(img_url):
-                            # Skip data URLs and very small images
-                            if not img_url.startswith('data:') and 'base64' not in img_url:
-                                image_urls.append(img_url)
-                                
-                                if len(image_urls) >= max_images:
-                                    break
-                                    
+                    murls = future.result()
                 except Exception as e:
-                    self.logger.debug(f"Error extracting image URL: {str(e)}")
-                    continue
+                    if page == 0:
+                        raise
+                    self.logger.warning(f"Stopping image search at page {page + 1}: {str(e)}")
+                    return
+                
+                new = 0
+                for img_url in murls:
+                    if img_url in seen:
+                        continue
+                    seen.add(img_url)
+                    new += 1
+                    # Skip data URLs and very small images
+                    if is_valid_image_url(img_url) and not img_url.startswith('data:') and 'base64' not in img_url:
+                        yield img_url
+                if new == 0:
+                    # Bing repeats its last page past the end of the results
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _fetch_page(self, query, offset, timeout):
+        """Fetch one results page starting at ``offset`` and extract every ``murl`` on it."""
+        query_encoded = urllib.parse.quote_plus(" ".join(query.split()))
+        if offset <= 1:
+            search_url = f"https://www.bing.com/images/search?q={query_encoded}&form=HDRSC2&first=1&tsc=ImageBasicHover"
+        else:
+            # Later pages come from the endpoint Bing's infinite scroll uses
+            search_url = (f"https://www.bing.com/images/async?q={query_encoded}&first={offset}"
+                          f"&count={self.config.IMAGE_SEARCH_PAGE_SIZE}&mmasync=1")
+        
+        with self._get(search_url, timeout=timeout) as response:
+            response.raise_for_status()
+            # Decode directly; charset sniffing on a large page is slow
+            page = response.content.decode(response.encoding or "utf-8", errors="replace")
+        
+        # Pull the main image URL (murl) of every result anchor
+        return self.extract_image_urls(page)
+    
+    def fetch_image(self, url, cancel_event=None):
+        """
+        Download and process a single image in memory.
+        
+        The image is buffered in memory, validated and downscaled if larger
+        than 1200x800. Bodies that are not images, exceed
+        ``Config.IMAGE_MAX_BYTES`` or are smaller than the configured minimum
+        dimensions are abandoned as soon as that is known.
+        
+        Args:
+            url (str): Image URL
+            cancel_event (threading.Event): Abort the download when set; the
+                connection is closed
             
-            self.logger.info(f"Found {len(image_urls)} image URLs")
-            return image_urls
+        Returns:
+            bytes: The processed image, or None if it failed or was rejected
+        """
+        data = self._download(url, 30, cancel_event)
+        if data is None:
+            return None
+        
+        # Verify the image is valid and resize if needed
+        try:
+            data, size, resized = self._process(data)
+        except Exception as e:
+            self.logger.error(f"Error processing image from {url}: {str(e)}")
+            return None
+        
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if resized:
+            self.logger.info(f"Resized image from {url[:100]}")
+        self.logger.info(f"Downloaded image: {url[:100]} ({size[0]}x{size[1]})")
+        return data
+    
+    def _download(self, url, timeout, cancel_event=None):
+        """Download the raw image bytes behind :meth:`fetch_image`, with its early-abort checks."""
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
             
+            with self._get(url, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                
+                # Check if the response is actually an image
+                content_type = response.headers.get('content-type', '')
+                if not content_type.startswith('image/'):
+                    self.logger.warning(f"URL doesn't return image content: {url}")
+                    return None
+                
+                # Skip oversized images before reading the body
+                max_bytes = self.config.IMAGE_MAX_BYTES
+                content_length = response.headers.get('content-length', '')
+                if max_bytes and content_length.isdigit() and int(content_length) > max_bytes:
+                    self.logger.warning(f"Skipping image {url}: Content-Length {content_length} exceeds {max_bytes} bytes")
+                    return None
+                
+                # Keep the image in memory; it is written once, after resizing.
+                # The probe drops non-images, oversized bodies and small
+                # images within the first few KB.
+                probe = ImageProbe(
+                    max_bytes=max_bytes,
+                    min_size=(self.config.IMAGE_MIN_WIDTH, self.config.IMAGE_MIN_HEIGHT),
+                )
+                chunks = []
+                for chunk in response.iter_content(chunk_size=8192):
+                    if cancel_event is not None and cancel_event.is_set():
+                        self.logger.debug(f"Download cancelled: {url}")
+                        return None
+                    if not chunk:
+                        continue
+                    reason = probe.feed(chunk)
+                    if reason:
+                        self.logger.warning(f"Skipping image {url}: {reason}")
+                        return None
+                    chunks.append(chunk)
+                reason = probe.finish()
+                if reason:
+                    self.logger.warning(f"Skipping image {url}: {reason}")
+                    return None
+                return b"".join(chunks)
+                
         except Exception as e:
-            self.logger.error(f"Error searching images: {str(e)}")
-            return []
+            self.logger.error(f"Error downloading image from {url}: {str(e)}")
+            return None
     
-    def download_image(self, url, filename):
+    def download_image(self, url, filename, cancel_event=None):
         """
-        Download a single image.
+        Download a single image to ``filename``.
+        
+        See :meth:`fetch_image`; the final image is written in one atomic write.
         
         Args:
             url (str): Image URL
             filename (str): Local filename to save
+            cancel_event (threading.Event): Abort the download when set;
+                nothing is written
             
         Returns:
             bool: True if successful, False otherwise
         """
+        data = self.fetch_image(url, cancel_event)
+        if data is None:
+            return False
         try:
-            # Add random delay to avoid rate limiting
-            time.sleep(random.uniform(0.5, 1.5))
-            
-            response = self.session.get(url, timeout=30, stream=True)
-            response.raise_for_status()
-            
-            # Check if the response is actually an image
-            content_type = response.headers.get('content-type', '')
-            if not content_type.startswith('image/'):
-                self.logger.warning(f"URL doesn't return image content: {url}")
-                return False
-            
-            # Save the image
-            with open(filename, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            atomic_write(filename, data)
+        except Exception as e:
+            self.logger.error(f"Error saving image {filename}: {str(e)}")
+            return False
+        return True
+    
+    def _process(self, data):
+        """Run :func:`imaging.process_image`, in the shared process pool if ``Config.IMAGE_RESIZE_IN_POOL``."""
+        if not self.config.IMAGE_RESIZE_IN_POOL:
+            return process_image(data)
+        return get_process_pool().submit(process_image, data).result()
+    
+    def create_variants(self, paths, out_dir=None):
+        """
+        Create responsive WebP and JPEG variants of downloaded images.
+        
+        Images are processed in parallel in the shared process pool.
+        
+        Args:
+            paths (list): Downloaded image files
+            out_dir (str): Output directory, defaults to ``images/variants``
             
-            # Verify the image is valid and resize if needed
+        Returns:
+            list: Per path, the :func:`imaging.write_variants` description,
+                or None if that image failed
+        """
+        out_dir = out_dir or os.path.join("images", "variants")
+        widths = tuple(self.config.IMAGE_VARIANT_WIDTHS)
+        pool = get_process_pool()
+        futures = [pool.submit(write_variants, path, out_dir, widths) for path in paths]
+        results = []
+        for path, future in zip(paths, futures):
             try:
-                with Image.open(filename) as img:
-                    # Convert to RGB if necessary
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Resize if too large
-                    max_size = (1200, 800)
-                    if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                        img.save(filename, 'JPEG', quality=85)
-                        self.logger.info(f"Resized image: {filename}")
-                    
-                    self.logger.info(f"Downloaded image: {filename} ({img.size[0]}x{img.size[1]})")
-                    return True
-                    
+                results.append(future.result())
             except Exception as e:
-                self.logger.error(f"Error processing image {filename}: {str(e)}")
-                # Remove invalid image file
-                try:
-                    os.remove(filename)
-                except:
-                    pass
-                return False
+                self.logger.error(f"Error creating variants for {path}: {str(e)}")
+                results.append(None)
+        self.logger.info(f"Created variants for {sum(1 for r in results if r)}/{len(paths)} images")
+        return results
+    
+    def probe_image(self, url, use_cache=True):
+        """
+        Check a hotlink candidate with a partial fetch.
+        
+        Requests the first ``Config.IMAGE_PROBE_BYTES`` with a Range GET and
+        reads the image header from them. Results are memoized per URL for
+        ``Config.IMAGE_PROBE_TTL`` seconds; transient failures (timeouts,
+        connection errors, 5xx, 429) only for ``Config.IMAGE_PROBE_ERROR_TTL``.
+        
+        Args:
+            url (str): Image URL
+            use_cache (bool): Reuse and store memoized probe results
+            
+        Returns:
+            ImageCandidate: Reachability, dimensions, byte size and format
+        """
+        cache = self.search_cache if use_cache else None
+        key = make_key("probe", url)
+        entry = self._cache_get(cache, key)
+        if entry is not None:
+            cached = ImageCandidate(**entry[0])
+            ttl = self.config.IMAGE_PROBE_ERROR_TTL if cached.transient else self.config.IMAGE_PROBE_TTL
+            if entry[1] <= ttl:
+                return cached
+        
+        candidate = self._probe(url)
+        self._cache_set(cache, key, asdict(candidate))
+        return candidate
+    
+    def _probe(self, url):
+        """Fetch just enough of ``url`` to read its image header."""
+        candidate = ImageCandidate(url=url)
+        start = time.perf_counter()
+        try:
+            headers = {'Range': f"bytes=0-{self.config.IMAGE_PROBE_BYTES - 1}"}
+            with self._get(url, timeout=self.config.IMAGE_PROBE_TIMEOUT, headers=headers, stream=True) as response:
+                response.raise_for_status()
+                candidate.bytes = self._full_size(response)
                 
+                probe = ImageProbe(header_bytes=self.config.IMAGE_PROBE_BYTES)
+                for chunk in response.iter_content(chunk_size=8192):
+                    if not chunk:
+                        continue
+                    candidate.error = probe.feed(chunk)
+                    # Servers that ignore Range send the whole file; stop at the header
+                    if candidate.error or probe.done:
+                        break
+                candidate.error = candidate.error or probe.finish()
+            
+            if candidate.error is None and probe.size is None:
+                candidate.error = "image header not found"
+            if candidate.error is None:
+                candidate.ok = True
+                candidate.width, candidate.height = probe.size
+                candidate.format = probe.format
+        except requests.HTTPError as e:
+            candidate.error = str(e)
+            status = e.response.status_code if e.response is not None else None
+            candidate.transient = status is None or status >= 500 or status in (408, 429)
         except Exception as e:
-            self.logger.error(f"Error downloading image from {url}: {str(e)}")
-            return False
+            # Timeouts, connection errors and the like say nothing about the image
+            candidate.error = str(e)
+            candidate.transient = True
+        candidate.latency = time.perf_counter() - start
+        return candidate
+    
+    def _full_size(self, response):
+        """Total file size from Content-Range (206) or Content-Length (200), if known."""
+        content_range = response.headers.get('content-range', '')
+        if '/' in content_range:
+            total = content_range.rsplit('/', 1)[1].strip()
+            return int(total) if total.isdigit() else None
+        content_length = response.headers.get('content-length', '')
+        if response.status_code == 200 and content_length.isdigit():
+            return int(content_length)
+        return None
     
-    def get_image_urls(self, query, max_images=3):
+    def probe_images(self, urls, concurrency=None):
+        """
+        Probe hotlink candidates concurrently.
+        
+        Args:
+            urls (list): Image URLs
+            concurrency (int): Probes in flight at once, defaults to
+                ``Config.IMAGE_PROBE_CONCURRENCY``
+            
+        Returns:
+            list: ImageCandidate per URL, in input order
+        """
+        if not urls:
+            return []
+        concurrency = max(1, min(len(urls), concurrency or self.config.IMAGE_PROBE_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="image-probe") as executor:
+            return list(executor.map(self.probe_image, urls))
+    
+    def rank_images(self, urls, concurrency=None):
+        """
+        Probe candidates and order the usable ones by suitability for embedding.
+        
+        Unreachable, non-image, too small and oversized candidates are dropped.
+        
+        Returns:
+            list: ImageCandidate objects, best first
+        """
+        min_size = (self.config.IMAGE_MIN_WIDTH, self.config.IMAGE_MIN_HEIGHT)
+        scored = []
+        for candidate in self.probe_images(urls, concurrency):
+            score = suitability(candidate, min_size, self.config.IMAGE_MAX_BYTES,
+                                timeout=self.config.IMAGE_PROBE_TIMEOUT)
+            if score is None:
+                self.logger.debug(f"Rejected image candidate {candidate.url[:100]}: "
+                                  f"{candidate.error or f'{candidate.width}x{candidate.height}, {candidate.bytes} bytes'}")
+                continue
+            scored.append((score, candidate))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [candidate for _, candidate in scored]
+    
+    def _candidate_hash(self, url):
+        """
+        pHash of the image at ``url``, memoized like probes; None if it can't be fetched.
+        
+        The image is downloaded within the probe timeout and hashed as is; no resize.
+        """
+        key = make_key("phash", url)
+        entry = self._cache_get(self.search_cache, key)
+        if entry is not None and entry[1] <= self.config.IMAGE_PROBE_TTL:
+            return entry[0]
+        data = self._download(url, self.config.IMAGE_PROBE_TIMEOUT)
+        if data is None:
+            return None
+        try:
+            phash = perceptual_hash(data)
+        except Exception as e:
+            self.logger.warning(f"Cannot hash image {url[:100]}: {str(e)}")
+            return None
+        self._cache_set(self.search_cache, key, phash)
+        return phash
+    
+    def distinct_images(self, candidates, max_images):
+        """
+        Pick the best ``max_images`` candidates that don't look alike.
+        
+        Candidates are hashed best first, only as many at a time as are
+        still needed, and any within ``Config.IMAGE_DUPLICATE_DISTANCE`` pHash
+        bits of a better one is skipped, so hotlinked posts don't show the
+        same picture twice from different hosts.
+        
+        Args:
+            candidates (list): Ranked ImageCandidate objects, best first
+            max_images (int): Maximum number of images to pick
+            
+        Returns:
+            list: ImageCandidate objects, best first
+        """
+        picked, hashes = [], []
+        remaining = list(candidates)
+        concurrency = max(1, self.config.IMAGE_DOWNLOAD_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="image-hash") as executor:
+            while remaining and len(picked) < max_images:
+                needed = max_images - len(picked)
+                batch, remaining = remaining[:needed], remaining[needed:]
+                for candidate, phash in zip(batch, executor.map(self._candidate_hash, [c.url for c in batch])):
+                    if phash is None:
+                        self.logger.debug(f"Rejected image candidate {candidate.url[:100]}: download failed")
+                        continue
+                    if any(hamming_distance(phash, other) <= self.config.IMAGE_DUPLICATE_DISTANCE for other in hashes):
+                        self.logger.info(f"Skipping image {candidate.url[:100]}: near-duplicate of a better candidate")
+                        continue
+                    hashes.append(phash)
+                    picked.append(candidate)
+        return picked
+    
+    def get_images(self, query, max_images=3, dedupe=None):
+        """
+        Get probed hotlink candidates for a query, best first.
+        
+        Args:
+            query (str): Search query
+            max_images (int): Maximum number of images to get
+            dedupe (bool): Drop near-duplicates by pHash (see :meth:`distinct_images`),
+                defaults to ``Config.IMAGE_HOTLINK_DEDUPE``. This downloads every
+                picked image in full, which probing otherwise avoids
+            
+        Returns:
+            list: ImageCandidate objects with dimensions, byte size and format
+        """
+        try:
+            # Search for images; get more URLs to ensure we get enough valid images
+            image_urls = self.search_images(query, max_images * 3)
+            valid_urls = [url for url in image_urls if is_valid_image_url(url)]
+            ranked = self.rank_images(valid_urls)
+            if self.config.IMAGE_HOTLINK_DEDUPE if dedupe is None else dedupe:
+                return self.distinct_images(ranked, max_images)
+            return ranked[:max_images]
+        except Exception as e:
+            self.logger.error(f"Error in get_images: {str(e)}")
+            return []
+    
+    def get_image_urls(self, query, max_images=3, probe=True):
         """
         Get image URLs for a given query without downloading.
         
+        With ``probe`` every candidate is checked with a partial fetch and
+        only reachable, suitably sized images are returned, best first.
+        
         Args:
             query (str): Search query
             max_images (int): Maximum number of images to get
+            probe (bool): Probe and rank candidates before returning them
             
         Returns:
             list: List of image URLs for hotlinking
         """
         try:
-            # Search for images
-            image_urls = self.search_images(query, max_images * 2)  # Get more URLs to ensure we get enough valid images
+            if probe:
+                valid_urls = [candidate.url for candidate in self.get_images(query, max_images)]
+            else:
+                # Get more URLs to ensure we get enough valid images
+                image_urls = self.search_images(query, max_images * 2)
+                valid_urls = [url for url in image_urls if is_valid_image_url(url)][:max_images]
             
-            if not image_urls:
+            if not valid_urls:
                 self.logger.warning(f"No images found for query: {query}")
                 return []
             
-            # Filter and validate URLs
-            valid_urls = []
-            for url in image_urls:
-                if len(valid_urls) >= max_images:
-                    break
-                    
-                if is_valid_image_url(url):
-                    valid_urls.append(url)
-                    self.logger.info(f"Found valid image URL: {url[:100]}...")
+            for url in valid_urls:
+                self.logger.info(f"Found valid image URL: {url[:100]}...")
             
             self.logger.info(f"Found {len(valid_urls)} valid image URLs for query: {query}")
             return valid_urls
@@ -196,13 +692,52 @@ class BingImageScraper:
             self.logger.error(f"Error in get_image_urls: {str(e)}")
             return []
 
-    def download_images(self, query, max_images=3):
+    @property
+    def image_store(self):
+        """Content-addressed store downloaded images are saved to, opened on first use."""
+        with self._image_store_lock:
+            if self._image_store is None:
+                self._image_store = ImageStore(
+                    self.config.IMAGE_STORE_DIR,
+                    self.config.IMAGE_STORE_INDEX,
+                    max_distance=self.config.IMAGE_DUPLICATE_DISTANCE,
+                )
+            return self._image_store
+    
+    def _fetch_candidate(self, url, cancel_event):
+        """
+        Download a candidate unless the store already has it.
+        
+        Returns:
+            tuple: (stored record, None) for a known URL, (None, (bytes, phash))
+                for a fresh download, or (None, None) on failure
+        """
+        known = self.image_store.lookup_url(url)
+        if known is not None:
+            return known, None
+        data = self.fetch_image(url, cancel_event)
+        if data is None:
+            return None, None
+        return None, (data, perceptual_hash(data))
+    
+    def download_images(self, query, max_images=3, concurrency=None, reuse=False):
         """
         Download images for a given query.
         
+        Candidates are downloaded concurrently; once ``max_images`` succeed the
+        remaining downloads are cancelled and their connections closed. Images
+        are saved to the content-addressed :class:`image_store.ImageStore`.
+        Near-duplicates (by perceptual hash) of images already picked for this
+        call are skipped, as are images already in the store, so posts don't
+        repeat each other's images. URLs the store has seen are not downloaded
+        again.
+        
         Args:
             query (str): Search query
             max_images (int): Maximum number of images to download
+            concurrency (int): Downloads in flight at once, defaults to
+                ``Config.IMAGE_DOWNLOAD_CONCURRENCY``
+            reuse (bool): Return already-stored images instead of skipping them
             
         Returns:
             list: List of downloaded image file paths
@@ -214,46 +749,69 @@ class BingImageScraper:
             self.logger.warning(f"No images found for query: {query}")
             return []
         
-        # Create images directory if it doesn't exist
-        images_dir = "images"
-        os.makedirs(images_dir, exist_ok=True)
-        
-        # Download images
-        downloaded_paths = []
-        query_clean = clean_filename(query)
+        store = self.image_store
+        concurrency = max(1, concurrency or self.config.IMAGE_DOWNLOAD_CONCURRENCY)
+        cancel_event = threading.Event()
+        downloaded = {}
+        picked_hashes = []
         
-        for i, url in enumerate(image_urls):
-            if len(downloaded_paths) >= max_images:
-                break
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="image-download") as executor:
+            futures = {
+                executor.submit(self._fetch_candidate, url, cancel_event): (i, url)
+                for i, url in enumerate(image_urls)
+            }
+            
+            # Results are handled one at a time here, so duplicate checks don't race
+            for future in as_completed(futures):
+                i, url = futures[future]
+                if future.cancelled() or cancel_event.is_set():
+                    continue
+                try:
+                    record, fetched = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error downloading image {i+1}: {str(e)}")
+                    continue
+                if record is None and fetched is None:
+                    self.logger.warning(f"Failed to download image {i+1}")
+                    continue
                 
-            try:
-                # Generate filename
-                url_path = urlparse(url).path
-                extension = os.path.splitext(url_path)[1].lower()
-                if not extension or extension not in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-                    extension = '.jpg'
+                phash = record["phash"] if record else fetched[1]
+                if record is None:
+                    # Remember the URL even if it's skipped, so it isn't downloaded again
+                    record = store.find_similar(phash)
+                    if record is not None:
+                        store.add_source(url, record["sha256"])
                 
-                filename = f"{query_clean}_{i+1}{extension}"
-                filepath = os.path.join(images_dir, filename)
+                if any(hamming_distance(phash, picked) <= store.max_distance for picked in picked_hashes):
+                    self.logger.info(f"Skipping image {i+1}: near-duplicate of another image in this post")
+                    continue
+                if record is not None and not reuse:
+                    self.logger.info(f"Skipping image {i+1}: already stored as {record['path']}")
+                    continue
+                if record is None:
+                    record = store.put(fetched[0], source_url=url, phash=phash)
                 
-                # Download the image
-                if self.download_image(url, filepath):
-                    downloaded_paths.append(filepath)
-                    self.logger.info(f"Successfully downloaded: {filepath}")
-                else:
-                    self.logger.warning(f"Failed to download image {i+1}")
-                    
-            except Exception as e:
-                self.logger.error(f"Error downloading image {i+1}: {str(e)}")
-                continue
+                picked_hashes.append(phash)
+                downloaded[i] = record["path"]
+                self.logger.info(f"Successfully downloaded: {record['path']}")
+                if len(downloaded) >= max_images:
+                    # Enough images: stop queued downloads and abort running ones
+                    cancel_event.set()
+                    for pending in futures:
+                        pending.cancel()
         
+        downloaded_paths = [downloaded[i] for i in sorted(downloaded)]
         self.logger.info(f"Downloaded {len(downloaded_paths)} images for query: {query}")
         return downloaded_paths
-    
+
     def close(self):
-        """Close the session."""
+        """Close the session, the caches and the image store."""
         try:
             self.session.close()
+            if self.search_cache is not None:
+                self.search_cache.close()
+            if self._image_store is not None:
+                self._image_store.close()
             self.logger.info("Image scraper session closed successfully")
         except Exception as e:
             self.logger.error(f"Error closing session: {str(e)}")
@@ -0,0 +1,99 @@
+"""
+Process-wide registry of Gemini clients.
+Models and scrapers are built once per process and shared across Streamlit
+sessions and reruns instead of being reconstructed for every post.
+"""
+
+import logging
+import threading
+import google.generativeai as genai
+import google.ai.generativelanguage as glm
+from cache import make_key
+
+
+class ClientRegistry:
+    """Thread-safe registry of GenerativeModel and GeminiScraper instances."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._models = {}
+        self._scrapers = {}
+        self._lock = threading.RLock()
+
+    def get_model(self, api_key, model_name, generation_config):
+        """
+        Return the shared model for an API key, model name and generation config.
+
+        Each key gets its own client because ``genai.configure`` is process-global.
+        """
+        registry_key = (api_key, model_name, make_key(generation_config))
+        with self._lock:
+            model = self._models.get(registry_key)
+            if model is None:
+                model = genai.GenerativeModel(
+                    model_name=model_name,
+                    generation_config=generation_config
+                )
+                model._client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+                self._models[registry_key] = model
+                self.logger.info(f"Created Gemini client for key ...{api_key[-4:]} ({model_name})")
+            return model
+
+    def get_scraper(self, api_key=None):
+        """
+        Return the shared GeminiScraper for ``api_key``, creating it on first use.
+
+        Args:
+            api_key (str): Explicit API key, or None for the default key sources
+
+        Returns:
+            GeminiScraper: Instance shared by every caller in this process
+        """
+        # Imported here because gemini imports this module for get_model
+        from gemini import GeminiScraper
+
+        with self._lock:
+            scraper = self._scrapers.get(api_key)
+            if scraper is None:
+                scraper = GeminiScraper(api_key=api_key)
+                self._scrapers[api_key] = scraper
+            return scraper
+
+    def health_check(self, api_key=None):
+        """
+        Check that every key of the shared scraper can reach the API.
+
+        Returns:
+            dict: Masked key -> "ok" or the error message
+        """
+        return self.get_scraper(api_key).health_check()
+
+    def invalidate(self, api_key=None):
+        """
+        Drop cached clients so the next call picks up changed settings.
+
+        Dropped scrapers are not closed: running jobs may still hold them, and
+        their cache connection is released once the last user lets go.
+
+        Args:
+            api_key (str): Only drop clients for this key; None drops everything
+        """
+        with self._lock:
+            if api_key is None:
+                scrapers = list(self._scrapers.values())
+                self._scrapers.clear()
+                self._models.clear()
+            else:
+                scrapers = [scraper for scraper in self._scrapers.values() if api_key in scraper.key_pool.keys]
+                self._scrapers = {k: s for k, s in self._scrapers.items() if s not in scrapers}
+                self._models = {k: m for k, m in self._models.items() if k[0] != api_key}
+        self.logger.info(f"Invalidated {len(scrapers)} Gemini scraper(s)")
+
+
+# Shared by every session in the process
+registry = ClientRegistry()
+
+
+def get_scraper(api_key=None):
+    """Return the process-wide GeminiScraper, see :meth:`ClientRegistry.get_scraper`."""
+    return registry.get_scraper(api_key)
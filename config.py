@@ -3,7 +3,7 @@ Configuration settings for the blog system.
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class Config:
@@ -14,10 +14,64 @@ class Config:
     GEMINI_MODEL: str = "gemini-1.5-flash"
     GEMINI_TEMPERATURE: float = 0.9
     GEMINI_MAX_TOKENS: int = 8192
+    GEMINI_CONCURRENCY: int = 5  # Topics in flight for batch generation
+    GEMINI_RPM_PER_KEY: int = 15  # Requests per minute allowed per API key
+    GEMINI_KEY_COOLDOWN: int = 60  # Seconds a key rests after a 429 / quota error
+    GEMINI_CACHE_PATH: str = ".cache/gemini.sqlite3"
+    GEMINI_CACHE_MAX_MB: int = 100
+    GEMINI_CACHE_MAX_AGE: int = 7 * 24 * 3600  # Seconds
+    GEMINI_DEADLINE: float = 90.0  # Seconds per model call attempt
+    GEMINI_MAX_RETRIES: int = 3  # Retries for 5xx / timeout errors
+    GEMINI_BACKOFF_BASE: float = 1.0  # Seconds, doubled per retry with full jitter
+    GEMINI_BACKOFF_MAX: float = 20.0
+    GEMINI_HEDGE: bool = False  # Fire a duplicate request when a call passes the p95 latency
+    GEMINI_HEDGE_QUANTILE: float = 0.95
+    GEMINI_HEDGE_BUDGET: float = 0.05  # Share of calls that may be hedged (each hedge is an extra request)
+    GEMINI_GENERATION_MODE: str = "stream"  # stream | structured (one JSON call) | long (parallel sections)
     
     # Bing Image settings
     MAX_IMAGES_PER_POST: int = 3
     IMAGE_SEARCH_TIMEOUT: int = 30
+    IMAGE_DOWNLOAD_CONCURRENCY: int = 4  # Image downloads in flight at once
+    IMAGE_POOL_HOSTS: int = 20  # Hosts with a pooled connection kept open
+    IMAGE_EXTRACTOR: str = "regex"  # Bing result page parser: regex | bs4 | lxml
+    IMAGE_PROCESS_WORKERS: int = 0  # Processes in the shared image pool (variants); 0 = one per CPU
+    IMAGE_RESIZE_IN_POOL: bool = False  # Resize downloads in that pool instead of the download thread
+    IMAGE_VARIANT_WIDTHS: tuple = (480, 800, 1200)  # Responsive variant widths for srcset
+    IMAGE_BASE_URL: str = ""  # Public URL the images/ folder is served from; enables responsive variants
+    IMAGE_STORE_DIR: str = "images"  # Downloaded images, named by content hash
+    IMAGE_STORE_INDEX: str = ".cache/images.sqlite3"
+    IMAGE_DUPLICATE_DISTANCE: int = 6  # pHash bits two images may differ by and still count as duplicates
+    IMAGE_MAX_BYTES: int = 10 * 1024 * 1024  # Downloads larger than this are aborted
+    IMAGE_MIN_WIDTH: int = 300  # Smaller images (icons, tracking pixels) are skipped
+    IMAGE_MIN_HEIGHT: int = 200
+    IMAGE_PROBE_CONCURRENCY: int = 8  # Hotlink candidates probed at once
+    IMAGE_PROBE_TIMEOUT: int = 5  # Seconds; slower hosts are not worth hotlinking
+    IMAGE_PROBE_BYTES: int = 64 * 1024  # Range requested to read the image header
+    IMAGE_PROBE_TTL: int = 24 * 3600  # Seconds a probe result is reused
+    IMAGE_PROBE_ERROR_TTL: int = 10 * 60  # Seconds a transient probe failure is reused
+    IMAGE_HOTLINK_DEDUPE: bool = False  # Download hotlink picks to drop near-duplicates (costs full fetches)
+    IMAGE_HOST_RATE: float = 4.0  # Requests per second per image host
+    IMAGE_HOST_BURST: int = 4
+    IMAGE_HOST_RATES: dict = field(default_factory=lambda: {"www.bing.com": 2.0})  # Per-host overrides
+    IMAGE_MAX_CONNECTIONS: int = 16  # Requests in flight across all hosts
+    IMAGE_SEARCH_CACHE_PATH: str = ".cache/bing_search.sqlite3"
+    IMAGE_SEARCH_CACHE_TTL: int = 24 * 3600  # Seconds a search result is served without asking Bing
+    IMAGE_SEARCH_CACHE_MAX_AGE: int = 30 * 24 * 3600  # Stale results kept this long as a fallback
+    IMAGE_SEARCH_CACHE_MAX_MB: int = 20
+    IMAGE_SEARCH_STALE_TIMEOUT: int = 5  # Seconds to wait on Bing before serving a stale result
+    IMAGE_SEARCH_PAGE_SIZE: int = 35  # Results per Bing page (the first= offset step)
+    IMAGE_SEARCH_MAX_PAGES: int = 6
+    IMAGE_SEARCH_PAGE_CONCURRENCY: int = 3  # Result pages fetched at once
+    
+    # Post storage
+    POST_STORE_PATH: str = ".data/posts.sqlite3"
+    POST_PAGE_SIZE: int = 10  # Posts per page in the dashboard list
+    MARKDOWN_CACHE_MAX_MB: int = 32  # Memory for rendered post previews
+    
+    # Background jobs
+    JOB_WORKERS: int = 2  # AI posts generated at once
+    JOB_HISTORY: int = 50  # Finished jobs kept for the status table
     
     # Content generation settings
     MIN_ARTICLE_LENGTH: int = 1000
@@ -25,7 +79,11 @@ class Config:
     
     # Cloudflare Worker settings
     WORKER_SCRIPT_TIMEOUT: int = 60
+    DEPLOY_MODE: str = "kv"  # kv (incremental, Workers KV) | local (file-backed KV) | script (posts in the script)
+    KV_NAMESPACE_TITLE: str = ""  # Defaults to "<worker name>-posts"; created on first deploy
+    KV_LOCAL_DIR: str = ".data/kv"  # Where the local KV stand-in keeps its files
     
     def __post_init__(self):
         """Load environment variables after initialization."""
         self.GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', self.GEMINI_API_KEY)
+        self.IMAGE_BASE_URL = os.getenv('IMAGE_BASE_URL', self.IMAGE_BASE_URL)
@@ -0,0 +1,341 @@
+"""
+Incremental blog deploys through Workers KV.
+Prebuilt pages (see site_builder.py) live in a KV namespace next to a constant
+worker script (worker_kv.js), keyed by route and tracked by content hash, so
+a deploy uploads only the pages that changed and deletes the ones that are gone.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List
+from urllib.parse import quote
+import requests
+
+MANIFEST_KEY = "manifest"  # Route -> hash of every published page
+PAGE_PREFIX = "page:"
+SCRIPT_KEY = "meta:script"  # Hash of the worker script and bindings last uploaded
+# Keys of the earlier post-per-key layout, removed on the first page deploy
+LEGACY_INDEX_KEY = "index"
+LEGACY_POST_PREFIX = "post:"
+
+WORKER_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_kv.js")
+KV_BINDING = "PAGES"
+COMPATIBILITY_DATE = "2023-10-01"
+
+API_BASE = "https://api.cloudflare.com/client/v4"
+# Cloudflare bulk write limits: 10,000 pairs and 100 MB per request
+BULK_MAX_KEYS = 10000
+BULK_MAX_BYTES = 90 * 1024 * 1024
+
+# Full-script deploys: every page inlined into a service worker
+SCRIPT_WORKER_TEMPLATE = """// Blog Worker untuk Cloudflare - semua halaman di-render saat build
+addEventListener('fetch', event => {{
+  event.respondWith(handleRequest(event.request))
+}})
+
+const PAGES = {pages};
+
+function routeFor(pathname) {{
+  let path;
+  try {{
+    path = decodeURIComponent(pathname);
+  }} catch (e) {{
+    return null;
+  }}
+  return path.length > 1 ? path.replace(/\\/+$/, '') : path;
+}}
+
+function handleRequest(request) {{
+  const page = PAGES[routeFor(new URL(request.url).pathname)];
+  const headers = {{ 'Content-Type': 'text/html; charset=utf-8' }};
+  if (page !== undefined) {{
+    return new Response(page, {{ headers }});
+  }}
+  return new Response(PAGES['/404'], {{ status: 404, headers }});
+}}
+"""
+
+
+def content_hash(text):
+    """SHA-256 of a page; changes whenever anything on it changes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def pages_worker_script(pages):
+    """Service worker serving ``pages`` (route -> HTML) from an inlined map."""
+    return SCRIPT_WORKER_TEMPLATE.format(pages=json.dumps(pages, ensure_ascii=False))
+
+
+def worker_script():
+    """Source of the constant KV-backed worker."""
+    with open(WORKER_SCRIPT_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+class FileKV:
+    """
+    Local stand-in for a KV namespace: one file per key in ``directory``.
+
+    Lets the incremental deploy be exercised without a Cloudflare account.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, quote(key, safe=""))
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_many(self, items):
+        """Write ``{key: text}`` pairs, each atomically."""
+        for key, value in items.items():
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(value)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def delete_many(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+
+class CloudflareKV:
+    """A Workers KV namespace accessed through the Cloudflare REST API."""
+
+    def __init__(self, account_id, api_token, namespace_id, timeout=60):
+        self.logger = logging.getLogger(__name__)
+        self.namespace_id = namespace_id
+        self.timeout = timeout
+        self.base_url = f"{API_BASE}/accounts/{account_id}/storage/kv/namespaces/{namespace_id}"
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_token}"
+
+    @classmethod
+    def find_namespace(cls, account_id, api_token, title, timeout=60):
+        """
+        Id of the namespace called ``title``, or None if there is none.
+
+        Raises:
+            requests.HTTPError: If the API rejects the request
+        """
+        headers = {"Authorization": f"Bearer {api_token}"}
+        url = f"{API_BASE}/accounts/{account_id}/storage/kv/namespaces"
+        page = 1
+        while True:
+            response = requests.get(url, headers=headers, params={"page": page, "per_page": 100}, timeout=timeout)
+            response.raise_for_status()
+            namespaces = response.json()["result"]
+            for namespace in namespaces:
+                if namespace["title"] == title:
+                    return namespace["id"]
+            if len(namespaces) < 100:
+                return None
+            page += 1
+
+    @classmethod
+    def ensure_namespace(cls, account_id, api_token, title, timeout=60):
+        """
+        Id of the namespace called ``title``, created if it doesn't exist yet.
+
+        Raises:
+            requests.HTTPError: If the API rejects the request
+        """
+        namespace_id = cls.find_namespace(account_id, api_token, title, timeout)
+        if namespace_id:
+            return namespace_id
+
+        headers = {"Authorization": f"Bearer {api_token}"}
+        url = f"{API_BASE}/accounts/{account_id}/storage/kv/namespaces"
+        response = requests.post(url, headers=headers, json={"title": title}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["result"]["id"]
+
+    def get(self, key):
+        response = self.session.get(f"{self.base_url}/values/{quote(key, safe='')}", timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content.decode("utf-8")
+
+    def put_many(self, items):
+        """Write ``{key: text}`` pairs with as few bulk requests as the limits allow."""
+        batch, size = [], 0
+        for key, value in items.items():
+            entry_size = len(key) + len(value.encode("utf-8"))
+            if batch and (len(batch) >= BULK_MAX_KEYS or size + entry_size > BULK_MAX_BYTES):
+                self._put_batch(batch)
+                batch, size = [], 0
+            batch.append({"key": key, "value": value})
+            size += entry_size
+        if batch:
+            self._put_batch(batch)
+
+    def _put_batch(self, batch):
+        response = self.session.put(f"{self.base_url}/bulk", json=batch, timeout=self.timeout)
+        response.raise_for_status()
+        self.logger.debug(f"Wrote {len(batch)} KV pairs")
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        for start in range(0, len(keys), BULK_MAX_KEYS):
+            response = self.session.post(
+                f"{self.base_url}/bulk/delete", json=keys[start:start + BULK_MAX_KEYS], timeout=self.timeout
+            )
+            response.raise_for_status()
+
+
+@dataclass
+class DeployPlan:
+    """What an incremental deploy would change."""
+
+    upload: List[str] = field(default_factory=list)  # New or changed routes
+    delete: List[str] = field(default_factory=list)  # Routes that no longer exist
+    unchanged: int = 0
+    manifest: Dict[str, str] = field(default_factory=dict)  # Manifest to publish
+    legacy_keys: List[str] = field(default_factory=list)  # Leftovers of the post-per-key layout
+
+    @property
+    def empty(self):
+        return not (self.upload or self.delete or self.legacy_keys)
+
+
+class IncrementalDeployer:
+    """Builds the site from a PostStore and syncs its pages into a KV namespace."""
+
+    def __init__(self, kv, store, builder):
+        self.logger = logging.getLogger(__name__)
+        self.kv = kv
+        self.store = store
+        self.builder = builder
+        self._pages = {}
+
+    def remote_manifest(self):
+        """Manifest currently published in KV, or an empty dict on the first deploy."""
+        raw = self.kv.get(MANIFEST_KEY)
+        return json.loads(raw) if raw else {}
+
+    def plan(self):
+        """
+        Build every page and compare it with the published manifest by hash.
+
+        Returns:
+            DeployPlan: Routes to upload and delete, and the manifest to publish
+        """
+        remote = self.remote_manifest()
+        self._pages = self.builder.build(self.store.all())
+
+        plan = DeployPlan()
+        for route, page in self._pages.items():
+            digest = content_hash(page)
+            plan.manifest[route] = digest
+            if remote.get(route) == digest:
+                plan.unchanged += 1
+            else:
+                plan.upload.append(route)
+        plan.delete = [route for route in remote if route not in self._pages]
+
+        if not remote:
+            legacy_index = self.kv.get(LEGACY_INDEX_KEY)
+            if legacy_index:
+                plan.legacy_keys = [LEGACY_INDEX_KEY] + [
+                    LEGACY_POST_PREFIX + entry["id"] for entry in json.loads(legacy_index)
+                ]
+        return plan
+
+    def deploy(self, plan=None):
+        """
+        Apply a plan: changed pages first, then the manifest, then deletions,
+        so no link points at a page that isn't there yet.
+
+        Returns:
+            dict: Counts of uploaded, deleted and unchanged pages, bytes sent and seconds taken
+        """
+        plan = plan or self.plan()
+        start = time.time()
+        uploads = {PAGE_PREFIX + route: self._pages[route] for route in plan.upload}
+        if uploads:
+            self.kv.put_many(uploads)
+        sent = sum(len(value.encode("utf-8")) for value in uploads.values())
+        if plan.upload or plan.delete:
+            manifest = json.dumps(plan.manifest, ensure_ascii=False)
+            self.kv.put_many({MANIFEST_KEY: manifest})
+            sent += len(manifest.encode("utf-8"))
+        if plan.delete or plan.legacy_keys:
+            self.kv.delete_many([PAGE_PREFIX + route for route in plan.delete] + plan.legacy_keys)
+
+        result = {
+            "uploaded": len(plan.upload),
+            "deleted": len(plan.delete),
+            "unchanged": plan.unchanged,
+            "bytes": sent,
+            "seconds": time.time() - start,
+        }
+        self.logger.info(f"KV deploy: {result}")
+        return result
+
+
+def publish_worker(kv, account_id, api_token, worker_name, namespace_id, timeout=60):
+    """
+    Upload the KV-backed worker script unless this exact script and binding
+    are already live (tracked under ``SCRIPT_KEY`` in the namespace).
+
+    Returns:
+        bool: True if the script was uploaded, False if it was already current
+
+    Raises:
+        requests.HTTPError: If the API rejects the upload
+    """
+    script = worker_script()
+    metadata = {
+        "main_module": "worker.js",
+        "compatibility_date": COMPATIBILITY_DATE,
+        "bindings": [{"type": "kv_namespace", "name": KV_BINDING, "namespace_id": namespace_id}],
+    }
+    digest = hashlib.sha256((script + json.dumps(metadata, sort_keys=True) + worker_name).encode("utf-8")).hexdigest()
+    if kv.get(SCRIPT_KEY) == digest:
+        return False
+
+    headers = {"Authorization": f"Bearer {api_token}"}
+    script_url = f"{API_BASE}/accounts/{account_id}/workers/scripts/{worker_name}"
+    response = requests.put(
+        script_url,
+        headers=headers,
+        files={
+            "metadata": (None, json.dumps(metadata), "application/json"),
+            "worker.js": ("worker.js", script, "application/javascript+module"),
+        },
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    # Enable the workers.dev subdomain, as the full-script deploy does
+    requests.post(f"{script_url}/subdomain", headers=headers, json={"enabled": True}, timeout=timeout)
+    kv.put_many({SCRIPT_KEY: digest})
+    return True
+
+
+def forget_worker(kv):
+    """
+    Record that the KV-backed worker is no longer live, e.g. because a
+    full-script deploy replaced it under the same name, so the next
+    :func:`publish_worker` uploads it again instead of skipping it.
+    """
+    kv.delete_many([SCRIPT_KEY])
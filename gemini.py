@@ -4,14 +4,75 @@ This module handles interaction with Gemini AI using Google's official API.
 """
 
 import os
+import copy
+import json
+import contextlib
+import time
+import asyncio
 import logging
-from langdetect import detect, DetectorFactory
-from langcodes import Language
+import itertools
+from dataclasses import dataclass
+from typing import Optional
 import google.generativeai as genai
+import google.ai.generativelanguage as glm
 from config import Config
+from keypool import ApiKeyPool, is_rate_limit_error
+from resilience import Resilience, RetryPolicy
+from metrics import record_model_call, cache_requests
+from cache import DiskCache, make_key
+from client_registry import registry
+from language import detect_language, detect_languages, language_name
+from utils import extract_excerpt_from_content, generate_post_id, split_title_from_markdown
 
-# Pastikan deteksi bahasa konsisten
-DetectorFactory.seed = 0
+# JSON schema for single-call structured post generation
+POST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "slug": {"type": "string"},
+        "excerpt": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "body": {"type": "string"},
+    },
+    "required": ["title", "slug", "excerpt", "tags", "body"],
+}
+
+# JSON schema for the outline stage of long-form generation
+OUTLINE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string"},
+                    "points": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["heading", "points"],
+            },
+        },
+    },
+    "required": ["title", "sections"],
+}
+
+# Minimum subheadings, matching what the single-call article prompt asks for
+MIN_OUTLINE_SECTIONS = 5
+
+
+@dataclass
+class ArticleResult:
+    """Outcome of generating one article in a batch."""
+
+    topic: str
+    index: int
+    content: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.content is not None
 
 class GeminiScraper:
     """Scraper for Gemini AI using official API."""
@@ -21,6 +82,16 @@ class GeminiScraper:
         self.config = Config()
         self.api_key = api_key
         self.model = None
+        self.cache = self._open_cache()
+        self.resilience = Resilience(RetryPolicy(
+            deadline=self.config.GEMINI_DEADLINE,
+            max_retries=self.config.GEMINI_MAX_RETRIES,
+            base_delay=self.config.GEMINI_BACKOFF_BASE,
+            max_delay=self.config.GEMINI_BACKOFF_MAX,
+            hedge=self.config.GEMINI_HEDGE,
+            hedge_quantile=self.config.GEMINI_HEDGE_QUANTILE,
+            hedge_budget=self.config.GEMINI_HEDGE_BUDGET,
+        ))
         self._setup_gemini()
     
     def _read_api_keys(self, filename="apikey.txt"):
@@ -35,99 +106,112 @@ class GeminiScraper:
             self.logger.error(f"Error reading API keys from {filename}: {str(e)}")
             return []
     
+    def _open_cache(self):
+        """Open the on-disk response cache, or run without one if that fails."""
+        try:
+            return DiskCache(
+                self.config.GEMINI_CACHE_PATH,
+                max_bytes=self.config.GEMINI_CACHE_MAX_MB * 1024 * 1024,
+                max_age=self.config.GEMINI_CACHE_MAX_AGE,
+            )
+        except Exception as e:
+            self.logger.warning(f"Response cache disabled: {str(e)}")
+            return None
+
     def _setup_gemini(self):
         """Setup Gemini AI API."""
         try:
             # Get API key from multiple sources
-            if not self.api_key:
-                self.api_key = os.getenv('GEMINI_API_KEY')
+            api_keys = [self.api_key] if self.api_key else []
+            if not api_keys and self.config.GEMINI_API_KEY:
+                api_keys = [self.config.GEMINI_API_KEY]
             
             # If still no API key, try to read from file
-            if not self.api_key:
+            if not api_keys:
                 api_keys = self._read_api_keys()
                 if api_keys:
-                    self.api_key = api_keys[0]  # Use first API key
-                    self.logger.info("Using API key from apikey.txt file")
+                    self.logger.info(f"Using {len(api_keys)} API key(s) from apikey.txt file")
             
-            if not self.api_key:
+            if not api_keys:
                 raise ValueError("Gemini API key not found. Please:\n"
                                "1. Set GEMINI_API_KEY environment variable, or\n"
                                "2. Provide via --api-key parameter, or\n"
                                "3. Create apikey.txt file with your API key")
             
-            # Configure Gemini
-            genai.configure(api_key=self.api_key)
+            self.key_pool = ApiKeyPool(
+                api_keys,
+                requests_per_minute=self.config.GEMINI_RPM_PER_KEY,
+                cooldown=self.config.GEMINI_KEY_COOLDOWN,
+            )
+            self.api_key = self.key_pool.keys[0]
             
             # Setup generation config
-            generation_config = {
-                "temperature": 0.9,
+            self.model_name = self.config.GEMINI_MODEL
+            self.generation_config = {
+                "temperature": self.config.GEMINI_TEMPERATURE,
                 "top_p": 0.95,
                 "top_k": 64,
-                "max_output_tokens": 8192,
+                "max_output_tokens": self.config.GEMINI_MAX_TOKENS,
                 "response_mime_type": "text/plain",
             }
             
-            self.model = genai.GenerativeModel(
-                model_name="gemini-1.5-flash", 
-                generation_config=generation_config
-            )
+            # One model per key from the process-wide registry
+            self.models = {key: self._build_model(key) for key in self.key_pool.keys}
+            self.model = self.models[self.api_key]
             
-            self.logger.info("Gemini API initialized successfully")
+            self.logger.info(f"Gemini API initialized successfully with {len(self.key_pool)} key(s)")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize Gemini API: {str(e)}")
             raise
-    
-    def detect_language(self, subject):
-        """Detect language of the subject."""
-        try:
-            lang_code = detect(subject)
-            lang_name = Language.get(lang_code).display_name()
-            return lang_name
-        except:
-            return "English"  # Default ke bahasa Inggris jika terjadi error
-    
-    def generate_title(self, subject, language):
-        """Generate title for the article."""
-        try:
-            title_prompt = (
-                f"Forget previous instructions. You are a professional clickbait-style blog title writer in {language}. "
-                f"Come up with 1 unique, emotional, and curiosity-driven blog title for the topic: \"{subject}\". "
-                f"The title must be under 60 characters, avoid clichés, and spark reader curiosity. "
-                f"Use metaphor, emotion, or an unexpected twist. Do not repeat the subject word exactly."
-            )
-            
-            response = self.model.generate_content(title_prompt)
-            title = response.text.strip().replace('"', '').replace("**", "").replace("##", "")
-            
-            self.logger.info(f"Generated title: {title}")
-            return title
-            
-        except Exception as e:
-            self.logger.error(f"Error generating title: {str(e)}")
-            return subject  # Fallback to original subject
 
-    def generate_article(self, topic, language="id"):
+    def _build_model(self, api_key):
+        """Return the shared GenerativeModel bound to ``api_key``."""
+        return registry.get_model(api_key, self.model_name, self.generation_config)
+
+    def health_check(self):
         """
-        Generate article content using Gemini AI.
-        
-        Args:
-            topic (str): The topic for the article
-            language (str): Language code (id=Indonesian, en=English)
-            
+        Check that every key can reach the API with a cheap count_tokens call.
+
         Returns:
-            str: Generated article content or None if failed
+            dict: Masked key -> "ok" or the error message
         """
-        try:
-            # Detect language automatically
-            detected_lang = self.detect_language(topic)
-            
-            # Generate title first
-            title = self.generate_title(topic, detected_lang)
-            
-            # Create the prompt based on language
-            if language == "id":
-                article_prompt = f"""Buatkan artikel lengkap tentang "{title}" dalam bahasa Indonesia dengan struktur sebagai berikut:
+        results = {}
+        for key, model in self.models.items():
+            try:
+                model.count_tokens("ping")
+                results[f"...{key[-4:]}"] = "ok"
+            except Exception as e:
+                results[f"...{key[-4:]}"] = str(e)
+        return results
+    
+    def detect_language(self, subject):
+        """Detect language of the subject (memoized, see :mod:`language`)."""
+        return detect_language(subject)
+
+    def _title_language(self, topic, language):
+        """Language name for the title, skipping detection when the caller chose one."""
+        if language:
+            return language_name(language)
+        return self.detect_language(topic)
+    
+    def _title_prompt(self, subject, language):
+        """Build the prompt used to generate an article title."""
+        return (
+            f"Forget previous instructions. You are a professional clickbait-style blog title writer in {language}. "
+            f"Come up with 1 unique, emotional, and curiosity-driven blog title for the topic: \"{subject}\". "
+            f"The title must be under 60 characters, avoid clichés, and spark reader curiosity. "
+            f"Use metaphor, emotion, or an unexpected twist. Do not repeat the subject word exactly."
+        )
+
+    def _clean_title(self, text):
+        """Strip quotes and markdown markers from a generated title."""
+        return text.strip().replace('"', '').replace("**", "").replace("##", "")
+
+    def _article_prompt(self, title, language):
+        """Build the article prompt for the given title and language code."""
+        if language == "id":
+            return f"""Buatkan artikel lengkap tentang "{title}" dalam bahasa Indonesia dengan struktur sebagai berikut:
 
 1. Judul yang menarik dan SEO-friendly
 2. Pendahuluan yang engaging (100-150 kata)
@@ -144,8 +228,7 @@ Pastikan artikel:
 - Menarik untuk dibaca dan memberikan value kepada pembaca
 
 Gunakan format markdown untuk heading dan formatting."""
-            else:
-                article_prompt = f"""Write a comprehensive article about "{title}" in English with the following structure:
+        return f"""Write a comprehensive article about "{title}" in English with the following structure:
 
 1. Engaging and SEO-friendly title
 2. Compelling introduction (100-150 words)
@@ -162,10 +245,367 @@ Ensure the article:
 - Is engaging to read and provides value to readers
 
 Use markdown format for headings and formatting."""
+
+    def _post_prompt(self, topic, language):
+        """Build the prompt asking for a whole post as one JSON object."""
+        if language == "id":
+            instructions = """
+
+Kembalikan hasilnya sebagai satu objek JSON dengan field berikut:
+- title: judul blog yang emosional dan memancing rasa ingin tahu, di bawah 60 karakter
+- slug: versi URL-friendly dari judul (huruf kecil, dipisahkan tanda hubung)
+- excerpt: ringkasan 1-2 kalimat, maksimal 200 karakter
+- tags: 3-6 tag singkat yang relevan
+- body: isi artikel lengkap dalam markdown, tanpa judul utama"""
+        else:
+            instructions = """
+
+Return the result as a single JSON object with these fields:
+- title: an emotional, curiosity-driven blog title under 60 characters
+- slug: a URL-friendly version of the title (lowercase, hyphen-separated)
+- excerpt: a 1-2 sentence summary, at most 200 characters
+- tags: 3-6 short relevant tags
+- body: the full article in markdown, without the main title"""
+        return self._article_prompt(topic, language) + instructions
+
+    def _outline_prompt(self, topic, language):
+        """Build the prompt for the outline stage of long-form generation."""
+        if language == "id":
+            return (
+                f"Buatkan kerangka artikel blog lengkap tentang \"{topic}\" dalam bahasa Indonesia. "
+                f"Berikan judul yang menarik dan SEO-friendly, lalu minimal {MIN_OUTLINE_SECTIONS} subheading "
+                f"untuk isi artikel (tanpa pendahuluan dan kesimpulan). Untuk setiap subheading, "
+                f"tuliskan 2-4 poin utama yang akan dibahas. Kembalikan sebagai JSON."
+            )
+        return (
+            f"Create an outline for a comprehensive blog article about \"{topic}\" in English. "
+            f"Give an engaging, SEO-friendly title, then at least {MIN_OUTLINE_SECTIONS} subheadings "
+            f"for the body (excluding introduction and conclusion). For each subheading, "
+            f"list 2-4 key points it will cover. Return it as JSON."
+        )
+
+    def _outline_text(self, outline):
+        """Render an outline as a numbered list to share with every section prompt."""
+        lines = []
+        for number, section in enumerate(outline["sections"], 1):
+            lines.append(f"{number}. {section['heading']}")
+            lines.extend(f"   - {point}" for point in section["points"])
+        return "\n".join(lines)
+
+    def _section_prompt(self, outline, part, language, section=None):
+        """
+        Build the prompt for one part of a long-form article.
+
+        Every part sees the full outline, so the introduction previews and the
+        conclusion summarizes exactly the sections that get written.
+        """
+        title = outline["title"]
+        plan = self._outline_text(outline)
+        if language == "id":
+            context = f"Kita sedang menulis artikel berjudul \"{title}\" dalam bahasa Indonesia dengan kerangka berikut:\n\n{plan}\n\n"
+            if part == "introduction":
+                task = "Tulis pendahuluan yang engaging (100-150 kata) yang memperkenalkan topik dan memberi gambaran bagian-bagian di atas."
+            elif part == "conclusion":
+                task = "Tulis kesimpulan yang kuat dan actionable (100-150 kata) yang merangkum bagian-bagian di atas."
+            else:
+                points = "; ".join(section["points"])
+                task = (
+                    f"Tulis isi bagian \"{section['heading']}\" (200-300 kata) yang membahas: {points}. "
+                    f"Gunakan bullet points atau numbered lists jika perlu."
+                )
+            rules = "Gunakan format markdown. Jangan tulis judul artikel atau heading bagian, dan jangan mengulang bagian lain."
+        else:
+            context = f"We are writing an article titled \"{title}\" in English with this outline:\n\n{plan}\n\n"
+            if part == "introduction":
+                task = "Write a compelling introduction (100-150 words) that introduces the topic and previews the sections above."
+            elif part == "conclusion":
+                task = "Write a strong, actionable conclusion (100-150 words) that wraps up the sections above."
+            else:
+                points = "; ".join(section["points"])
+                task = (
+                    f"Write the body of the section \"{section['heading']}\" (200-300 words) covering: {points}. "
+                    f"Use bullet points or numbered lists when appropriate."
+                )
+            rules = "Use markdown format. Do not write the article title or the section heading, and do not repeat other sections."
+        return f"{context}{task}\n\n{rules}"
+
+    def _cache_key(self, prompt, generation_config=None):
+        """Cache key covering everything that determines a response."""
+        config = dict(self.generation_config, **(generation_config or {}))
+        return make_key(self.model_name, config, prompt)
+
+    def _cached(self, prompt, use_cache, generation_config=None):
+        """Return the cached response for ``prompt``, if caching applies."""
+        if not use_cache or self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(prompt, generation_config))
+        cache_requests.inc(result="miss" if cached is None else "hit")
+        return cached
+
+    def _store(self, prompt, text, use_cache, generation_config=None):
+        if use_cache and self.cache is not None and text:
+            self.cache.set(self._cache_key(prompt, generation_config), text)
+
+    def _forget(self, prompt, generation_config=None):
+        """Drop a cached response that turned out to be unusable."""
+        if self.cache is not None:
+            self.cache.delete(self._cache_key(prompt, generation_config))
+
+    def _generate(self, prompt, use_cache=True, generation_config=None, kind="default"):
+        """
+        Run a single blocking model call and return the response text.
+
+        Responses are served from the on-disk cache when possible. Otherwise
+        the call runs under the resilience layer (deadline, retries, hedging)
+        with key-pool failover. ``generation_config`` overrides the model's
+        defaults for this call; ``kind`` groups latencies for hedging.
+        """
+        cached = self._cached(prompt, use_cache, generation_config)
+        if cached is not None:
+            return cached
+        text = self.resilience.call(
+            lambda timeout: self._call_model(prompt, generation_config, timeout, kind), kind
+        )
+        self._store(prompt, text, use_cache, generation_config)
+        return text
+
+    def _record(self, kind, outcome, started, usage=None):
+        """Record one model call in the process-wide metrics."""
+        record_model_call(self.model_name, kind, outcome, time.perf_counter() - started, usage)
+
+    def _with_key_failover(self, call, kind, record=True):
+        """
+        Run ``call(key)`` on keys from the pool until one isn't rate limited.
+
+        A 429 / quota error cools the key down and the call is retried on the
+        next healthy key; any other error propagates. Each attempt is
+        recorded in the metrics unless ``record`` is False.
+        """
+        last_error = None
+        for _ in range(len(self.key_pool)):
+            key = self.key_pool.acquire()
+            started = time.perf_counter()
+            try:
+                result = call(key)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if record:
+                    self._record(kind, "rate_limited" if rate_limited else "error", started)
+                if not rate_limited:
+                    raise
+                self.key_pool.mark_rate_limited(key)
+                last_error = e
+                continue
+            if record:
+                self._record(kind, "success", started, getattr(result, "usage_metadata", None))
+            self.key_pool.mark_success(key)
+            return result
+        raise last_error
+
+    async def _with_key_failover_async(self, call, kind, timeout=None):
+        """
+        Async variant of :meth:`_with_key_failover`; ``call(key)`` returns an awaitable.
+
+        ``timeout`` bounds each request but not the wait for a key, so queueing
+        under RPM limits doesn't count as a timed-out request.
+        """
+        last_error = None
+        for _ in range(len(self.key_pool)):
+            key = await self.key_pool.acquire_async()
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(call(key), timeout)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                self._record(kind, "rate_limited" if rate_limited else "error", started)
+                if not rate_limited:
+                    raise
+                self.key_pool.mark_rate_limited(key)
+                last_error = e
+                continue
+            self._record(kind, "success", started, getattr(result, "usage_metadata", None))
+            self.key_pool.mark_success(key)
+            return result
+        raise last_error
+
+    def _request_options(self, timeout):
+        return {"timeout": timeout} if timeout else None
+
+    def _call_model(self, prompt, generation_config=None, timeout=None, kind="default"):
+        """Make one model call with key-pool failover, bypassing cache and retries."""
+        response = self._with_key_failover(
+            lambda key: self.models[key].generate_content(
+                prompt,
+                generation_config=generation_config,
+                request_options=self._request_options(timeout),
+            ),
+            kind,
+        )
+        return response.text.strip()
+
+    async def _generate_async(self, prompt, models, use_cache=True, kind="default"):
+        """Async variant of :meth:`_generate` over the per-run ``models``."""
+        cached = self._cached(prompt, use_cache)
+        if cached is not None:
+            return cached
+        text = await self.resilience.call_async(
+            lambda timeout: self._call_model_async(prompt, models, timeout, kind), kind,
+            enforce_deadline=False,  # Applied per request, after a key is acquired
+        )
+        self._store(prompt, text, use_cache)
+        return text
+
+    async def _call_model_async(self, prompt, models, timeout=None, kind="default"):
+        """Async variant of :meth:`_call_model`."""
+        response = await self._with_key_failover_async(
+            lambda key: models[key].generate_content_async(
+                prompt, request_options=self._request_options(timeout)
+            ),
+            kind,
+            timeout,
+        )
+        return response.text.strip()
+
+    def _open_stream(self, prompt, timeout=None):
+        """Start a streaming call and pull its first chunk, with key-pool failover."""
+        def start(key):
+            chunks = iter(self.models[key].generate_content(
+                prompt, stream=True, request_options=self._request_options(timeout)
+            ))
+            return chunks, next(chunks, None)
+
+        # The stream is recorded as one call once it completes
+        return self._with_key_failover(start, "stream", record=False)
+
+    def _stream(self, prompt, use_cache=True):
+        """
+        Stream the response to ``prompt`` as text chunks.
+
+        Retries and key failover happen before the first chunk; once text has
+        been yielded an error propagates to the caller. The full text is cached
+        when the stream completes, and a cache hit is yielded as one chunk.
+        """
+        cached = self._cached(prompt, use_cache)
+        if cached is not None:
+            self.logger.info("Streaming response served from cache")
+            yield cached
+            return
+        
+        start = time.perf_counter()
+        # Hedging a stream would leave the losing stream open, so never hedge here
+        chunks, first_chunk = self.resilience.call(
+            lambda timeout: self._open_stream(prompt, timeout), kind="stream", hedge=False
+        )
+        
+        parts = []
+        first_token = None
+        usage = None
+        if first_chunk is not None:
+            chunks = itertools.chain([first_chunk], chunks)
+        try:
+            for chunk in chunks:
+                # Usage is reported on the final chunk
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                text = self._chunk_text(chunk)
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(text)
+                yield text
+        except Exception:
+            self._record("stream", "error", start)
+            raise
+        self._record("stream", "success", start, usage)
+        
+        total = time.perf_counter() - start
+        text = "".join(parts).strip()
+        ttft = f"{first_token:.2f}s" if first_token is not None else "n/a"
+        self.logger.info(f"Streamed {len(text)} characters: first token {ttft}, total {total:.2f}s")
+        self._store(prompt, text, use_cache)
+
+    def _chunk_text(self, chunk):
+        """Text of a streamed chunk, or '' for chunks without text parts."""
+        try:
+            return chunk.text
+        except ValueError:
+            return ""
+
+    @contextlib.asynccontextmanager
+    async def _async_models(self):
+        """
+        Copies of the per-key models bound to async clients for the running
+        loop; the clients' channels are closed when the block exits.
+
+        The grpc asyncio channel is tied to the event loop it was created on, so
+        every batch run gets its own clients instead of reusing stale ones.
+        google.generativeai has no public way to give a model its own async
+        client, so it is attached the same way the registry attaches the sync one.
+        """
+        models, clients = {}, []
+        for key, model in self.models.items():
+            if isinstance(model, genai.GenerativeModel):
+                model = copy.copy(model)
+                async_client = glm.GenerativeServiceAsyncClient(client_options={"api_key": key})
+                model._async_client = async_client
+                clients.append(async_client)
+            models[key] = model
+        try:
+            yield models
+        finally:
+            for async_client in clients:
+                try:
+                    await async_client.transport.close()
+                except Exception as e:
+                    self.logger.warning(f"Error closing async Gemini client: {str(e)}")
+
+    def generate_title(self, subject, language, use_cache=True):
+        """Generate title for the article."""
+        try:
+            title = self._clean_title(self._generate(self._title_prompt(subject, language), use_cache, kind="title"))
+            
+            self.logger.info(f"Generated title: {title}")
+            return title
+            
+        except Exception as e:
+            self.logger.error(f"Error generating title: {str(e)}")
+            return subject  # Fallback to original subject
+
+    async def generate_title_async(self, subject, language, models, use_cache=True):
+        """Async variant of :meth:`generate_title` over the per-run ``models``."""
+        try:
+            prompt = self._title_prompt(subject, language)
+            title = self._clean_title(await self._generate_async(prompt, models, use_cache, kind="title"))
+            self.logger.info(f"Generated title: {title}")
+            return title
+        except Exception as e:
+            self.logger.error(f"Error generating title: {str(e)}")
+            return subject
+
+    def generate_article(self, topic, language=None, use_cache=True):
+        """
+        Generate article content using Gemini AI.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English); when
+                omitted the title follows the detected topic language and the
+                article uses ``Config.DEFAULT_LANGUAGE``
+            use_cache (bool): Serve and store responses in the on-disk cache
+            
+        Returns:
+            str: Generated article content or None if failed
+        """
+        try:
+            # Title language: explicit choice, otherwise detected from the topic
+            title_lang = self._title_language(topic, language)
+            
+            # Generate title first
+            title = self.generate_title(topic, title_lang, use_cache)
             
             # Generate the article
-            response = self.model.generate_content(article_prompt)
-            article_content = response.text.strip()
+            language = language or self.config.DEFAULT_LANGUAGE
+            article_content = self._generate(self._article_prompt(title, language), use_cache, kind="article")
             
             if article_content and len(article_content) > 200:
                 self.logger.info(f"Successfully generated article content ({len(article_content)} characters)")
@@ -177,7 +617,254 @@ Use markdown format for headings and formatting."""
         except Exception as e:
             self.logger.error(f"Error generating article: {str(e)}")
             return None
+
+    def _parse_post(self, text):
+        """Validate a structured response against POST_SCHEMA, raising ValueError if unusable."""
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError("Structured response is not a JSON object")
+        
+        title = str(data.get("title") or "").strip().replace("**", "")
+        body = str(data.get("body") or "").strip()
+        if not title or len(body) <= 200:
+            raise ValueError("Structured response is missing a title or body")
+        
+        tags = data.get("tags") if isinstance(data.get("tags"), list) else []
+        return {
+            "title": title,
+            "slug": generate_post_id(str(data.get("slug") or "")) or generate_post_id(title),
+            "excerpt": str(data.get("excerpt") or "").strip() or extract_excerpt_from_content(body),
+            "tags": [str(tag).strip() for tag in tags if str(tag).strip()],
+            "body": body,
+            "structured": True,
+        }
+
+    def generate_post(self, topic, language="id", use_cache=True):
+        """
+        Generate title, slug, excerpt, tags and body in a single model call.
+        
+        The model is asked for JSON matching POST_SCHEMA. If the response can't
+        be parsed or validated, falls back to the title + article path.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English)
+            use_cache (bool): Serve and store responses in the on-disk cache
+            
+        Returns:
+            dict: Post fields plus ``structured`` telling which path produced
+            them, or None if both paths failed
+        """
+        prompt = self._post_prompt(topic, language)
+        structured_config = {"response_mime_type": "application/json", "response_schema": POST_SCHEMA}
+        try:
+            post = self._parse_post(self._generate(prompt, use_cache, structured_config, kind="post"))
+            self.logger.info(f"Generated structured post: {post['title']}")
+            return post
+        except Exception as e:
+            self._forget(prompt, structured_config)
+            self.logger.warning(f"Structured generation failed, falling back: {str(e)}")
+        
+        article_content = self.generate_article(topic, language, use_cache)
+        if not article_content:
+            return None
+        title, body = split_title_from_markdown(article_content, topic)
+        return {
+            "title": title,
+            "slug": generate_post_id(title),
+            "excerpt": extract_excerpt_from_content(body),
+            "tags": [],
+            "body": body,
+            "structured": False,
+        }
+
+    def _parse_outline(self, text):
+        """Validate an outline response, raising ValueError if it is unusable."""
+        data = json.loads(text)
+        title = str(data.get("title") or "").strip().replace("**", "")
+        sections = [
+            {
+                "heading": str(section.get("heading") or "").strip().lstrip("#").strip(),
+                "points": [str(point).strip() for point in section.get("points") or [] if str(point).strip()],
+            }
+            for section in data.get("sections") or []
+            if isinstance(section, dict)
+        ]
+        sections = [section for section in sections if section["heading"]]
+        if not title or len(sections) < MIN_OUTLINE_SECTIONS:
+            raise ValueError(f"Outline needs a title and at least {MIN_OUTLINE_SECTIONS} sections")
+        return {"title": title, "sections": sections}
+
+    def _strip_heading(self, text, heading):
+        """Drop a leading markdown heading the model added despite instructions."""
+        lines = text.strip().split("\n")
+        if lines and lines[0].lstrip().startswith("#"):
+            lines = lines[1:]
+        elif lines and lines[0].strip().strip("*").strip() == heading:
+            lines = lines[1:]
+        return "\n".join(lines).strip()
+
+    def generate_long_article(self, topic, language="id", concurrency=None, use_cache=True):
+        """
+        Generate a long-form article by writing its sections in parallel.
+        
+        First an outline with at least MIN_OUTLINE_SECTIONS subheadings is
+        generated, then the introduction, every section and the conclusion are
+        written concurrently and stitched together in order. Wall-clock time is
+        bounded by the slowest part rather than the whole article. Falls back
+        to :meth:`generate_article` if any stage fails.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English)
+            concurrency (int): Maximum parts in flight at once, defaults to
+                ``Config.GEMINI_CONCURRENCY``
+            use_cache (bool): Serve and store responses in the on-disk cache
+            
+        Returns:
+            str: Generated article in markdown or None if failed
+        """
+        outline_config = {"response_mime_type": "application/json", "response_schema": OUTLINE_SCHEMA}
+        prompt = self._outline_prompt(topic, language)
+        try:
+            outline = self._parse_outline(self._generate(prompt, use_cache, outline_config, kind="outline"))
+            self.logger.info(f"Generated outline with {len(outline['sections'])} sections: {outline['title']}")
+            
+            concurrency = max(1, concurrency or self.config.GEMINI_CONCURRENCY)
+            parts = asyncio.run(self._write_sections_async(outline, language, concurrency, use_cache))
+        except Exception as e:
+            self._forget(prompt, outline_config)
+            self.logger.warning(f"Long-form generation failed, falling back: {str(e)}")
+            return self.generate_article(topic, language, use_cache)
+        
+        introduction, sections, conclusion = parts[0], parts[1:-1], parts[-1]
+        conclusion_heading = "Kesimpulan" if language == "id" else "Conclusion"
+        blocks = [f"# {outline['title']}", self._strip_heading(introduction, outline["title"])]
+        for section, body in zip(outline["sections"], sections):
+            blocks.append(f"## {section['heading']}\n\n{self._strip_heading(body, section['heading'])}")
+        blocks.append(f"## {conclusion_heading}\n\n{self._strip_heading(conclusion, conclusion_heading)}")
+        
+        article_content = "\n\n".join(blocks)
+        self.logger.info(f"Successfully generated long-form article ({len(article_content)} characters)")
+        return article_content
+
+    async def _write_sections_async(self, outline, language, concurrency, use_cache):
+        """Write introduction, sections and conclusion concurrently, in outline order."""
+        semaphore = asyncio.Semaphore(concurrency)
+        prompts = [self._section_prompt(outline, "introduction", language)]
+        prompts += [self._section_prompt(outline, "section", language, section) for section in outline["sections"]]
+        prompts.append(self._section_prompt(outline, "conclusion", language))
+
+        async with self._async_models() as models:
+            async def run(prompt):
+                async with semaphore:
+                    text = await self._generate_async(prompt, models, use_cache, kind="section")
+                    if not text:
+                        raise ValueError("Generated section is empty")
+                    return text
+
+            return list(await asyncio.gather(*(run(prompt) for prompt in prompts)))
+
+    def stream_article(self, topic, language=None, use_cache=True):
+        """
+        Generate article content as a stream of markdown chunks.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English); when
+                omitted the title follows the detected topic language and the
+                article uses ``Config.DEFAULT_LANGUAGE``
+            use_cache (bool): Serve and store responses in the on-disk cache
+            
+        Yields:
+            str: Pieces of the article as they arrive from the model
+        """
+        try:
+            title = self.generate_title(topic, self._title_language(topic, language), use_cache)
+            language = language or self.config.DEFAULT_LANGUAGE
+            yield from self._stream(self._article_prompt(title, language), use_cache)
+        except Exception as e:
+            self.logger.error(f"Error streaming article: {str(e)}")
+            raise
+
+    async def _write_article_async(self, topic, language, title_lang, models, use_cache=True):
+        """Generate one article on the async client, raising on failure."""
+        title = await self.generate_title_async(topic, title_lang, models, use_cache)
+        prompt = self._article_prompt(title, language)
+        article_content = await self._generate_async(prompt, models, use_cache, kind="article")
+        if not article_content or len(article_content) <= 200:
+            raise ValueError("Generated content is too short or empty")
+        return article_content
+
+    def generate_articles(self, topics, language=None, concurrency=None, ordered=True, use_cache=True):
+        """
+        Generate articles for many topics concurrently.
+        
+        Args:
+            topics (list): Topics to write about
+            language (str): Language code (id=Indonesian, en=English); when
+                omitted each title follows its detected topic language and the
+                articles use ``Config.DEFAULT_LANGUAGE``
+            concurrency (int): Maximum number of topics in flight at once,
+                defaults to ``Config.GEMINI_CONCURRENCY``
+            ordered (bool): Return results in input order if True, otherwise
+                in the order they complete
+            use_cache (bool): Serve and store responses in the on-disk cache
+            
+        Returns:
+            list: ArticleResult per topic; failed topics have ``content=None``
+            and the reason in ``error``
+        """
+        topics = list(topics)
+        if not topics:
+            return []
+        concurrency = max(1, concurrency or self.config.GEMINI_CONCURRENCY)
+        # Detect up front so the event loop isn't blocked by langdetect
+        if language:
+            title_langs = [language_name(language)] * len(topics)
+        else:
+            title_langs = detect_languages(topics)
+        language = language or self.config.DEFAULT_LANGUAGE
+        results = asyncio.run(
+            self._generate_articles_async(topics, language, title_langs, concurrency, ordered, use_cache)
+        )
+        
+        failed = [r.topic for r in results if not r.ok]
+        self.logger.info(f"Batch finished: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+        if failed:
+            self.logger.warning(f"Failed topics: {failed}")
+        return results
+
+    async def _generate_articles_async(self, topics, language, title_langs, concurrency, ordered, use_cache):
+        """Fan topics out over the async client, at most ``concurrency`` at a time."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with self._async_models() as models:
+            async def run(index, topic):
+                async with semaphore:
+                    try:
+                        content = await self._write_article_async(topic, language, title_langs[index], models, use_cache)
+                        self.logger.info(f"Generated article {index + 1}/{len(topics)}: {topic}")
+                        return ArticleResult(topic, index, content=content)
+                    except Exception as e:
+                        self.logger.error(f"Error generating article for {topic!r}: {str(e)}")
+                        return ArticleResult(topic, index, error=str(e))
+
+            tasks = [asyncio.create_task(run(i, topic)) for i, topic in enumerate(topics)]
+            if ordered:
+                return list(await asyncio.gather(*tasks))
+            return [await task for task in asyncio.as_completed(tasks)]
     
+    def resilience_stats(self):
+        """Retry and hedge counters of the resilience layer."""
+        return self.resilience.stats()
+
+    def cache_stats(self):
+        """Hit/miss counters and size of the response cache."""
+        return self.cache.stats() if self.cache is not None else {}
+
     def close(self):
-        """Close the API connection (no cleanup needed for API)."""
+        """Close the API connection and the response cache."""
+        if self.cache is not None:
+            self.cache.close()
         self.logger.info("Gemini API connection closed")
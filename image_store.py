@@ -0,0 +1,150 @@
+"""
+Content-addressed store for downloaded images.
+Files are named by the SHA-256 of their bytes and indexed by perceptual hash
+in SQLite, so the same or a near-identical image is only stored once.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from imaging import atomic_write, hamming_distance, perceptual_hash, sniff_format
+
+EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "BMP": ".bmp", "WEBP": ".webp"}
+
+
+class ImageStore:
+    """Image files named by content hash, with a pHash index for near-duplicate lookups."""
+
+    def __init__(self, directory="images", index_path=".cache/images.sqlite3", max_distance=6):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        index_dir = os.path.dirname(index_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " sha256 TEXT PRIMARY KEY,"
+            " phash TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        # Every URL an image (or a near-duplicate of it) was downloaded from
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " url TEXT PRIMARY KEY,"
+            " sha256 TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        # Hashes are compared in memory; a linear scan over a few thousand
+        # 64-bit ints is far cheaper than the download it saves
+        self._hashes = {
+            row["sha256"]: int(row["phash"], 16)
+            for row in self._conn.execute("SELECT sha256, phash FROM images")
+        }
+
+    def _record(self, row):
+        if row is None:
+            return None
+        record = dict(row)
+        record["phash"] = int(record["phash"], 16)
+        return record
+
+    def _get(self, sha256):
+        """Index record for a content hash, dropping it if its file was deleted."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM images WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is not None and not os.path.exists(row["path"]):
+                self._conn.execute("DELETE FROM images WHERE sha256 = ?", (sha256,))
+                self._conn.execute("DELETE FROM sources WHERE sha256 = ?", (sha256,))
+                self._conn.commit()
+                self._hashes.pop(sha256, None)
+                row = None
+        return self._record(row)
+
+    def lookup_url(self, url):
+        """Stored image previously downloaded from ``url``, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM sources WHERE url = ?", (url,)).fetchone()
+        return self._get(row["sha256"]) if row else None
+
+    def add_source(self, url, sha256):
+        """Remember that ``url`` serves the stored image ``sha256`` (or a near-duplicate)."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sources (url, sha256) VALUES (?, ?)", (url, sha256))
+            self._conn.commit()
+
+    def find_similar(self, phash, max_distance=None):
+        """
+        Closest stored image within ``max_distance`` bits of ``phash``.
+
+        Returns:
+            dict: Index record, or None if nothing is close enough
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        with self._lock:
+            candidates = sorted(
+                (hamming_distance(phash, other), sha256) for sha256, other in self._hashes.items()
+            )
+        for distance, sha256 in candidates:
+            if distance > max_distance:
+                break
+            record = self._get(sha256)
+            if record is not None:
+                return record
+        return None
+
+    def put(self, data, source_url=None, phash=None):
+        """
+        Store image bytes under their content hash.
+
+        Identical bytes are stored once; the existing record is returned.
+
+        Returns:
+            dict: Index record with ``sha256``, ``phash``, ``path`` and ``bytes``
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        existing = self._get(sha256)
+        if existing is not None:
+            if source_url:
+                self.add_source(source_url, sha256)
+            return existing
+
+        phash = perceptual_hash(data) if phash is None else phash
+        extension = EXTENSIONS.get(sniff_format(data[:16]), ".jpg")
+        path = os.path.join(self.directory, f"{sha256}{extension}")
+        atomic_write(path, data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images (sha256, phash, path, bytes, created) VALUES (?, ?, ?, ?, ?)",
+                (sha256, f"{phash:016x}", path, len(data), time.time()),
+            )
+            if source_url:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (url, sha256) VALUES (?, ?)", (source_url, sha256)
+                )
+            self._conn.commit()
+            self._hashes[sha256] = phash
+        self.logger.debug(f"Stored image {path}")
+        return self._get(sha256)
+
+    def stats(self):
+        """Number of stored images and their total size."""
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM images"
+            ).fetchone()
+        return {"images": count, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
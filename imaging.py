@@ -0,0 +1,295 @@
+"""
+In-memory image processing for downloaded images.
+Downloads are probed as they stream in so unusable bodies are dropped early.
+Images are decoded once from the downloaded bytes, reduced at decode time where
+the format allows it, resized and encoded once, then written atomically.
+"""
+
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from PIL import Image, ImageFile
+
+MAX_IMAGE_SIZE = (1200, 800)
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+# Widths of the responsive variants; the content column is 600 CSS pixels wide
+RESPONSIVE_WIDTHS = (480, 800, 1200)
+# (file extension, PIL format, MIME type), preferred format first
+VARIANT_FORMATS = (
+    ("webp", "WEBP", "image/webp"),
+    ("jpg", "JPEG", "image/jpeg"),
+)
+
+# Leading bytes of the formats worth downloading
+MAGIC_BYTES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+)
+SNIFF_BYTES = 12
+
+
+def sniff_format(head):
+    """Image format from the first bytes of a file, or None if it isn't a known image."""
+    for magic, fmt in MAGIC_BYTES:
+        if head.startswith(magic):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+class ImageProbe:
+    """
+    Inspects a download chunk by chunk so bad candidates are dropped early.
+
+    Rejects bodies that are not images (by magic bytes), that exceed
+    ``max_bytes``, or whose header declares dimensions below ``min_size``.
+    Once :attr:`done` is True the format and, if found, the size are known.
+    """
+
+    def __init__(self, max_bytes=None, min_size=None, header_bytes=64 * 1024):
+        self.max_bytes = max_bytes
+        self.min_size = min_size
+        self.header_bytes = header_bytes
+        self.received = 0
+        self.format = None
+        self.size = None
+        self._head = b""
+        self._parser = ImageFile.Parser()
+
+    def feed(self, chunk):
+        """
+        Inspect the next chunk of the body.
+
+        Returns:
+            str: Reason to abort the download, or None to keep reading
+        """
+        self.received += len(chunk)
+        if self.max_bytes and self.received > self.max_bytes:
+            return f"larger than {self.max_bytes} bytes"
+
+        if self.format is None:
+            self._head += chunk
+            if len(self._head) < SNIFF_BYTES:
+                return None
+            self.format = sniff_format(self._head)
+            if self.format is None:
+                return "not an image (unrecognized magic bytes)"
+            chunk, self._head = self._head, b""
+
+        if self._parser is not None:
+            return self._check_size(chunk)
+        return None
+
+    @property
+    def done(self):
+        """True once the header has been read, or given up on."""
+        return self.format is not None and self._parser is None
+
+    def finish(self):
+        """Check a body that ended before enough bytes arrived to sniff it."""
+        if self.format is None and sniff_format(self._head) is None:
+            return "not an image (unrecognized magic bytes)"
+        return None
+
+    def _check_size(self, chunk):
+        """Feed the header parser until it knows the image dimensions."""
+        try:
+            self._parser.feed(chunk)
+        except Exception:
+            self._parser = None  # Leave validation to the full decode
+            return None
+        image = self._parser.image
+        if image is None:
+            if self.received > self.header_bytes:
+                self._parser = None
+            return None
+
+        self.size = image.size
+        self._parser = None
+        if self.min_size and (self.size[0] < self.min_size[0] or self.size[1] < self.min_size[1]):
+            return f"too small ({self.size[0]}x{self.size[1]})"
+        return None
+
+
+@dataclass
+class ImageCandidate:
+    """What a partial fetch found out about a hotlink image URL."""
+
+    url: str
+    ok: bool = False
+    width: int = 0
+    height: int = 0
+    bytes: Optional[int] = None  # Full file size, if the server reported it
+    format: Optional[str] = None
+    latency: float = 0.0  # Seconds until the header had been read
+    error: Optional[str] = None
+    transient: bool = False  # Failed for a reason that may pass (timeout, connection error, 5xx)
+
+
+def suitability(candidate, min_size, max_bytes, target_size=MAX_IMAGE_SIZE, timeout=5.0):
+    """
+    Score a probed candidate for embedding; higher is better, None if unusable.
+
+    Images large enough to fill ``target_size`` score highest, then smaller
+    files and faster servers break ties.
+    """
+    if not candidate.ok or not candidate.width or not candidate.height:
+        return None
+    if candidate.width < min_size[0] or candidate.height < min_size[1]:
+        return None
+    if max_bytes and candidate.bytes and candidate.bytes > max_bytes:
+        return None
+
+    target_area = target_size[0] * target_size[1]
+    coverage = min(candidate.width * candidate.height, target_area) / target_area
+    weight = min(candidate.bytes or max_bytes / 2, max_bytes) / max_bytes if max_bytes else 0.0
+    slowness = min(candidate.latency, timeout) / timeout
+    return coverage - 0.25 * weight - 0.5 * slowness
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis as an ``n`` x ``n`` matrix."""
+    k = np.arange(n)[:, None]
+    basis = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+
+def perceptual_hash(data, hash_size=8, highfreq_factor=4):
+    """
+    64-bit pHash of an image: the signs of its lowest DCT frequencies
+    relative to their median. Near-identical images (resized, recompressed)
+    differ in only a few bits.
+
+    Args:
+        data (bytes): Encoded image
+
+    Returns:
+        int: ``hash_size`` ** 2 bit hash
+    """
+    size = hash_size * highfreq_factor
+    with Image.open(io.BytesIO(data)) as img:
+        # Decoding at reduced scale is plenty for a 32x32 grayscale thumbnail
+        img.draft("L", (size * 2, size * 2))
+        pixels = np.asarray(img.convert("L").resize((size, size), Image.Resampling.LANCZOS), dtype=np.float64)
+    dct = _dct_matrix(size)
+    low = (dct @ pixels @ dct.T)[:hash_size, :hash_size].flatten()
+    # Leave the DC term out of the median, it dwarfs everything else
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def process_image(data, max_size=MAX_IMAGE_SIZE, quality=JPEG_QUALITY):
+    """
+    Validate and downscale an image held in memory.
+
+    Top-level so it can run in a process pool.
+
+    Args:
+        data (bytes): Downloaded image bytes
+        max_size (tuple): Bounding box (width, height) for the output
+        quality (int): JPEG quality for resized images
+
+    Returns:
+        tuple: (bytes to write, (width, height), resized flag). Images that
+            already fit are returned unchanged.
+
+    Raises:
+        PIL.UnidentifiedImageError, OSError: If the bytes are not a valid image
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        if img.size[0] <= max_size[0] and img.size[1] <= max_size[1]:
+            return data, img.size, False
+
+        # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale; draft picks the
+        # smallest scale that still covers the target size
+        scale = min(max_size[0] / img.size[0], max_size[1] / img.size[1])
+        img.draft("RGB", (int(img.size[0] * scale), int(img.size[1] * scale)))
+
+        # Convert to RGB if necessary
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=quality)
+        return out.getvalue(), img.size, True
+
+
+def write_variants(src_path, out_dir, widths=RESPONSIVE_WIDTHS, jpeg_quality=JPEG_QUALITY,
+                   webp_quality=WEBP_QUALITY):
+    """
+    Write resized WebP and JPEG copies of an image for ``srcset``.
+
+    Top-level so it can run in a process pool. The source is decoded once and
+    each width is resized from the next larger one. Widths above the source
+    width are skipped; the source width is used instead if none fit.
+
+    Args:
+        src_path (str): Image file to read
+        out_dir (str): Directory for ``<name>-<width>.<ext>`` files
+        widths (tuple): Target widths in pixels
+
+    Returns:
+        dict: ``width``/``height`` of the largest variant and a ``variants``
+            list of {path, width, height, format, type}
+    """
+    with Image.open(src_path) as img:
+        largest = min(max(widths), img.size[0])
+        img.draft("RGB", (largest, int(img.size[1] * largest / img.size[0])))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        else:
+            img.load()
+
+    targets = sorted({w for w in widths if w <= img.size[0]} or {img.size[0]}, reverse=True)
+    name = os.path.splitext(os.path.basename(src_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+
+    variants = []
+    current = img
+    for width in targets:
+        height = max(1, round(current.size[1] * width / current.size[0]))
+        if current.size[0] != width:
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+        for ext, fmt, mime in VARIANT_FORMATS:
+            out = io.BytesIO()
+            quality = webp_quality if fmt == "WEBP" else jpeg_quality
+            current.save(out, fmt, quality=quality, **({"method": 4} if fmt == "WEBP" else {"optimize": True}))
+            path = os.path.join(out_dir, f"{name}-{width}.{ext}")
+            atomic_write(path, out.getvalue())
+            variants.append({"path": path, "width": width, "height": current.size[1], "format": ext, "type": mime})
+
+    return {"width": variants[0]["width"], "height": variants[0]["height"], "variants": variants}
+
+
+def atomic_write(path, data):
+    """Write ``data`` to ``path`` via a temporary file so readers never see a partial image."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
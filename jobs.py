@@ -0,0 +1,232 @@
+"""
+Process-wide background job queue.
+Long-running work (AI post generation) runs on a thread pool outside the
+Streamlit script thread, so reruns and closed tabs don't interrupt it. Each
+job records its stage and progress for the dashboard to poll.
+"""
+
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it was cancelled while running."""
+
+
+@dataclass
+class Job:
+    """State of one background job. The queue hands out snapshots, never the live object."""
+
+    id: str
+    label: str
+    status: str = QUEUED
+    stage: str = ""
+    progress: int = 0
+    partial: str = ""  # Output streamed so far, shown while the job runs
+    warnings: List[str] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self):
+        """Seconds spent running so far, or in total once finished."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobContext:
+    """Handle passed to a job function to report progress and check for cancellation."""
+
+    def __init__(self, queue, job_id, cancel_event):
+        self._queue = queue
+        self.job_id = job_id
+        self.cancel_event = cancel_event
+
+    def update(self, stage=None, progress=None):
+        """
+        Record the current stage and progress (0-100).
+
+        Raises:
+            JobCancelled: If the job was cancelled; jobs stop at their next update
+        """
+        self.check_cancelled()
+        self._queue._update(self.job_id, stage=stage, progress=progress)
+
+    def stream(self, text):
+        """
+        Publish the output produced so far (e.g. a streamed article).
+
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        self.check_cancelled()
+        self._queue._update(self.job_id, partial=text)
+
+    def warn(self, message):
+        """Record a non-fatal problem shown alongside the result."""
+        self._queue._update(self.job_id, warning=message)
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+
+class JobQueue:
+    """Runs submitted functions on a worker pool and tracks their state."""
+
+    def __init__(self, workers=2, history=50):
+        self.logger = logging.getLogger(__name__)
+        self.history = history
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._cancel_events = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, label, fn, *args, **kwargs):
+        """
+        Queue ``fn(context, *args, **kwargs)`` for a worker thread.
+
+        Args:
+            label (str): Shown in the status table
+            fn (callable): Receives a :class:`JobContext` first; its return
+                value becomes the job's result
+
+        Returns:
+            str: Job id
+        """
+        job_id = uuid.uuid4().hex[:12]
+        cancel_event = threading.Event()
+        with self._lock:
+            self._jobs[job_id] = Job(id=job_id, label=label)
+            self._cancel_events[job_id] = cancel_event
+            self._prune()
+            context = JobContext(self, job_id, cancel_event)
+            self._futures[job_id] = self._executor.submit(self._run, context, fn, args, kwargs)
+        self.logger.info(f"Queued job {job_id}: {label}")
+        return job_id
+
+    def _run(self, context, fn, args, kwargs):
+        job_id = context.job_id
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return
+            job.status = RUNNING
+            job.started = time.time()
+
+        status, result, error = DONE, None, None
+        try:
+            context.check_cancelled()
+            result = fn(context, *args, **kwargs)
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            status, error = FAILED, str(e)
+            self.logger.exception(f"Job {job_id} failed")
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.status = status
+                job.result = result
+                job.error = error
+                job.finished = time.time()
+                job.partial = ""  # The result (or the saved post) supersedes it
+                if status == DONE:
+                    job.progress = 100
+            self._futures.pop(job_id, None)
+            self._cancel_events.pop(job_id, None)
+            self._prune()
+        self.logger.info(f"Job {job_id} {status}")
+
+    def _update(self, job_id, stage=None, progress=None, warning=None, partial=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if stage is not None:
+                job.stage = stage
+            if progress is not None:
+                job.progress = max(0, min(100, int(progress)))
+            if partial is not None:
+                job.partial = partial
+            if warning:
+                job.warnings.append(warning)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond ``history``."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Queued jobs never start; running jobs stop at their next
+        progress update.
+
+        Returns:
+            bool: False if the job is unknown or already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            self._cancel_events[job_id].set()
+            if job.status == QUEUED and self._futures[job_id].cancel():
+                job.status = CANCELLED
+                job.finished = time.time()
+                self._futures.pop(job_id, None)
+                self._cancel_events.pop(job_id, None)
+        return True
+
+    def get(self, job_id):
+        """Snapshot of a job, or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job, warnings=list(job.warnings)) if job else None
+
+    def list(self):
+        """Snapshots of every tracked job, newest first."""
+        with self._lock:
+            return [replace(job, warnings=list(job.warnings)) for job in reversed(self._jobs.values())]
+
+    def clear_finished(self):
+        """Forget every finished job; returns how many were removed."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+            for job_id in finished:
+                del self._jobs[job_id]
+        return len(finished)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of tracked jobs per status."""
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait=False):
+        """Cancel queued jobs and stop the worker pool."""
+        with self._lock:
+            for event in self._cancel_events.values():
+                event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,138 @@
+"""
+API key pool for spreading Gemini requests across several keys.
+Each key gets its own requests-per-minute budget and is cooled down after a
+429 / quota error so the next healthy key can take over.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from google.api_core import exceptions as google_exceptions
+from ratelimit import TokenBucket
+
+
+class KeyPoolExhausted(Exception):
+    """Raised when no key becomes usable within the allowed wait."""
+
+
+def is_rate_limit_error(error):
+    """Check whether an exception is a 429 / quota error from the Gemini API."""
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+
+@dataclass
+class _KeyState:
+    key: str
+    bucket: TokenBucket
+    cooldown_until: float = 0.0
+    consecutive_failures: int = 0
+    requests: int = 0
+    rate_limited: int = field(default=0)
+
+
+class ApiKeyPool:
+    """Round-robin pool of API keys with per-key rate limiting and cooldown."""
+
+    def __init__(self, keys, requests_per_minute=15, cooldown=60, max_cooldown=600):
+        keys = list(dict.fromkeys(k for k in keys if k))
+        if not keys:
+            raise ValueError("ApiKeyPool needs at least one API key")
+        self.logger = logging.getLogger(__name__)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._states = [_KeyState(key, TokenBucket.per_minute(requests_per_minute)) for key in keys]
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    @property
+    def keys(self):
+        return [state.key for state in self._states]
+
+    def _state(self, key):
+        for state in self._states:
+            if state.key == key:
+                return state
+        raise KeyError("Unknown API key")
+
+    def _reserve(self):
+        """
+        Pick the next healthy key with budget left, round-robin.
+
+        Returns:
+            tuple: (key, 0) on success, otherwise (None, seconds to wait)
+        """
+        now = time.monotonic()
+        with self._lock:
+            waits = []
+            for offset in range(len(self._states)):
+                index = (self._next + offset) % len(self._states)
+                state = self._states[index]
+                if state.cooldown_until > now:
+                    waits.append(state.cooldown_until - now)
+                    continue
+                wait = state.bucket.try_acquire()
+                if wait == 0:
+                    self._next = index + 1
+                    state.requests += 1
+                    return state.key, 0.0
+                waits.append(wait)
+            return None, min(waits)
+
+    def acquire(self, max_wait=120):
+        """Block until a key is available and return it."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            key, wait = self._reserve()
+            if key:
+                return key
+            if time.monotonic() + wait > deadline:
+                raise KeyPoolExhausted(f"No API key available within {max_wait}s")
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait=120):
+        """Await until a key is available and return it."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            key, wait = self._reserve()
+            if key:
+                return key
+            if time.monotonic() + wait > deadline:
+                raise KeyPoolExhausted(f"No API key available within {max_wait}s")
+            await asyncio.sleep(wait)
+
+    def mark_success(self, key):
+        """Record a successful call, clearing the key's failure streak."""
+        with self._lock:
+            self._state(key).consecutive_failures = 0
+
+    def mark_rate_limited(self, key):
+        """Cool a key down after a 429 / quota error, doubling on repeated hits."""
+        with self._lock:
+            state = self._state(key)
+            state.consecutive_failures += 1
+            state.rate_limited += 1
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** (state.consecutive_failures - 1))
+            state.cooldown_until = time.monotonic() + cooldown
+        self.logger.warning(f"API key ...{key[-4:]} rate limited, cooling down for {cooldown}s")
+
+    def stats(self):
+        """Per-key counters for display and debugging (keys are masked)."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "key": f"...{state.key[-4:]}",
+                    "requests": state.requests,
+                    "rate_limited": state.rate_limited,
+                    "cooling_down": max(0.0, state.cooldown_until - now),
+                }
+                for state in self._states
+            ]
@@ -0,0 +1,58 @@
+"""
+Language detection helpers for article topics.
+langdetect loads all of its language profiles on first use, so it is imported
+lazily and results are memoized per topic.
+"""
+
+import threading
+from functools import lru_cache
+
+# Default ke bahasa Inggris jika deteksi gagal
+DEFAULT_LANGUAGE_NAME = "English"
+
+_detect = None
+_detect_lock = threading.Lock()
+
+
+def _detector():
+    """Import langdetect and load its profiles once, on first use."""
+    global _detect
+    if _detect is None:
+        with _detect_lock:
+            if _detect is None:
+                from langdetect import DetectorFactory, detect
+                from langdetect.detector_factory import init_factory
+
+                # Pastikan deteksi bahasa konsisten
+                DetectorFactory.seed = 0
+                init_factory()
+                _detect = detect
+    return _detect
+
+
+@lru_cache(maxsize=256)
+def language_name(code):
+    """Display name for a language code, e.g. "id" -> "Indonesian"."""
+    try:
+        from langcodes import Language
+        return Language.get(code).display_name()
+    except Exception:
+        return DEFAULT_LANGUAGE_NAME
+
+
+@lru_cache(maxsize=4096)
+def _detect_normalized(text):
+    try:
+        return language_name(_detector()(text))
+    except Exception:
+        return DEFAULT_LANGUAGE_NAME
+
+
+def detect_language(text):
+    """Detect the language of ``text`` and return its display name, memoized per topic."""
+    return _detect_normalized(" ".join(text.split()))
+
+
+def detect_languages(texts):
+    """Detect languages for many topics, running the detector once per distinct topic."""
+    return [detect_language(text) for text in texts]
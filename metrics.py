@@ -0,0 +1,168 @@
+"""
+In-memory metrics for the generation pipeline.
+Counters and histograms are aggregated per label set and can be exported
+in the Prometheus text exposition format.
+"""
+
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    type = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """Current values as a list of (labels dict, value)."""
+        with self._lock:
+            return [(dict(key), value) for key, value in self._values.items()]
+
+    def expose(self):
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        """Current (labels dict, count, sum) per label set."""
+        with self._lock:
+            return [(dict(key), state["count"], state["sum"]) for key, state in self._values.items()]
+
+    def expose(self):
+        lines = []
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), state["counts"]):
+                    cumulative += count
+                    labels = _format_labels(key + (("le", bound if bound == "+Inf" else _format_value(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(state['sum'])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics with Prometheus text export."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every component in the process
+registry = MetricsRegistry()
+
+model_requests = registry.counter(
+    "gemini_requests_total", "Gemini model calls by model, kind of call and outcome."
+)
+model_latency = registry.histogram(
+    "gemini_request_latency_seconds", "Gemini model call latency in seconds.", LATENCY_BUCKETS
+)
+prompt_tokens = registry.histogram(
+    "gemini_prompt_tokens", "Prompt tokens per Gemini model call.", TOKEN_BUCKETS
+)
+output_tokens = registry.histogram(
+    "gemini_output_tokens", "Output tokens per Gemini model call.", TOKEN_BUCKETS
+)
+tokens_total = registry.counter(
+    "gemini_tokens_total", "Tokens used by Gemini model calls, by direction."
+)
+cache_requests = registry.counter(
+    "gemini_cache_requests_total", "Response cache lookups by result."
+)
+
+
+def record_model_call(model, kind, outcome, latency, usage=None):
+    """
+    Record one model call.
+
+    Args:
+        model (str): Model name
+        kind (str): Kind of call, e.g. "title" or "article"
+        outcome (str): "success", "rate_limited" or "error"
+        latency (float): Seconds the call took
+        usage: The response's ``usage_metadata``, if any
+    """
+    labels = {"model": model, "kind": kind}
+    model_requests.inc(outcome=outcome, **labels)
+    model_latency.observe(latency, outcome=outcome, **labels)
+    if usage is None:
+        return
+    prompt = getattr(usage, "prompt_token_count", 0) or 0
+    output = getattr(usage, "candidates_token_count", 0) or 0
+    prompt_tokens.observe(prompt, **labels)
+    output_tokens.observe(output, **labels)
+    tokens_total.inc(prompt, direction="prompt", **labels)
+    tokens_total.inc(output, direction="output", **labels)
@@ -0,0 +1,199 @@
+"""
+AI post generation pipeline: Gemini article, Bing images, assembly, storage.
+Runs as a background job (see jobs.py) and reports its stages through the
+job context instead of touching the Streamlit UI.
+"""
+
+import logging
+from datetime import datetime
+from config import Config
+from client_registry import registry as gemini_registry
+from utils import (generate_post_id, extract_excerpt_from_content, split_title_from_markdown,
+                   build_image_html, responsive_image)
+
+try:
+    from bingimage import BingImageScraper
+    BING_AVAILABLE = True
+except ImportError:
+    BING_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Streamed articles update the stage text at most this often (in characters)
+STREAM_REPORT_CHARS = 500
+
+
+def generate_post(job, store, keyword, language, author, include_images, max_images, image_keyword,
+                  custom_post_id, use_cache=True, mode="stream"):
+    """
+    Generate an AI post and save it to ``store``.
+
+    Args:
+        job (jobs.JobContext): Receives stage and progress updates
+        store (PostStore): Where the finished post is saved
+        mode (str): stream | structured (one JSON call) | long (parallel sections)
+
+    Returns:
+        dict: ``post_id``, ``title``, ``excerpt``, the number of ``images``
+            and Gemini ``cache``/``resilience`` stats
+
+    Raises:
+        RuntimeError: If Gemini returned no usable article, or ``custom_post_id``
+            is already taken (existing posts are never overwritten)
+    """
+    # An explicit ID must be free; fail before paying for any generation
+    if custom_post_id and store.exists(custom_post_id):
+        raise RuntimeError(f"ID '{custom_post_id}' sudah digunakan")
+
+    # Step 1: Initialize Gemini
+    job.update("🤖 Menginisialisasi Gemini AI...", 10)
+    gemini = gemini_registry.get_scraper()
+
+    # Step 2: Generate content
+    job.update("✍️ Menghasilkan konten artikel...", 30)
+    excerpt = None
+    tags = []
+    if mode == "structured":
+        # Title, excerpt, tags and body from a single call
+        post_data = gemini.generate_post(keyword, language, use_cache=use_cache)
+        if not post_data:
+            raise RuntimeError("Gagal menghasilkan konten artikel")
+
+        job.update("📝 Memproses konten...", 50)
+        title = post_data["title"]
+        content = post_data["body"]
+        excerpt = post_data["excerpt"]
+        tags = post_data["tags"]
+        post_id = custom_post_id if custom_post_id else post_data["slug"]
+    else:
+        if mode == "long":
+            # Outline first, then every section in parallel
+            article_content = gemini.generate_long_article(keyword, language, use_cache=use_cache) or ""
+        else:
+            # Publish the article progressively; the dashboard renders it as it grows
+            article_content = ""
+            reported = 0
+            for chunk in gemini.stream_article(keyword, language, use_cache=use_cache):
+                article_content += chunk
+                job.stream(article_content)
+                if len(article_content) - reported >= STREAM_REPORT_CHARS:
+                    reported = len(article_content)
+                    job.update(f"✍️ Menulis artikel... ({reported} karakter)")
+        article_content = article_content.strip()
+
+        if len(article_content) <= 200:
+            raise RuntimeError("Gagal menghasilkan konten artikel")
+
+        # Step 3: Extract title and content
+        job.update("📝 Memproses konten...", 50)
+        title, content = split_title_from_markdown(article_content, keyword)
+        post_id = custom_post_id if custom_post_id else generate_post_id(title)
+
+    # Step 4: Get images if requested
+    images = []
+    if include_images and BING_AVAILABLE:
+        job.update("🖼️ Mencari gambar...", 70)
+        images = find_images(job, image_keyword if image_keyword else keyword, max_images)
+
+    # Step 5: Insert images into content
+    if images:
+        job.update("🎨 Menyisipkan gambar ke konten...", 85)
+        content = insert_images_to_content(content, images, keyword)
+
+    # Step 6: Create post
+    job.update("💾 Menyimpan post...", 95)
+    if not excerpt:
+        excerpt = extract_excerpt_from_content(content)
+
+    # Never overwrite an existing post; a generated slug gets a numeric suffix
+    if not custom_post_id:
+        post_id = store.unique_id(post_id)
+
+    added = store.add({
+        "id": post_id,
+        "title": title,
+        "author": author,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "excerpt": excerpt,
+        "content": content,
+        "generated_by": "AI",
+        "keyword": keyword,
+        "language": language,
+        "tags": tags
+    })
+    if not added:
+        # Another job claimed the same ID between the check and the insert
+        raise RuntimeError(f"ID '{post_id}' sudah digunakan")
+    job.update("✅ Post berhasil di-generate!", 100)
+    return {
+        "post_id": post_id,
+        "title": title,
+        "excerpt": excerpt,
+        "images": len(images),
+        "cache": gemini.cache_stats(),
+        "resilience": gemini.resilience_stats()
+    }
+
+
+def find_images(job, query, max_images):
+    """Images for a post; problems are recorded as job warnings, not failures."""
+    try:
+        bing_scraper = BingImageScraper()
+        try:
+            base_url = Config().IMAGE_BASE_URL
+            if base_url:
+                # Self-hosted: download and serve responsive WebP/JPEG variants
+                paths = bing_scraper.download_images(query, max_images)
+                images = [responsive_image(description, base_url)
+                          for description in bing_scraper.create_variants(paths) if description]
+            else:
+                # Hotlinked: probed candidates carry their dimensions
+                images = [
+                    {"src": candidate.url, "width": candidate.width, "height": candidate.height}
+                    for candidate in bing_scraper.get_images(query, max_images)
+                ]
+        finally:
+            bing_scraper.close()
+    except Exception as e:
+        logger.warning(f"Image search for '{query}' failed: {e}")
+        job.warn(f"Error saat mencari gambar: {e}")
+        return []
+
+    if not images:
+        job.warn("Tidak ada gambar yang ditemukan")
+    return images
+
+
+def insert_images_to_content(content, images, keyword):
+    """
+    Insert images into content at strategic positions.
+
+    ``images`` holds URLs or image dicts (see ``utils.build_image_html``);
+    dicts with dimensions and srcset render as responsive, lazy-loaded images.
+    """
+    if not images:
+        return content
+
+    lines = content.split('\n')
+    new_lines = []
+    image_index = 0
+
+    # Insert images after headings and between sections
+    heading_count = 0
+
+    for i, line in enumerate(lines):
+        new_lines.append(line)
+
+        # Check if this line is a heading (starts with **)
+        if line.strip().startswith('**') and line.strip().endswith(':**'):
+            heading_count += 1
+
+            # Insert image after every 2nd heading (skip first heading)
+            if heading_count > 1 and heading_count % 2 == 0 and image_index < len(images):
+                new_lines.append("")  # Empty line
+                new_lines.append(build_image_html(images[image_index], keyword))
+                new_lines.append(f'<p style="text-align: center; font-size: 0.9rem; color: #666; margin-top: 0.5rem;"><em>{keyword.title()}</em></p>')
+                new_lines.append("")  # Empty line
+                image_index += 1
+
+    return '\n'.join(new_lines)
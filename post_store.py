@@ -0,0 +1,230 @@
+"""
+Persistent post storage backed by SQLite.
+Posts are written as they are created and queried by page, with indexes on
+the fields the dashboard filters and sorts by.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+# Post fields stored in their own columns; anything else (tags, ...) goes into ``extra``
+COLUMNS = ("id", "title", "author", "date", "excerpt", "content", "generated_by", "keyword", "language")
+# Fields returned by list queries; content is only loaded for single posts
+SUMMARY_COLUMNS = tuple(column for column in COLUMNS if column != "content")
+FILTERS = ("author", "keyword", "language", "generated_by")
+# Writes of at least this many posts refresh the query planner's statistics
+BULK_SIZE = 100
+
+
+def _and(where, clause):
+    """Add a condition to a ``WHERE`` clause built by :meth:`PostStore._where`."""
+    return f"{where} AND {clause}" if where else f" WHERE {clause}"
+
+
+class PostStore:
+    """SQLite-backed post store with paged, filtered queries."""
+
+    def __init__(self, path=".data/posts.sqlite3"):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL UNIQUE,"
+            " title TEXT,"
+            " author TEXT,"
+            " date TEXT,"
+            " excerpt TEXT,"
+            " content TEXT,"
+            " generated_by TEXT,"
+            " keyword TEXT,"
+            " language TEXT,"
+            " extra TEXT NOT NULL DEFAULT '{}',"
+            " updated REAL NOT NULL)"
+        )
+        # Newest first is the default order, so every index ends with date and seq
+        self._conn.execute("CREATE INDEX IF NOT EXISTS posts_date ON posts (date, seq)")
+        for column in FILTERS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS posts_{column} ON posts ({column}, date, seq)")
+        self._analyze()
+        self._conn.commit()
+
+    def _analyze(self):
+        """
+        Refresh index statistics so filtered queries pick the most selective
+        index (e.g. author over language); about 0.1s at 100k posts.
+        """
+        self._conn.execute("ANALYZE posts")
+
+    def _row(self, post):
+        extra = {key: value for key, value in post.items() if key not in COLUMNS}
+        values = [post.get(column) for column in COLUMNS]
+        return values + [json.dumps(extra, ensure_ascii=False), time.time()]
+
+    def _post(self, row):
+        post = {key: row[key] for key in row.keys() if key in COLUMNS}
+        post.update(json.loads(row["extra"]))
+        # Drop optional fields the post never had, so exports round-trip
+        return {key: value for key, value in post.items() if value is not None}
+
+    def save(self, post):
+        """Insert a post, or update the existing post with the same id (see :meth:`add`)."""
+        self.save_many([post])
+
+    def add(self, post):
+        """
+        Insert a new post without touching an existing one.
+
+        Returns:
+            bool: False if a post with the same id already exists
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        f"INSERT INTO posts ({', '.join(COLUMNS)}, extra, updated)"
+                        f" VALUES ({', '.join('?' for _ in COLUMNS)}, ?, ?)",
+                        self._row(post),
+                    )
+            except sqlite3.IntegrityError:
+                return False
+        return True
+
+    def unique_id(self, post_id):
+        """``post_id``, or ``post_id-2``, ``post_id-3``, ... if it is taken."""
+        candidate, suffix = post_id, 2
+        while self.exists(candidate):
+            candidate = f"{post_id}-{suffix}"
+            suffix += 1
+        return candidate
+
+    def save_many(self, posts):
+        """Insert or update many posts in one transaction."""
+        with self._lock:
+            with self._conn:
+                self._upsert(posts)
+                if len(posts) >= BULK_SIZE:
+                    self._analyze()
+
+    def replace_all(self, posts):
+        """Replace every post in one transaction, e.g. when importing a backup."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM posts")
+                self._upsert(posts)
+                self._analyze()
+
+    def _upsert(self, posts):
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[1:])
+        self._conn.executemany(
+            f"INSERT INTO posts ({', '.join(COLUMNS)}, extra, updated) VALUES ({placeholders}, ?, ?)"
+            f" ON CONFLICT(id) DO UPDATE SET {updates}, extra = excluded.extra, updated = excluded.updated",
+            [self._row(post) for post in posts],
+        )
+
+    def get(self, post_id):
+        """Full post by id, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return self._post(row) if row else None
+
+    def exists(self, post_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM posts WHERE id = ?", (post_id,)).fetchone() is not None
+
+    def delete(self, post_id):
+        """Delete a post; returns True if it existed."""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+        return cursor.rowcount > 0
+
+    def _where(self, filters):
+        clauses, params = [], []
+        for column in FILTERS:
+            value = filters.get(column)
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def page(self, after=None, limit=20, with_content=False, **filters):
+        """
+        One page of posts, newest first.
+
+        Pages are keyset-paginated on ``(date, seq)``: each starts right after
+        the cursor of the previous one through the date indexes, so page 500
+        costs the same as page 1 (an OFFSET would step over every earlier row).
+
+        Args:
+            after (tuple): Cursor returned with the previous page, None for the first
+            limit (int): Page size, or None for every remaining post
+            with_content (bool): Include the full content of each post
+            **filters: Exact matches on author, keyword, language or generated_by
+
+        Returns:
+            tuple: (list of post dicts, cursor of the next page or None after the last)
+        """
+        columns = ", ".join(("seq",) + (COLUMNS if with_content else SUMMARY_COLUMNS) + ("extra",))
+        where, params = self._where(filters)
+        limit = -1 if limit is None else limit
+        with self._lock:
+            if after is None:
+                rows = self._select(columns, where, params, limit)
+            elif after[0] is not None:
+                rows = self._select(columns, _and(where, "(date, seq) < (?, ?)"), params + list(after), limit)
+                # Posts without a date sort after every dated one
+                if limit < 0 or len(rows) < limit:
+                    rows += self._select(columns, _and(where, "date IS NULL"), params,
+                                         limit if limit < 0 else limit - len(rows))
+            else:
+                rows = self._select(columns, _and(where, "date IS NULL AND seq < ?"), params + [after[1]], limit)
+        cursor = (rows[-1]["date"], rows[-1]["seq"]) if rows and len(rows) == limit else None
+        return [self._post(row) for row in rows], cursor
+
+    def _select(self, columns, where, params, limit):
+        return self._conn.execute(
+            f"SELECT {columns} FROM posts{where} ORDER BY date DESC, seq DESC LIMIT ?", params + [limit]
+        ).fetchall()
+
+    def list(self, limit=20, after=None, with_content=False, **filters):
+        """Posts of one page, newest first, without the cursor (see :meth:`page`)."""
+        return self.page(after, limit, with_content, **filters)[0]
+
+    def count(self, **filters):
+        """Number of posts matching ``filters``."""
+        where, params = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM posts{where}", params).fetchone()[0]
+
+    def distinct(self, column):
+        """Sorted distinct non-empty values of a filter column, for filter choices."""
+        if column not in FILTERS:
+            raise ValueError(f"Not a filter column: {column}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {column} FROM posts WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def all(self):
+        """Every post with content, in the order they were created."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM posts ORDER BY seq").fetchall()
+        return [self._post(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,191 @@
+"""
+Rate limiting primitives shared by the API clients.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute):
+        """Bucket allowing ``requests_per_minute`` with a burst of one minute's quota."""
+        return cls(requests_per_minute / 60.0, capacity=requests_per_minute)
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def set_rate(self, rate):
+        """Change the refill rate, keeping the tokens accrued so far."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def try_acquire(self, tokens=1):
+        """
+        Take ``tokens`` if available.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until they will be
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            if self.rate <= 0:
+                return float("inf")
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available and take them."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Await until ``tokens`` are available and take them."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a host doesn't allow a request within the allowed wait."""
+
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+
+@dataclass
+class _HostState:
+    bucket: TokenBucket
+    base_rate: float
+    cooldown_until: float = 0.0
+    consecutive_throttles: int = 0
+    requests: int = 0
+    throttled: int = 0
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets with adaptive backoff and a global concurrency cap.
+
+    Each host starts at ``rate`` requests per second (or its entry in
+    ``host_rates``). A 429 / 503 halves the host's rate and cools it down,
+    honouring ``Retry-After``; successful responses raise the rate back
+    towards its base in small steps.
+    """
+
+    def __init__(self, rate=4.0, burst=4, max_concurrency=16, host_rates=None,
+                 cooldown=2.0, max_cooldown=120.0, min_rate=0.1):
+        self.logger = logging.getLogger(__name__)
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = dict(host_rates or {})
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.min_rate = min_rate
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _state(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                rate = self.host_rates.get(host, self.rate)
+                state = self._hosts[host] = _HostState(TokenBucket(rate, capacity=self.burst), rate)
+            return state
+
+    def acquire(self, url, max_wait=None):
+        """
+        Block until the URL's host allows another request and take a token.
+
+        Raises:
+            RateLimitTimeout: If that would take longer than ``max_wait`` seconds
+        """
+        state = self._state(urlparse(url).hostname or "")
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            wait = state.cooldown_until - time.monotonic()
+            if wait <= 0:
+                wait = state.bucket.try_acquire()
+                if wait == 0:
+                    with self._lock:
+                        state.requests += 1
+                    return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"{urlparse(url).hostname} is rate limited for another {wait:.1f}s")
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self, url, max_wait=None):
+        """Hold a host token and one of the global connection slots for a request."""
+        self.acquire(url, max_wait)
+        if not self._slots.acquire(timeout=max_wait):
+            raise RateLimitTimeout("All connection slots are busy")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def record(self, url, status_code, retry_after=None):
+        """Adapt the host's rate to a response status."""
+        host = urlparse(url).hostname or ""
+        state = self._state(host)
+        if status_code in THROTTLE_STATUSES:
+            with self._lock:
+                state.consecutive_throttles += 1
+                state.throttled += 1
+                cooldown = min(self.max_cooldown, self.cooldown * 2 ** (state.consecutive_throttles - 1))
+                if retry_after is not None and str(retry_after).strip().isdigit():
+                    cooldown = min(self.max_cooldown, max(cooldown, float(retry_after)))
+                state.cooldown_until = time.monotonic() + cooldown
+                rate = max(self.min_rate, state.bucket.rate / 2)
+            state.bucket.set_rate(rate)
+            self.logger.warning(f"{host} returned {status_code}, backing off for {cooldown:.0f}s at {rate:.2f} req/s")
+        elif status_code < 400:
+            with self._lock:
+                state.consecutive_throttles = 0
+                if state.bucket.rate >= state.base_rate:
+                    return
+                rate = min(state.base_rate, state.bucket.rate + state.base_rate / 10)
+            state.bucket.set_rate(rate)
+
+    def stats(self):
+        """Per-host counters for display and debugging."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "host": host,
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                    "rate": state.bucket.rate,
+                    "cooling_down": max(0.0, state.cooldown_until - now),
+                }
+                for host, state in self._hosts.items()
+            ]
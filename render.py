@@ -0,0 +1,84 @@
+"""
+Markdown to HTML rendering with an in-memory cache.
+Rendered HTML is keyed by a hash of the markdown, so a post is converted once
+per content change no matter how often it is displayed.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import markdown
+
+
+class MarkdownRenderer:
+    """Renders markdown to HTML, keeping recent results in a size-bounded LRU cache."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, extensions=()):
+        self.logger = logging.getLogger(__name__)
+        self.max_bytes = max_bytes
+        self.extensions = list(extensions)
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, content):
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def render(self, content):
+        """
+        HTML for a markdown document.
+
+        Args:
+            content (str): Markdown source
+
+        Returns:
+            str: Rendered HTML
+        """
+        if not content:
+            return ""
+        key = self._key(content)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        # markdown.Markdown instances are not thread-safe; use a fresh one per call
+        html = markdown.markdown(content, extensions=self.extensions)
+        self._store(key, html)
+        return html
+
+    def _store(self, key, html):
+        size = len(html.encode("utf-8"))
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = html
+            self._size += size
+            evicted = 0
+            while self.max_bytes and self._size > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old.encode("utf-8"))
+                evicted += 1
+        if evicted:
+            self.logger.debug(f"Evicted {evicted} rendered documents")
+
+    def clear(self):
+        """Drop every cached document and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
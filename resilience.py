@@ -0,0 +1,280 @@
+"""
+Retry, backoff and request hedging for slow or flaky API calls.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+import grpc
+from google.api_core import exceptions as google_exceptions
+
+RETRYABLE_ERRORS = (
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+# 429 / quota errors; the key pool fails these over, retrying here would only add load
+RATE_LIMIT_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+RETRYABLE_GRPC_CODES = (grpc.StatusCode.INTERNAL, grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+
+def _status(error):
+    """
+    Status carried by an API error: the HTTP ``.code`` or ``.response.status_code``,
+    or the gRPC status code, if any.
+    """
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    grpc_code = getattr(error, "grpc_status_code", None)
+    if grpc_code is None and isinstance(error, grpc.RpcError) and callable(code):
+        grpc_code = code()
+    if grpc_code is not None:
+        return grpc_code
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable_error(error):
+    """
+    Check whether an exception is a transient 5xx / timeout worth retrying.
+
+    Decided by exception type and status code only, never by message text.
+    Rate limit errors are never retried here; the key pool handles them.
+    """
+    if isinstance(error, RATE_LIMIT_ERRORS):
+        return False
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = _status(error)
+    return status in RETRYABLE_STATUS_CODES or status in RETRYABLE_GRPC_CODES
+
+
+@dataclass
+class RetryPolicy:
+    """Tuning knobs for :class:`Resilience`."""
+
+    deadline: float = 90.0  # Seconds per attempt
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20  # Latencies needed before hedging kicks in
+    hedge_budget: float = 0.05  # Hedges allowed per call, as each one costs a request
+    max_stragglers: int = 2  # Losing sync attempts still running before hedging pauses
+
+    def backoff(self, attempt):
+        """Exponential backoff with full jitter for retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies per kind of call."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind, latency):
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self.window)).append(latency)
+
+    def quantile(self, kind, q, min_samples=1):
+        """Latency at quantile ``q``, or None with fewer than ``min_samples`` samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(kind, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Resilience:
+    """Runs calls with per-attempt deadlines, jittered retries and optional hedging."""
+
+    def __init__(self, policy=None, max_workers=8):
+        self.logger = logging.getLogger(__name__)
+        self.policy = policy or RetryPolicy()
+        self.latency = LatencyTracker()
+        self.counters = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = None
+        self._stragglers = 0
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        """Counters for retries and hedges, for tuning tail latency."""
+        with self._lock:
+            return dict(self.counters)
+
+    def _hedge_after(self, kind, hedge):
+        """Seconds to wait before firing a hedge, or None if hedging is off."""
+        if not (self.policy.hedge if hedge is None else hedge):
+            return None
+        with self._lock:
+            # Keep duplicate requests to a small share of the key budget
+            if self.counters["hedges"] >= self.policy.hedge_budget * self.counters["calls"]:
+                return None
+        return self.latency.quantile(kind, self.policy.hedge_quantile, self.policy.hedge_min_samples)
+
+    def call(self, fn, kind="default", hedge=None):
+        """
+        Run ``fn(timeout)`` with retries and, if enabled, hedging.
+
+        Args:
+            fn (callable): Makes one attempt; receives the per-attempt deadline
+            kind (str): Groups latencies so each kind of call has its own p95
+            hedge (bool): Override the policy's hedging setting for this call
+
+        Returns:
+            Whatever ``fn`` returns
+        """
+        self._count("calls")
+        for attempt in range(self.policy.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                hedge_after = self._hedge_after(kind, hedge)
+                if hedge_after is None:
+                    result = fn(self.policy.deadline)
+                else:
+                    result = self._hedged(fn, hedge_after)
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == self.policy.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self.policy.backoff(attempt)
+                self._count("retries")
+                self.logger.warning(f"Retrying {kind} call in {delay:.1f}s after: {str(e)}")
+                time.sleep(delay)
+                continue
+            self.latency.record(kind, time.perf_counter() - start)
+            return result
+
+    def _hedged(self, fn, hedge_after):
+        """
+        Run ``fn`` and fire a duplicate if it hasn't finished after ``hedge_after`` seconds.
+
+        A blocking call can't be cancelled, so the losing attempt runs on until
+        it finishes or hits its deadline, still spending a request on its key.
+        That cost is bounded by ``RetryPolicy.hedge_budget`` and, while
+        ``RetryPolicy.max_stragglers`` losers are still running, no new hedge
+        is fired. Prefer the async path, where the loser is cancelled.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="hedge")
+        primary = self._executor.submit(fn, self.policy.deadline)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+        with self._lock:
+            straggling = self._stragglers >= self.policy.max_stragglers
+        if straggling:
+            return primary.result()
+
+        self._count("hedges")
+        backup = self._executor.submit(fn, self.policy.deadline)
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is backup:
+                            self._count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in pending:
+                self._track_straggler(future)
+
+    def _track_straggler(self, future):
+        """Count a losing attempt until it finishes."""
+        with self._lock:
+            self._stragglers += 1
+
+        def finished(_):
+            with self._lock:
+                self._stragglers -= 1
+
+        future.add_done_callback(finished)
+
+    def _attempt_async(self, fn, enforce_deadline):
+        """One awaitable attempt, bounded by the deadline unless ``fn`` applies it itself."""
+        deadline = self.policy.deadline
+        return asyncio.wait_for(fn(deadline), deadline) if enforce_deadline else fn(deadline)
+
+    async def call_async(self, fn, kind="default", hedge=None, enforce_deadline=True):
+        """
+        Async variant of :meth:`call`; ``fn(timeout)`` returns an awaitable.
+
+        Args:
+            enforce_deadline (bool): Cancel attempts that outlive the deadline.
+                Pass False when ``fn`` applies the timeout to the request itself,
+                so time spent queueing (e.g. for an API key) isn't counted.
+        """
+        self._count("calls")
+        for attempt in range(self.policy.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                hedge_after = self._hedge_after(kind, hedge)
+                if hedge_after is None:
+                    result = await self._attempt_async(fn, enforce_deadline)
+                else:
+                    result = await self._hedged_async(fn, hedge_after, enforce_deadline)
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == self.policy.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self.policy.backoff(attempt)
+                self._count("retries")
+                self.logger.warning(f"Retrying {kind} call in {delay:.1f}s after: {str(e)}")
+                await asyncio.sleep(delay)
+                continue
+            self.latency.record(kind, time.perf_counter() - start)
+            return result
+
+    async def _hedged_async(self, fn, hedge_after, enforce_deadline=True):
+        """Async variant of :meth:`_hedged`; the losing attempt is cancelled."""
+        primary = asyncio.ensure_future(self._attempt_async(fn, enforce_deadline))
+        done, _ = await asyncio.wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        backup = asyncio.ensure_future(self._attempt_async(fn, enforce_deadline))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                # Retrieve the loser's outcome so asyncio doesn't log it as unhandled
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
@@ -0,0 +1,273 @@
+"""
+Build-time rendering of the blog into static HTML pages.
+Markdown is converted once and every page (home, posts, categories, tags) is
+filled into the template here, so the worker only looks pages up by route.
+"""
+
+import html
+import logging
+from typing import Dict, List
+from urllib.parse import quote
+from render import MarkdownRenderer
+from utils import generate_post_id
+
+HOME_ROUTE = "/"
+NOT_FOUND_ROUTE = "/404"
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            background: #f8f9fa;
+        }}
+        .container {{
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+        }}
+        header {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            text-align: center;
+            padding: 3rem 2rem;
+            border-radius: 15px;
+            margin-bottom: 2rem;
+            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+        }}
+        .blog-title {{
+            font-size: 2.5rem;
+            font-weight: 700;
+            margin-bottom: 0.5rem;
+        }}
+        .blog-subtitle {{
+            font-size: 1.1rem;
+            opacity: 0.9;
+        }}
+        .post-card {{
+            background: white;
+            border-radius: 12px;
+            padding: 2rem;
+            margin-bottom: 2rem;
+            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
+            transition: transform 0.3s ease;
+        }}
+        .post-card:hover {{
+            transform: translateY(-2px);
+        }}
+        .post-title {{
+            font-size: 1.5rem;
+            font-weight: 600;
+            margin-bottom: 0.5rem;
+            color: #2d3748;
+        }}
+        .post-meta {{
+            color: #718096;
+            font-size: 0.9rem;
+            margin-bottom: 1rem;
+        }}
+        .post-meta a {{
+            color: #667eea;
+            text-decoration: none;
+        }}
+        .post-content {{
+            color: #4a5568;
+            line-height: 1.7;
+        }}
+        .post-content h1, .post-content h2, .post-content h3 {{
+            color: #2d3748;
+            margin: 1.5rem 0 0.75rem;
+        }}
+        .post-content p, .post-content ul, .post-content ol {{
+            margin-bottom: 1rem;
+        }}
+        .post-content ul, .post-content ol {{
+            padding-left: 1.5rem;
+        }}
+        .post-link {{
+            display: inline-block;
+            color: #667eea;
+            text-decoration: none;
+            font-weight: 500;
+            margin-top: 1rem;
+        }}
+        .post-link:hover {{
+            color: #764ba2;
+        }}
+        .post-detail {{
+            max-width: 900px;
+        }}
+        .back-link {{
+            display: inline-block;
+            color: #667eea;
+            text-decoration: none;
+            margin-bottom: 2rem;
+            font-weight: 500;
+        }}
+        .back-link:hover {{
+            color: #764ba2;
+        }}
+        .tag {{
+            display: inline-block;
+            background: #edf2f7;
+            color: #4a5568;
+            border-radius: 999px;
+            padding: 0.1rem 0.75rem;
+            margin: 0.25rem 0.25rem 0 0;
+            font-size: 0.85rem;
+            text-decoration: none;
+        }}
+        @media (max-width: 768px) {{
+            .container {{
+                padding: 10px;
+            }}
+            .blog-title {{
+                font-size: 2rem;
+            }}
+            .post-card {{
+                padding: 1.5rem;
+            }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        {content}
+    </div>
+</body>
+</html>
+"""
+
+
+def post_route(post_id):
+    return f"/post/{post_id}"
+
+
+def category_route(name):
+    return f"/category/{generate_post_id(name)}"
+
+
+def tag_route(name):
+    return f"/tag/{generate_post_id(name)}"
+
+
+def _tags(post):
+    """Tags of a post that produce a usable slug."""
+    return [str(tag) for tag in post.get("tags") or [] if generate_post_id(str(tag))]
+
+
+def _category(post):
+    category = post.get("category")
+    return category if category and generate_post_id(category) else None
+
+
+def _href(route):
+    """Route as a link target; post ids and slugs may need percent-encoding."""
+    return html.escape(quote(route))
+
+
+class SiteBuilder:
+    """Renders posts into a ``{route: html}`` map of every page of the blog."""
+
+    def __init__(self, renderer=None, title="Blog Saya", subtitle="Berbagi pemikiran dan pengalaman"):
+        self.logger = logging.getLogger(__name__)
+        self.renderer = renderer or MarkdownRenderer()
+        self.title = title
+        self.subtitle = subtitle
+
+    def build(self, posts):
+        """
+        Render every page.
+
+        Args:
+            posts (list): Full post dicts (with content)
+
+        Returns:
+            dict: Route (``/``, ``/post/<id>``, ``/category/<slug>``,
+                ``/tag/<slug>``, ``/404``) -> complete HTML document
+        """
+        posts = sorted(posts, key=lambda post: post.get("date") or "", reverse=True)
+        categories, tags = {}, {}
+        for post in posts:
+            if _category(post):
+                categories.setdefault(category_route(post["category"]), (post["category"], []))[1].append(post)
+            for tag in _tags(post):
+                tags.setdefault(tag_route(tag), (tag, []))[1].append(post)
+
+        pages = {
+            HOME_ROUTE: self._page(self.title, self._header(f"📝 {self.title}", self.subtitle) + self._cards(posts)),
+            NOT_FOUND_ROUTE: self._page("404 Not Found", self._header("404", "Post tidak ditemukan") + (
+                '<div class="post-card"><a href="/" class="back-link">← Kembali ke beranda</a></div>'
+            )),
+        }
+        for post in posts:
+            pages[post_route(post["id"])] = self._post_page(post)
+        for route, (name, category_posts) in categories.items():
+            pages[route] = self._listing_page(f"📁 {name}", f"Kategori · {len(category_posts)} post", category_posts)
+        for route, (name, tag_posts) in tags.items():
+            pages[route] = self._listing_page(f"🏷️ {name}", f"Tag · {len(tag_posts)} post", tag_posts)
+        self.logger.info(f"Built {len(pages)} pages from {len(posts)} posts")
+        return pages
+
+    def _page(self, title, content):
+        return HTML_TEMPLATE.format(title=html.escape(title), content=content)
+
+    def _header(self, title, subtitle):
+        return (
+            f'<header><h1 class="blog-title">{html.escape(title)}</h1>'
+            f'<p class="blog-subtitle">{html.escape(subtitle)}</p></header>'
+        )
+
+    def _meta(self, post):
+        meta = f"📅 {html.escape(post.get('date') or '')} | ✍️ {html.escape(post.get('author') or '')}"
+        category = _category(post)
+        if category:
+            meta += f' | 📁 <a href="{_href(category_route(category))}">{html.escape(category)}</a>'
+        return f'<div class="post-meta">{meta}</div>'
+
+    def _cards(self, posts: List[Dict]) -> str:
+        return "".join(
+            f'<div class="post-card">'
+            f'<h2 class="post-title">{html.escape(post.get("title") or "")}</h2>'
+            f'{self._meta(post)}'
+            f'<div class="post-content">{html.escape(post.get("excerpt") or "")}</div>'
+            f'<a href="{_href(post_route(post["id"]))}" class="post-link">Baca selengkapnya →</a>'
+            f'</div>'
+            for post in posts
+        )
+
+    def _listing_page(self, title, subtitle, posts):
+        content = (
+            '<a href="/" class="back-link">← Kembali ke beranda</a>'
+            + self._header(title, subtitle)
+            + self._cards(posts)
+        )
+        return self._page(f"{title} - {self.title}", content)
+
+    def _post_page(self, post):
+        tags = "".join(
+            f'<a href="{_href(tag_route(tag))}" class="tag">#{html.escape(tag)}</a>'
+            for tag in _tags(post)
+        )
+        content = (
+            '<div class="post-detail">'
+            '<a href="/" class="back-link">← Kembali ke beranda</a>'
+            '<div class="post-card">'
+            f'<h1 class="post-title">{html.escape(post.get("title") or "")}</h1>'
+            f'{self._meta(post)}'
+            f'<div class="post-content">{self.renderer.render(post.get("content") or "")}</div>'
+            f'{f"<div>{tags}</div>" if tags else ""}'
+            '</div></div>'
+        )
+        return self._page(post.get("title") or self.title, content)
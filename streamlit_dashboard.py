@@ -4,25 +4,25 @@ import json
 import os
 from datetime import datetime
 import base64
-import markdown
 import re
-from utils import generate_post_id, extract_excerpt_from_content, truncate_text
+from config import Config
+import metrics
+from post_store import PostStore
+from render import MarkdownRenderer
+from site_builder import SiteBuilder
+from deploy import CloudflareKV, FileKV, IncrementalDeployer, forget_worker, pages_worker_script, publish_worker
+from jobs import JobQueue, QUEUED, RUNNING, DONE, FAILED, CANCELLED
+from utils import truncate_text
 
 # Import AI modules with error handling
 try:
-    from gemini import GeminiScraper
+    from client_registry import registry as gemini_registry
+    from post_generator import generate_post
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
     st.warning("⚠️ Gemini AI tidak tersedia. Install: pip install google-generativeai langdetect langcodes")
 
-try:
-    from bingimage import BingImageScraper
-    BING_AVAILABLE = True
-except ImportError:
-    BING_AVAILABLE = False
-    st.warning("⚠️ Bing Image scraper tidak tersedia. Install: pip install beautifulsoup4 pillow")
-
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Blog Management Dashboard",
@@ -67,12 +67,26 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_post_store():
+    """PostStore bersama untuk semua sesi dan tab browser"""
+    return PostStore(Config().POST_STORE_PATH)
+
+@st.cache_resource
+def get_job_queue():
+    """Antrian job latar belakang bersama; job tetap jalan walau tab ditutup"""
+    config = Config()
+    return JobQueue(config.JOB_WORKERS, config.JOB_HISTORY)
+
+@st.cache_resource
+def get_markdown_renderer():
+    """Cache HTML preview bersama, dibatasi MARKDOWN_CACHE_MAX_MB"""
+    return MarkdownRenderer(Config().MARKDOWN_CACHE_MAX_MB * 1024 * 1024)
+
 def init_session_state():
     """Initialize session state variables"""
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
-    if 'posts' not in st.session_state:
-        st.session_state.posts = []
     if 'cf_account_id' not in st.session_state:
         st.session_state.cf_account_id = ""
     if 'cf_api_token' not in st.session_state:
@@ -228,199 +242,9 @@ def deploy_worker(script_content):
         return False
 
 def generate_worker_script():
-    """Generate worker script dengan posts dari session state"""
-    posts_json = json.dumps(st.session_state.posts, indent=2)
-    
-    return f"""
-// Blog Worker untuk Cloudflare
-addEventListener('fetch', event => {{
-  event.respondWith(handleRequest(event.request))
-}})
-
-const posts = {posts_json};
-
-const HTML_TEMPLATE = `
-<!DOCTYPE html>
-<html lang="id">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{{{title}}}}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f8f9fa;
-        }}
-        .container {{
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            text-align: center;
-            padding: 3rem 2rem;
-            border-radius: 15px;
-            margin-bottom: 2rem;
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-        }}
-        .blog-title {{
-            font-size: 2.5rem;
-            font-weight: 700;
-            margin-bottom: 0.5rem;
-        }}
-        .blog-subtitle {{
-            font-size: 1.1rem;
-            opacity: 0.9;
-        }}
-        .post-card {{
-            background: white;
-            border-radius: 12px;
-            padding: 2rem;
-            margin-bottom: 2rem;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            transition: transform 0.3s ease;
-        }}
-        .post-card:hover {{
-            transform: translateY(-2px);
-        }}
-        .post-title {{
-            font-size: 1.5rem;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-            color: #2d3748;
-        }}
-        .post-meta {{
-            color: #718096;
-            font-size: 0.9rem;
-            margin-bottom: 1rem;
-        }}
-        .post-content {{
-            color: #4a5568;
-            line-height: 1.7;
-        }}
-        .post-link {{
-            display: inline-block;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-            margin-top: 1rem;
-        }}
-        .post-link:hover {{
-            color: #764ba2;
-        }}
-        .post-detail {{
-            max-width: 900px;
-        }}
-        .back-link {{
-            display: inline-block;
-            color: #667eea;
-            text-decoration: none;
-            margin-bottom: 2rem;
-            font-weight: 500;
-        }}
-        .back-link:hover {{
-            color: #764ba2;
-        }}
-        @media (max-width: 768px) {{
-            .container {{
-                padding: 10px;
-            }}
-            .blog-title {{
-                font-size: 2rem;
-            }}
-            .post-card {{
-                padding: 1.5rem;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        {{{{content}}}}
-    </div>
-</body>
-</html>
-`;
-
-async function handleRequest(request) {{
-  const url = new URL(request.url);
-  const path = url.pathname;
-
-  if (path === '/') {{
-    return new Response(getHomePage(), {{
-      headers: {{ 'Content-Type': 'text/html' }}
-    }});
-  }}
-
-  if (path.startsWith('/post/')) {{
-    const postId = path.replace('/post/', '');
-    return new Response(getPostPage(postId), {{
-      headers: {{ 'Content-Type': 'text/html' }}
-    }});
-  }}
-
-  return new Response('404 Not Found', {{ status: 404 }});
-}}
-
-function getHomePage() {{
-  const postsHtml = posts.map(post => `
-    <div class="post-card">
-      <h2 class="post-title">${{post.title}}</h2>
-      <div class="post-meta">📅 ${{post.date}} | ✍️ ${{post.author}}</div>
-      <div class="post-content">${{post.excerpt}}</div>
-      <a href="/post/${{post.id}}" class="post-link">Baca selengkapnya →</a>
-    </div>
-  `).join('');
-
-  const content = `
-    <header>
-      <h1 class="blog-title">📝 Blog Saya</h1>
-      <p class="blog-subtitle">Berbagi pemikiran dan pengalaman</p>
-    </header>
-    ${{postsHtml}}
-  `;
-
-  return HTML_TEMPLATE.replace('{{{{title}}}}', 'Blog Saya').replace('{{{{content}}}}', content);
-}}
-
-function getPostPage(postId) {{
-  const post = posts.find(p => p.id === postId);
-  
-  if (!post) {{
-    return HTML_TEMPLATE.replace('{{{{title}}}}', '404 Not Found').replace('{{{{content}}}}', `
-      <header>
-        <h1 class="blog-title">404</h1>
-        <p class="blog-subtitle">Post tidak ditemukan</p>
-      </header>
-      <div class="post-card">
-        <a href="/" class="back-link">← Kembali ke beranda</a>
-      </div>
-    `);
-  }}
-
-  const content = `
-    <div class="post-detail">
-      <a href="/" class="back-link">← Kembali ke beranda</a>
-      <div class="post-card">
-        <h1 class="post-title">${{post.title}}</h1>
-        <div class="post-meta">📅 ${{post.date}} | ✍️ ${{post.author}}</div>
-        <div class="post-content">${{post.content}}</div>
-      </div>
-    </div>
-  `;
-
-  return HTML_TEMPLATE.replace('{{{{title}}}}', post.title).replace('{{{{content}}}}', content);
-}}
-"""
+    """Generate worker script berisi semua halaman yang sudah di-render dari PostStore"""
+    builder = SiteBuilder(get_markdown_renderer())
+    return pages_worker_script(builder.build(get_post_store().all()))
 
 def main_dashboard():
     """Main dashboard interface"""
@@ -429,7 +253,7 @@ def main_dashboard():
     # Sidebar untuk navigasi
     with st.sidebar:
         st.header("🎛️ Menu")
-        page = st.selectbox("Pilih Halaman:", ["📋 Kelola Post", "🚀 Deploy", "⚙️ Settings"])
+        page = st.selectbox("Pilih Halaman:", ["📋 Kelola Post", "🚀 Deploy", "📊 Metrics", "⚙️ Settings"])
         
         st.markdown("---")
         # Format ulang URL untuk display yang benar
@@ -450,6 +274,8 @@ def main_dashboard():
         manage_posts()
     elif page == "🚀 Deploy":
         deploy_page()
+    elif page == "📊 Metrics":
+        metrics_page()
     elif page == "⚙️ Settings":
         settings_page()
 
@@ -469,35 +295,89 @@ def manage_posts():
     # Daftar posts yang ada
     st.subheader("📚 Daftar Postingan")
     
-    if st.session_state.posts:
-        for i, post in enumerate(st.session_state.posts):
+    store = get_post_store()
+    filters = post_list_filters(store)
+    total = store.count(**filters)
+    if total:
+        page_size = Config().POST_PAGE_SIZE
+        pages = -(-total // page_size)
+        # Back to the first page whenever the filters change
+        if st.session_state.get('posts_filters') != filters:
+            st.session_state.posts_filters = filters
+            st.session_state.posts_page = 1
+            st.session_state.posts_cursors = {1: None}
+        # Pages are fetched by cursor; a page is reachable once the one before it was shown
+        cursors = st.session_state.setdefault('posts_cursors', {1: None})
+        page = min(st.session_state.get('posts_page', 1), pages)
+        page = max(known for known in cursors if known <= page)
+        st.session_state.posts_page = page
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("⬅️ Sebelumnya", key="posts_prev", disabled=page <= 1,
+                      on_click=change_posts_page, args=(-1,), use_container_width=True)
+        with col2:
+            st.caption(f"Halaman {page} dari {pages} · {total} postingan")
+        with col3:
+            st.button("Berikutnya ➡️", key="posts_next", disabled=page >= pages,
+                      on_click=change_posts_page, args=(1,), use_container_width=True)
+        
+        # Only the visible page is queried and rendered
+        posts, next_cursor = store.page(cursors[page], page_size, **filters)
+        if next_cursor is not None:
+            cursors[page + 1] = next_cursor
+        for post in posts:
+            post_id = post['id']
             with st.container():
                 st.markdown(f"""
                 <div class="blog-card">
                     <h3>{post['title']}</h3>
-                    <p><strong>ID:</strong> {post['id']} | <strong>Tanggal:</strong> {post['date']} | <strong>Penulis:</strong> {post['author']}</p>
-                    <p>{post['excerpt'][:100]}...</p>
+                    <p><strong>ID:</strong> {post['id']} | <strong>Tanggal:</strong> {post.get('date', '-')} | <strong>Penulis:</strong> {post.get('author', '-')}</p>
+                    <p>{post.get('excerpt', '')[:100]}...</p>
                 </div>
                 """, unsafe_allow_html=True)
                 
                 col1, col2, col3 = st.columns([1, 1, 3])
                 with col1:
-                    if st.button(f"🗑️ Hapus", key=f"delete_{i}"):
-                        st.session_state.posts.pop(i)
+                    if st.button(f"🗑️ Hapus", key=f"delete_{post_id}"):
+                        store.delete(post_id)
                         st.rerun()
                 with col2:
-                    if st.button(f"👁️ Preview", key=f"preview_{i}"):
-                        st.session_state[f"show_preview_{i}"] = not st.session_state.get(f"show_preview_{i}", False)
+                    if st.button(f"👁️ Preview", key=f"preview_{post_id}"):
+                        st.session_state[f"show_preview_{post_id}"] = not st.session_state.get(f"show_preview_{post_id}", False)
                 
-                # Show preview if toggled
-                if st.session_state.get(f"show_preview_{i}", False):
+                # Show preview if toggled; content is only loaded here
+                if st.session_state.get(f"show_preview_{post_id}", False):
                     st.markdown("**Preview Konten:**")
-                    # Convert markdown to HTML for preview
-                    html_content = markdown.markdown(post['content'])
+                    full_post = store.get(post_id) or {}
+                    # Rendered once per content version, then served from cache
+                    html_content = get_markdown_renderer().render(full_post.get('content', ''))
                     st.markdown(html_content, unsafe_allow_html=True)
+    elif filters:
+        st.info("🔍 Tidak ada postingan yang cocok dengan filter.")
     else:
         st.info("📝 Belum ada postingan. Tambahkan post pertama Anda!")
 
+def post_list_filters(store):
+    """Filter daftar postingan; mengembalikan filter yang dipilih untuk PostStore.list"""
+    labels = {
+        "author": "✍️ Penulis",
+        "keyword": "🔍 Keyword",
+        "language": "🌐 Bahasa",
+        "generated_by": "⚙️ Dibuat oleh"
+    }
+    filters = {}
+    for col, (column, label) in zip(st.columns(len(labels)), labels.items()):
+        with col:
+            choice = st.selectbox(label, ["Semua"] + store.distinct(column), key=f"filter_{column}")
+            if choice != "Semua":
+                filters[column] = choice
+    return filters
+
+def change_posts_page(delta):
+    """Callback tombol navigasi halaman daftar postingan"""
+    st.session_state.posts_page = max(1, st.session_state.get('posts_page', 1) + delta)
+
 def ai_post_generator():
     """Interface untuk generate post menggunakan AI"""
     st.subheader("🤖 Generate Post dengan AI")
@@ -510,10 +390,10 @@ def ai_post_generator():
         col1, col2 = st.columns(2)
         
         with col1:
-            keyword = st.text_input(
-                "🔍 Keyword/Topik:",
-                placeholder="Contoh: teknologi AI, resep masakan, tips kesehatan",
-                help="Masukkan topik yang ingin dijadikan artikel"
+            keywords_text = st.text_area(
+                "🔍 Keyword/Topik (satu per baris):",
+                placeholder="Contoh:\nteknologi AI\nresep masakan\ntips kesehatan",
+                help="Setiap baris menjadi satu artikel yang di-generate paralel di latar belakang"
             )
             
             language = st.selectbox(
@@ -536,168 +416,125 @@ def ai_post_generator():
             
             custom_post_id = st.text_input(
                 "🆔 Custom Post ID (opsional):",
-                placeholder="Akan di-generate otomatis jika kosong"
+                placeholder="Akan di-generate otomatis jika kosong",
+                help="Hanya dipakai jika hanya ada satu keyword"
+            )
+            
+            use_cache = st.checkbox(
+                "♻️ Gunakan cache AI",
+                value=True,
+                help="Matikan untuk memaksa generate ulang meskipun keyword dan bahasa sama"
+            )
+            
+            generation_modes = {
+                "stream": "📡 Streaming",
+                "structured": "⚡ Cepat (1 request)",
+                "long": "📚 Panjang (paralel per bagian)"
+            }
+            mode = st.radio(
+                "⚙️ Mode Generate:",
+                options=list(generation_modes),
+                index=list(generation_modes).index(Config().GEMINI_GENERATION_MODE),
+                format_func=generation_modes.get,
+                help="Cepat: judul, excerpt, tag, dan artikel dalam satu panggilan AI. "
+                     "Panjang: kerangka dulu, lalu setiap bagian ditulis paralel."
             )
         
         generate_btn = st.form_submit_button("🚀 Generate Post", use_container_width=True)
         
         if generate_btn:
-            if keyword:
-                generate_ai_post(keyword, language, author, include_images, 
-                               max_images if include_images else 0, 
-                               image_keyword if include_images else "", 
-                               custom_post_id)
+            keywords = list(dict.fromkeys(line.strip() for line in keywords_text.splitlines() if line.strip()))
+            if keywords:
+                for keyword in keywords:
+                    submit_ai_post(keyword, language, author, include_images,
+                                   max_images if include_images else 0,
+                                   image_keyword if include_images else "",
+                                   custom_post_id if len(keywords) == 1 else "", use_cache, mode)
+                st.success(f"📥 {len(keywords)} job masuk antrian. Anda bisa lanjut bekerja sementara post di-generate.")
             else:
                 st.error("❌ Keyword/topik harus diisi!")
-
-def generate_ai_post(keyword, language, author, include_images, max_images, image_keyword, custom_post_id):
-    """Generate post menggunakan AI"""
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
     
-    try:
-        # Step 1: Initialize Gemini
-        status_text.text("🤖 Menginisialisasi Gemini AI...")
-        progress_bar.progress(10)
-        
-        gemini = GeminiScraper()
-        
-        # Step 2: Generate content
-        status_text.text("✍️ Menghasilkan konten artikel...")
-        progress_bar.progress(30)
-        
-        article_content = gemini.generate_article(keyword, language)
-        
-        if not article_content:
-            st.error("❌ Gagal menghasilkan konten artikel. Coba lagi.")
-            return
-        
-        # Step 3: Extract title and content
-        status_text.text("📝 Memproses konten...")
-        progress_bar.progress(50)
-        
-        # Extract title from content (first line or first heading)
-        lines = article_content.split('\n')
-        title = keyword  # Default title
-        content_start = 0
-        
-        for i, line in enumerate(lines):
-            if line.strip():
-                # Check if it's a heading
-                if line.startswith('#'):
-                    title = line.replace('#', '').strip()
-                    content_start = i + 1
-                    break
-                elif len(line.strip()) < 100:  # Likely a title
-                    title = line.strip()
-                    content_start = i + 1
-                    break
-        
-        # Get content without title
-        content = '\n'.join(lines[content_start:]).strip()
-        
-        # Generate post ID
-        post_id = custom_post_id if custom_post_id else generate_post_id(title)
-        
-        # Step 4: Get images if requested
-        image_urls = []
-        if include_images and BING_AVAILABLE:
-            status_text.text("🖼️ Mencari gambar...")
-            progress_bar.progress(70)
-            
-            try:
-                bing_scraper = BingImageScraper()
-                search_query = image_keyword if image_keyword else keyword
-                image_urls = bing_scraper.get_image_urls(search_query, max_images)
-                bing_scraper.close()
-                
-                if image_urls:
-                    st.success(f"✅ Ditemukan {len(image_urls)} gambar")
-                else:
-                    st.warning("⚠️ Tidak ada gambar yang ditemukan")
-                    
-            except Exception as e:
-                st.warning(f"⚠️ Error saat mencari gambar: {str(e)}")
-        
-        # Step 5: Insert images into content
-        if image_urls:
-            status_text.text("🎨 Menyisipkan gambar ke konten...")
-            progress_bar.progress(85)
-            
-            content = insert_images_to_content(content, image_urls, keyword)
-        
-        # Step 6: Create post
-        status_text.text("💾 Menyimpan post...")
-        progress_bar.progress(95)
-        
-        # Extract excerpt
-        excerpt = extract_excerpt_from_content(content)
-        
-        new_post = {
-            "id": post_id,
-            "title": title,
-            "author": author,
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "excerpt": excerpt,
-            "content": content,
-            "generated_by": "AI",
-            "keyword": keyword,
-            "language": language
-        }
-        
-        st.session_state.posts.append(new_post)
-        
-        # Step 7: Complete
-        progress_bar.progress(100)
-        status_text.text("✅ Post berhasil di-generate!")
-        
-        st.success("🎉 Post AI berhasil dibuat!")
-        st.balloons()
-        
-        # Show preview
-        with st.expander("👁️ Preview Post", expanded=True):
-            st.markdown(f"**Judul:** {title}")
-            st.markdown(f"**ID:** {post_id}")
-            st.markdown(f"**Excerpt:** {excerpt}")
-            st.markdown("**Konten:**")
-            st.markdown(content[:500] + "..." if len(content) > 500 else content)
-        
-        gemini.close()
-        
-    except Exception as e:
-        st.error(f"❌ Error saat generate post: {str(e)}")
-        progress_bar.empty()
-        status_text.empty()
+    job_status_section()
 
-def insert_images_to_content(content, image_urls, keyword):
-    """Insert images into content at strategic positions"""
-    if not image_urls:
-        return content
-    
-    lines = content.split('\n')
-    new_lines = []
-    image_index = 0
+def submit_ai_post(keyword, language, author, include_images, max_images, image_keyword, custom_post_id, use_cache=True, mode="stream"):
+    """Masukkan generate post AI ke antrian job latar belakang"""
+    return get_job_queue().submit(
+        f"{keyword} ({language}, {mode})", generate_post, get_post_store(),
+        keyword, language, author, include_images, max_images, image_keyword,
+        custom_post_id, use_cache, mode
+    )
+
+def job_status_section():
+    """Tabel status job dan artikel yang sedang di-stream; di-refresh otomatis selama ada job berjalan"""
+    stats = get_job_queue().stats()
+    if not any(stats.values()):
+        return
     
-    # Insert images after headings and between sections
-    heading_count = 0
+    st.subheader("⏳ Status Job")
+    active = stats[QUEUED] + stats[RUNNING] > 0
+    st.fragment(job_status_panel, run_every=1 if active else None)()
+
+def job_status_panel():
+    """Panel status job yang di-refresh tanpa menjalankan ulang halaman"""
+    queue = get_job_queue()
+    jobs = queue.list()
+    status_labels = {
+        QUEUED: "🕒 Antri",
+        RUNNING: "⚙️ Berjalan",
+        DONE: "✅ Selesai",
+        FAILED: "❌ Gagal",
+        CANCELLED: "🚫 Dibatalkan"
+    }
     
-    for i, line in enumerate(lines):
-        new_lines.append(line)
-        
-        # Check if this line is a heading (starts with **)
-        if line.strip().startswith('**') and line.strip().endswith(':**'):
-            heading_count += 1
-            
-            # Insert image after every 2nd heading (skip first heading)
-            if heading_count > 1 and heading_count % 2 == 0 and image_index < len(image_urls):
-                new_lines.append("")  # Empty line
-                new_lines.append(f'<img src="{image_urls[image_index]}" alt="{keyword}" style="width: 100%; max-width: 600px; height: auto; border-radius: 8px; margin: 1.5rem 0; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">')
-                new_lines.append(f'<p style="text-align: center; font-size: 0.9rem; color: #666; margin-top: 0.5rem;"><em>{keyword.title()}</em></p>')
-                new_lines.append("")  # Empty line
-                image_index += 1
-    
-    return '\n'.join(new_lines)
+    st.dataframe([
+        {
+            "Job": job.label,
+            "Status": status_labels[job.status],
+            "Tahap": job.error or job.stage,
+            "Progress": job.progress,
+            "Durasi (s)": round(job.elapsed, 1)
+        }
+        for job in jobs
+    ], column_config={
+        "Progress": st.column_config.ProgressColumn("Progress", min_value=0, max_value=100, format="%d%%")
+    }, use_container_width=True, hide_index=True)
+    
+    # Refresh the whole page when a job finishes, so the post list shows new
+    # posts and the auto refresh stops once nothing is running
+    finished = sum(1 for job in jobs if job.status not in (QUEUED, RUNNING))
+    if finished > st.session_state.get('jobs_finished_seen', finished):
+        st.session_state.jobs_finished_seen = finished
+        st.rerun(scope="app")
+    st.session_state.jobs_finished_seen = finished
+    
+    for job in jobs:
+        if job.status in (QUEUED, RUNNING):
+            if job.partial:
+                # Streamed article so far, re-rendered on every refresh
+                with st.expander(f"📡 {job.label}", expanded=True):
+                    st.markdown(job.partial + " ▌")
+            if st.button(f"🚫 Batalkan: {job.label}", key=f"cancel_job_{job.id}"):
+                queue.cancel(job.id)
+                st.rerun(scope="app")
+        elif job.status == DONE and job.result:
+            result = job.result
+            with st.expander(f"✅ {result['title']}"):
+                st.markdown(f"**ID:** {result['post_id']}")
+                st.markdown(f"**Excerpt:** {result['excerpt']}")
+                st.caption(f"🖼️ {result['images']} gambar")
+                for warning in job.warnings:
+                    st.warning(f"⚠️ {warning}")
+                if result.get('cache'):
+                    st.caption(f"♻️ Cache AI: {result['cache']['hits']} hit / {result['cache']['misses']} miss")
+                resilience_stats = result['resilience']
+                st.caption(f"🔁 Retry: {resilience_stats['retries']} | Hedge: {resilience_stats['hedges']} "
+                           f"({resilience_stats['hedge_wins']} menang)")
+    
+    if any(job.status not in (QUEUED, RUNNING) for job in jobs):
+        if st.button("🧹 Bersihkan job selesai", key="clear_jobs"):
+            queue.clear_finished()
+            st.session_state.jobs_finished_seen = 0
+            st.rerun(scope="app")
 
 def manual_post_form():
     """Form untuk membuat post manual"""
@@ -729,9 +566,11 @@ def manual_post_form():
                         "excerpt": excerpt,
                         "content": content.replace("\n", "<br>")
                     }
-                    st.session_state.posts.append(new_post)
-                    st.success("✅ Post berhasil ditambahkan!")
-                    st.rerun()
+                    if get_post_store().add(new_post):
+                        st.success("✅ Post berhasil ditambahkan!")
+                        st.rerun()
+                    else:
+                        st.error(f"❌ ID '{post_id}' sudah digunakan!")
                 else:
                     st.error("❌ Judul, ID, dan Konten wajib diisi!")
 
@@ -741,26 +580,181 @@ def deploy_page():
     
     st.info(f"Worker akan di-deploy ke: **https://{st.session_state.worker_subdomain}**")
     
+    deploy_modes = {
+        "kv": "⚡ Inkremental (Workers KV)",
+        "local": "🧪 Inkremental (KV lokal untuk testing)",
+        "script": "📦 Script penuh (halaman pra-render di dalam script)"
+    }
+    mode = st.radio(
+        "⚙️ Mode Deploy:",
+        options=list(deploy_modes),
+        index=list(deploy_modes).index(Config().DEPLOY_MODE),
+        format_func=deploy_modes.get,
+        help="Inkremental: script worker tetap, halaman di-render saat build, dan hanya halaman "
+             "yang berubah atau dihapus yang diunggah ke KV."
+    )
+    
     # Preview posts
-    if st.session_state.posts:
-        st.subheader("📋 Preview Posts")
-        for post in st.session_state.posts:
+    store = get_post_store()
+    total = store.count()
+    if total:
+        st.subheader(f"📋 Preview Posts ({total})")
+        for post in store.list(limit=10):
             st.markdown(f"• **{post['title']}** (ID: {post['id']})")
+        if total > 10:
+            st.caption(f"... dan {total - 10} post lainnya")
         
         st.markdown("---")
-        
+    elif mode == "script":
+        st.warning("⚠️ Tidak ada postingan untuk di-deploy. Tambahkan post terlebih dahulu.")
+        return
+    else:
+        st.warning("⚠️ Tidak ada postingan. Deploy akan menghapus semua post dari KV.")
+    
+    if mode == "script":
         if st.button("🚀 Deploy Sekarang", type="primary", use_container_width=True):
             with st.spinner("⏳ Deploying worker..."):
                 worker_script = generate_worker_script()
                 
+                # The full script replaces the KV worker, so the next KV deploy must upload it again
+                try:
+                    forget_kv_worker()
+                except Exception as e:
+                    st.warning(f"⚠️ Status worker KV tidak bisa direset ({str(e)}); "
+                               "deploy inkremental berikutnya mungkin tidak mengunggah ulang script worker.")
+                
                 if deploy_worker(worker_script):
                     st.success("✅ Worker berhasil di-deploy!")
                     st.balloons()
                     st.markdown(f"🌍 Blog Anda live di: https://{st.session_state.worker_subdomain}")
                 else:
                     st.error("❌ Deploy gagal! Periksa konfigurasi Cloudflare.")
-    else:
-        st.warning("⚠️ Tidak ada postingan untuk di-deploy. Tambahkan post terlebih dahulu.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        check_btn = st.button("🔍 Cek Perubahan", use_container_width=True)
+    with col2:
+        deploy_btn = st.button("🚀 Deploy Sekarang", type="primary", use_container_width=True)
+    
+    if check_btn or deploy_btn:
+        try:
+            with st.spinner("⏳ Me-render halaman dan membandingkan dengan KV..."):
+                kv, namespace_id = get_deploy_kv(mode)
+                deployer = IncrementalDeployer(kv, store, SiteBuilder(get_markdown_renderer()))
+                plan = deployer.plan()
+            st.info(f"📊 Halaman: {len(plan.upload)} baru/berubah · {len(plan.delete)} dihapus · "
+                    f"{plan.unchanged} tidak berubah")
+            
+            if deploy_btn:
+                with st.spinner("⏳ Deploying..."):
+                    result = deployer.deploy(plan)
+                    # Pages go up first, so a new worker never serves a missing page
+                    if mode == "kv":
+                        config = Config()
+                        if publish_worker(kv, st.session_state.cf_account_id, st.session_state.cf_api_token,
+                                          st.session_state.worker_name, namespace_id, config.WORKER_SCRIPT_TIMEOUT):
+                            st.caption("📦 Script worker diperbarui")
+                
+                if plan.empty:
+                    st.success("✅ Tidak ada perubahan, blog sudah up to date.")
+                else:
+                    st.success(f"✅ Deploy selesai dalam {result['seconds']:.1f} detik "
+                               f"({result['uploaded']} halaman diunggah, {result['deleted']} dihapus, "
+                               f"{result['bytes'] / 1024:.1f} KB)")
+                if mode == "kv":
+                    st.markdown(f"🌍 Blog Anda live di: https://{st.session_state.worker_subdomain}")
+                else:
+                    st.caption(f"🧪 KV lokal: `{kv.directory}`")
+        except Exception as e:
+            st.error(f"❌ Deploy gagal: {str(e)}")
+
+def kv_namespace_title():
+    """Nama namespace KV untuk worker ini"""
+    return Config().KV_NAMESPACE_TITLE or f"{st.session_state.worker_name}-posts"
+
+def forget_kv_worker():
+    """Tandai worker KV tidak lagi live, tanpa membuat namespace jika belum ada"""
+    config = Config()
+    namespace_id = CloudflareKV.find_namespace(
+        st.session_state.cf_account_id, st.session_state.cf_api_token, kv_namespace_title(),
+        config.WORKER_SCRIPT_TIMEOUT
+    )
+    if namespace_id:
+        forget_worker(CloudflareKV(st.session_state.cf_account_id, st.session_state.cf_api_token,
+                                   namespace_id, config.WORKER_SCRIPT_TIMEOUT))
+
+def get_deploy_kv(mode):
+    """KV tujuan deploy inkremental beserta namespace ID-nya (None untuk KV lokal)"""
+    config = Config()
+    if mode == "local":
+        return FileKV(os.path.join(config.KV_LOCAL_DIR, st.session_state.worker_name or "blog")), None
+    
+    title = kv_namespace_title()
+    if st.session_state.get('kv_namespace', (None, None))[0] != title:
+        namespace_id = CloudflareKV.ensure_namespace(
+            st.session_state.cf_account_id, st.session_state.cf_api_token, title, config.WORKER_SCRIPT_TIMEOUT
+        )
+        st.session_state.kv_namespace = (title, namespace_id)
+    namespace_id = st.session_state.kv_namespace[1]
+    return CloudflareKV(st.session_state.cf_account_id, st.session_state.cf_api_token, namespace_id,
+                        config.WORKER_SCRIPT_TIMEOUT), namespace_id
+
+def metrics_page():
+    """Halaman metrik token dan latensi pipeline AI"""
+    st.header("📊 Metrics")
+    
+    live = st.toggle("🔄 Auto refresh (5 detik)", value=False)
+    st.fragment(metrics_panel, run_every=5 if live else None)()
+
+def metrics_panel():
+    """Panel metrik yang bisa di-refresh tanpa menjalankan ulang halaman"""
+    calls = metrics.model_requests.samples()
+    if not calls:
+        st.info("📭 Belum ada panggilan AI yang tercatat di proses ini.")
+        return
+    
+    latencies = {
+        (labels["model"], labels["kind"], labels["outcome"]): (count, total)
+        for labels, count, total in metrics.model_latency.samples()
+    }
+    tokens = {}
+    for labels, value in metrics.tokens_total.samples():
+        tokens.setdefault((labels["model"], labels["kind"]), {})[labels["direction"]] = value
+    
+    rows = []
+    for labels, value in sorted(calls, key=lambda item: (item[0]["kind"], item[0]["outcome"])):
+        count, total = latencies.get((labels["model"], labels["kind"], labels["outcome"]), (0, 0.0))
+        used = tokens.get((labels["model"], labels["kind"]), {}) if labels["outcome"] == "success" else {}
+        rows.append({
+            "Model": labels["model"],
+            "Jenis": labels["kind"],
+            "Hasil": labels["outcome"],
+            "Panggilan": int(value),
+            "Rata-rata latensi (s)": round(total / count, 2) if count else 0.0,
+            "Token prompt": int(used.get("prompt", 0)),
+            "Token output": int(used.get("output", 0)),
+        })
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Panggilan AI", sum(row["Panggilan"] for row in rows))
+    col2.metric("Token prompt", sum(row["Token prompt"] for row in rows))
+    col3.metric("Token output", sum(row["Token output"] for row in rows))
+    
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    
+    cache = {labels["result"]: int(value) for labels, value in metrics.cache_requests.samples()}
+    st.caption(f"♻️ Cache AI: {cache.get('hit', 0)} hit / {cache.get('miss', 0)} miss")
+    
+    with st.expander("📄 Format Prometheus"):
+        prometheus_text = metrics.registry.to_prometheus()
+        st.code(prometheus_text, language="text")
+        st.download_button(
+            label="💾 Download metrics.txt",
+            data=prometheus_text,
+            file_name="metrics.txt",
+            mime="text/plain"
+        )
 
 def settings_page():
     """Halaman pengaturan"""
@@ -803,8 +797,9 @@ def settings_page():
     
     with col1:
         if st.button("📥 Export Posts"):
-            if st.session_state.posts:
-                posts_json = json.dumps(st.session_state.posts, indent=2)
+            posts = get_post_store().all()
+            if posts:
+                posts_json = json.dumps(posts, indent=2)
                 st.download_button(
                     label="💾 Download posts.json",
                     data=posts_json,
@@ -816,10 +811,12 @@ def settings_page():
     
     with col2:
         uploaded_file = st.file_uploader("📤 Import Posts", type="json")
-        if uploaded_file:
+        # The uploader keeps its file across reruns; import each upload once
+        if uploaded_file and st.session_state.get('imported_file_id') != uploaded_file.file_id:
             try:
                 imported_posts = json.load(uploaded_file)
-                st.session_state.posts = imported_posts
+                get_post_store().replace_all(imported_posts)
+                st.session_state.imported_file_id = uploaded_file.file_id
                 st.success("✅ Posts berhasil di-import!")
                 st.rerun()
             except:
@@ -841,9 +838,23 @@ def settings_page():
             if gemini_api_key:
                 # Save to environment or session state
                 os.environ['GEMINI_API_KEY'] = gemini_api_key
+                if GEMINI_AVAILABLE:
+                    # Rebuild shared clients with the new key on next use
+                    gemini_registry.invalidate()
                 st.success("✅ Konfigurasi AI berhasil disimpan!")
             else:
                 st.error("❌ API Key harus diisi!")
+    
+    if GEMINI_AVAILABLE and st.button("🩺 Cek Koneksi Gemini"):
+        with st.spinner("⏳ Mengecek API key..."):
+            try:
+                for key, status in gemini_registry.health_check().items():
+                    if status == "ok":
+                        st.success(f"✅ {key}: OK")
+                    else:
+                        st.error(f"❌ {key}: {status}")
+            except Exception as e:
+                st.error(f"❌ Gemini tidak dapat diinisialisasi: {str(e)}")
 
 # Main app logic
 def main():
@@ -0,0 +1,96 @@
+"""
+Shared fixtures: a fake clock for the time-based components and a
+GeminiScraper whose keys are served by stub models (no network, no API key).
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; ``sleep`` advances the clock instead of waiting."""
+
+    def __init__(self, start=1_000_000.0):
+        self.now = start
+        self.slept = 0.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import cache
+    import keypool
+    import ratelimit
+
+    fake = FakeClock()
+    for module in (cache, keypool, ratelimit):
+        monkeypatch.setattr(module, "time", fake)
+    return fake
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class StubModel:
+    """Answers every call with ``text``, or raises ``error`` if one is set."""
+
+    def __init__(self, text="ok", error=None):
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return StubResponse(self.text)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return StubResponse(self.text)
+
+
+@pytest.fixture
+def stub_scraper(monkeypatch, tmp_path):
+    """Factory for a GeminiScraper over the given ``{key: StubModel}``."""
+    from gemini import GeminiScraper
+    from keypool import ApiKeyPool
+
+    monkeypatch.chdir(tmp_path)  # The response cache is opened relative to the working directory
+
+    def make(models, **pool_options):
+        scraper = GeminiScraper(api_key=next(iter(models)))
+        scraper.key_pool = ApiKeyPool(list(models), **{"requests_per_minute": 1000, **pool_options})
+        scraper.models = dict(models)
+        scraper.model = scraper.models[scraper.key_pool.keys[0]]
+        return scraper
+
+    return make
@@ -0,0 +1,52 @@
+import os
+import json
+
+import pytest
+
+from bing_parser import EXTRACTORS, extract_with_regex, get_extractor
+from conftest import FIXTURES
+
+PAGES = ["bing_search", "bing_async"]
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, f"{name}.html"), encoding="utf-8") as f:
+        page = f.read()
+    with open(os.path.join(FIXTURES, f"{name}.json"), encoding="utf-8") as f:
+        return page, json.load(f)
+
+
+@pytest.mark.parametrize("page_name", PAGES)
+@pytest.mark.parametrize("extractor", sorted(EXTRACTORS))
+def test_extractors_return_every_result_in_page_order(extractor, page_name):
+    if extractor == "lxml":
+        pytest.importorskip("lxml")
+    page, expected = load(page_name)
+    assert EXTRACTORS[extractor](page) == expected
+
+
+@pytest.mark.parametrize("extractor", sorted(EXTRACTORS))
+@pytest.mark.parametrize("anchor", [
+    '<a class="iusc" m="{&quot;murl&quot;:&quot;https://x.test/a.jpg?w=1&amp;h=2&quot;}">',
+    "<a class='iusc' m='{\"murl\":\"https://x.test/a.jpg?w=1&amp;h=2\"}'>",
+    '<a href="#" class="sel iusc" style="" m="{&quot;murl&quot;:&quot;https://x.test/a.jpg?w=1&amp;h=2&quot;}">',
+])
+def test_quote_styles_and_class_lists(extractor, anchor):
+    if extractor == "lxml":
+        pytest.importorskip("lxml")
+    assert EXTRACTORS[extractor](f"<div>{anchor}</a></div>") == ["https://x.test/a.jpg?w=1&h=2"]
+
+
+@pytest.mark.parametrize("page", [
+    '<a class="iuscp" m="{&quot;murl&quot;:&quot;https://x.test/a.jpg&quot;}"></a>',
+    '<a class="iusc" m="not json"></a>',
+    '<a class="iusc"></a>',
+    '<div class="iusc" m="{&quot;murl&quot;:&quot;https://x.test/a.jpg&quot;}"></div>',
+])
+def test_non_results_are_ignored(page):
+    assert extract_with_regex(page) == []
+
+
+def test_unknown_extractor_falls_back_to_regex():
+    assert get_extractor("nope") is extract_with_regex
+    assert get_extractor("bs4") is EXTRACTORS["bs4"]
@@ -0,0 +1,81 @@
+import pytest
+
+from cache import DiskCache, make_key
+
+
+@pytest.fixture
+def open_cache(tmp_path):
+    caches = []
+
+    def make(**options):
+        cache = DiskCache(str(tmp_path / f"cache-{len(caches)}.sqlite3"), **options)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_make_key_is_stable_and_order_insensitive_for_dicts():
+    assert make_key("a", {"x": 1, "y": 2}) == make_key("a", {"y": 2, "x": 1})
+    assert make_key("a", 1) != make_key("a", "1")
+
+
+def test_round_trip_and_counters(open_cache):
+    cache = open_cache()
+    assert cache.get("missing") is None
+    cache.set("k", {"judul": "Kopi", "tags": ["a", "b"]})
+    assert cache.get("k") == {"judul": "Kopi", "tags": ["a", "b"]}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_max_age(open_cache, clock):
+    cache = open_cache(max_age=60)
+    cache.set("k", "v")
+    clock.advance(59)
+    assert cache.get_entry("k") == ("v", 59)
+    clock.advance(2)
+    assert cache.get("k") is None
+
+
+def test_max_age_can_be_overridden_per_lookup(open_cache, clock):
+    cache = open_cache(max_age=3600)
+    cache.set("k", "v")
+    clock.advance(120)
+    assert cache.get("k", max_age=60) is None
+    assert cache.get("k") == "v"
+
+
+def test_expired_entries_are_purged_on_write(open_cache, clock):
+    cache = open_cache(max_age=60)
+    cache.set("old", "v")
+    clock.advance(61)
+    cache.set("new", "v")
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(open_cache, clock):
+    value = "x" * 100  # 102 bytes as JSON
+    cache = open_cache(max_bytes=350, max_age=0)
+    for key in ("a", "b", "c"):
+        cache.set(key, value)
+        clock.advance(1)
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == value
+    clock.advance(1)
+    cache.set("d", value)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) == value for key in ("a", "c", "d"))
+    assert cache.stats()["bytes"] <= 350
+
+
+def test_delete_and_clear(open_cache):
+    cache = open_cache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None and cache.get("b") == 2
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
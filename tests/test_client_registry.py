@@ -0,0 +1,26 @@
+from client_registry import ClientRegistry
+
+
+def test_scrapers_are_shared_per_key(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    registry = ClientRegistry()
+    assert registry.get_scraper("key-a") is registry.get_scraper("key-a")
+    assert registry.get_scraper("key-a") is not registry.get_scraper("key-b")
+
+
+def test_invalidate_leaves_scrapers_in_use_working(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    registry = ClientRegistry()
+    in_use = registry.get_scraper("key-a")
+    other = registry.get_scraper("key-b")
+
+    registry.invalidate("key-a")
+    assert registry.get_scraper("key-a") is not in_use
+    assert registry.get_scraper("key-b") is other
+    # A job still holding the old scraper can keep using its response cache
+    in_use.cache.set("k", "v")
+    assert in_use.cache.get("k") == "v"
+
+    registry.invalidate()
+    assert registry.get_scraper("key-b") is not other
+    other.cache.set("k", "v")
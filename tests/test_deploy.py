@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from deploy import (LEGACY_INDEX_KEY, LEGACY_POST_PREFIX, MANIFEST_KEY, PAGE_PREFIX, FileKV,
+                    IncrementalDeployer, content_hash, forget_worker, publish_worker)
+from post_store import PostStore
+from site_builder import SiteBuilder
+
+
+def make_post(i, **fields):
+    post = {
+        "id": f"post-{i}",
+        "title": f"Judul {i}",
+        "author": "ani",
+        "date": f"2024-03-{1 + i:02d}",
+        "excerpt": f"Ringkasan {i}",
+        "content": f"# Judul {i}\n\nIsi **{i}**",
+        "category": "Kopi",
+        "tags": ["seduh"],
+    }
+    post.update(fields)
+    return post
+
+
+@pytest.fixture
+def kv(tmp_path):
+    return FileKV(str(tmp_path / "kv"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostStore(str(tmp_path / "posts.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def deployer(kv, store):
+    return IncrementalDeployer(kv, store, SiteBuilder())
+
+
+def test_file_kv_round_trip_and_delete(kv):
+    kv.put_many({"page:/post/kopi susu": "<p>ok</p>", MANIFEST_KEY: "{}"})
+    assert kv.get("page:/post/kopi susu") == "<p>ok</p>"
+    kv.delete_many(["page:/post/kopi susu", "missing"])
+    assert kv.get("page:/post/kopi susu") is None
+
+
+def test_first_deploy_uploads_every_page(deployer, kv, store):
+    store.save_many([make_post(i) for i in range(3)])
+    plan = deployer.plan()
+    assert set(plan.upload) == {"/", "/404", "/post/post-0", "/post/post-1", "/post/post-2",
+                                "/category/kopi", "/tag/seduh"}
+    assert plan.delete == [] and plan.unchanged == 0
+
+    result = deployer.deploy(plan)
+    assert result["uploaded"] == 7
+    manifest = json.loads(kv.get(MANIFEST_KEY))
+    assert manifest["/post/post-1"] == content_hash(kv.get(PAGE_PREFIX + "/post/post-1"))
+
+
+def test_unchanged_site_plans_nothing(deployer, store):
+    store.save_many([make_post(i) for i in range(3)])
+    deployer.deploy()
+    plan = deployer.plan()
+    assert plan.empty and plan.unchanged == 7
+    assert deployer.deploy(plan)["bytes"] == 0
+
+
+def test_edit_uploads_only_the_pages_it_appears_on(deployer, store):
+    store.save_many([make_post(i) for i in range(3)])
+    deployer.deploy()
+
+    store.save(make_post(1, content="# Judul 1\n\nIsi baru"))
+    plan = deployer.plan()
+    assert plan.upload == ["/post/post-1"]
+    deployer.deploy(plan)
+
+    # The title shows on the home page and on the listing pages too
+    store.save(make_post(2, title="Judul lain"))
+    assert set(deployer.plan().upload) == {"/", "/post/post-2", "/category/kopi", "/tag/seduh"}
+
+
+def test_removed_posts_and_tags_are_deleted(deployer, kv, store):
+    store.save_many([make_post(0), make_post(1, tags=["langka"])])
+    deployer.deploy()
+
+    store.delete("post-1")
+    plan = deployer.plan()
+    assert set(plan.delete) == {"/post/post-1", "/tag/langka"}
+    deployer.deploy(plan)
+    assert kv.get(PAGE_PREFIX + "/tag/langka") is None
+    assert "/post/post-1" not in json.loads(kv.get(MANIFEST_KEY))
+
+
+def test_legacy_layout_is_cleaned_up_on_first_deploy(deployer, kv, store):
+    kv.put_many({
+        LEGACY_INDEX_KEY: json.dumps([{"id": "lama"}]),
+        LEGACY_POST_PREFIX + "lama": "{}",
+    })
+    store.save(make_post(0))
+    plan = deployer.plan()
+    assert plan.legacy_keys == [LEGACY_INDEX_KEY, LEGACY_POST_PREFIX + "lama"]
+    deployer.deploy(plan)
+    assert kv.get(LEGACY_INDEX_KEY) is None and kv.get(LEGACY_POST_PREFIX + "lama") is None
+    assert deployer.plan().legacy_keys == []
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+
+def test_kv_worker_is_republished_after_a_script_deploy(kv, monkeypatch):
+    import deploy
+
+    uploads = []
+    monkeypatch.setattr(deploy.requests, "put", lambda url, **kwargs: uploads.append(url) or FakeResponse())
+    monkeypatch.setattr(deploy.requests, "post", lambda url, **kwargs: FakeResponse())
+
+    def publish():
+        return publish_worker(kv, "account", "token", "blog", "namespace")
+
+    assert publish() is True
+    assert publish() is False  # Already live
+    # A full-script deploy replaces the worker under the same name
+    forget_worker(kv)
+    assert publish() is True
+    assert len(uploads) == 2
@@ -0,0 +1,77 @@
+import asyncio
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+import gemini
+from conftest import StubModel, StubResponse
+
+
+def test_batch_keeps_input_order_and_reports_failures(stub_scraper, monkeypatch):
+    scraper = stub_scraper({"a": StubModel(text="Judul\n\n" + "isi " * 100)})
+    original = scraper._write_article_async
+
+    async def flaky(topic, *args, **kwargs):
+        if topic == "gagal":
+            raise google_exceptions.InvalidArgument("bad topic")
+        return await original(topic, *args, **kwargs)
+
+    monkeypatch.setattr(scraper, "_write_article_async", flaky)
+    results = scraper.generate_articles(["satu", "gagal", "tiga"], language="id", concurrency=2, use_cache=False)
+    assert [result.topic for result in results] == ["satu", "gagal", "tiga"]
+    assert [result.ok for result in results] == [True, False, True]
+    assert "bad topic" in results[1].error
+
+
+def test_async_clients_are_closed_after_each_batch(stub_scraper, monkeypatch):
+    clients = []
+
+    class FakeTransport:
+        closed = False
+
+        async def close(self):
+            self.closed = True
+
+    class FakeAsyncClient:
+        def __init__(self, client_options):
+            self.transport = FakeTransport()
+            clients.append(self)
+
+    async def answer(prompt, **kwargs):
+        return StubResponse("Judul\n\n" + "isi " * 100)
+
+    monkeypatch.setattr(gemini.glm, "GenerativeServiceAsyncClient", FakeAsyncClient)
+    model = genai.GenerativeModel("stub-model")
+    model.generate_content_async = answer
+    scraper = stub_scraper({"a": model, "b": model})
+
+    for _ in range(2):
+        assert all(result.ok for result in scraper.generate_articles(["kopi"], language="id", use_cache=False))
+    assert len(clients) == 4
+    assert all(client.transport.closed for client in clients)
+    # The shared models are never bound to a per-run client
+    assert model._async_client is None
+
+
+def test_async_clients_are_closed_when_the_batch_fails(stub_scraper, monkeypatch):
+    closed = []
+
+    class FakeAsyncClient:
+        def __init__(self, client_options):
+            self.transport = self
+
+        async def close(self):
+            closed.append(True)
+
+    monkeypatch.setattr(gemini.glm, "GenerativeServiceAsyncClient", FakeAsyncClient)
+    scraper = stub_scraper({"a": genai.GenerativeModel("stub-model")})
+
+    async def run():
+        async with scraper._async_models():
+            raise RuntimeError("boom")
+
+    try:
+        asyncio.run(run())
+    except RuntimeError:
+        pass
+    assert closed == [True]
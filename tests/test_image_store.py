@@ -0,0 +1,123 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_store import ImageStore
+from imaging import hamming_distance, perceptual_hash
+
+
+def picture(seed, size=(320, 240), fmt="JPEG", quality=90):
+    """A blocky random picture; the same seed gives the same picture at any size."""
+    blocks = np.random.default_rng(seed).integers(0, 256, (6, 8, 3), dtype=np.uint8)
+    img = Image.fromarray(blocks).resize(size, Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, quality=quality)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ImageStore(str(tmp_path / "images"), str(tmp_path / "index.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_resized_and_recompressed_copies_hash_close_together():
+    original = perceptual_hash(picture(1))
+    copy = perceptual_hash(picture(1, size=(800, 600), quality=60))
+    other = perceptual_hash(picture(2))
+    assert hamming_distance(original, copy) <= 6
+    assert hamming_distance(original, other) > 6
+
+
+def test_identical_bytes_are_stored_once(store):
+    data = picture(1)
+    first = store.put(data, source_url="https://a.example/1.jpg")
+    second = store.put(data, source_url="https://b.example/copy.jpg")
+
+    assert first == second
+    assert os.path.basename(first["path"]) == first["sha256"] + ".jpg"
+    assert store.stats() == {"images": 1, "bytes": len(data)}
+    assert store.lookup_url("https://b.example/copy.jpg")["sha256"] == first["sha256"]
+
+
+def test_near_duplicates_are_found_by_phash(store):
+    stored = store.put(picture(1))
+    store.put(picture(2, fmt="PNG"))
+
+    similar = store.find_similar(perceptual_hash(picture(1, size=(640, 480), quality=50)))
+    assert similar["sha256"] == stored["sha256"]
+    assert store.find_similar(perceptual_hash(picture(3))) is None
+    assert store.find_similar(stored["phash"] ^ 0b111, max_distance=2) is None
+
+
+def test_records_whose_file_was_deleted_are_dropped(store):
+    record = store.put(picture(1), source_url="https://a.example/1.jpg")
+    os.remove(record["path"])
+
+    assert store.lookup_url("https://a.example/1.jpg") is None
+    assert store.find_similar(record["phash"]) is None
+    assert store.stats()["images"] == 0
+
+
+def test_index_survives_a_restart(tmp_path):
+    paths = (str(tmp_path / "images"), str(tmp_path / "index.sqlite3"))
+    store = ImageStore(*paths)
+    record = store.put(picture(1), source_url="https://a.example/1.jpg")
+    store.close()
+
+    store = ImageStore(*paths)
+    try:
+        assert store.find_similar(record["phash"])["sha256"] == record["sha256"]
+        assert store.lookup_url("https://a.example/1.jpg")["path"] == record["path"]
+    finally:
+        store.close()
+
+
+@pytest.fixture
+def scraper(store, monkeypatch, tmp_path):
+    from bingimage import BingImageScraper
+
+    monkeypatch.chdir(tmp_path)  # The search cache is opened relative to the working directory
+    scraper = BingImageScraper()
+    scraper._image_store = store
+    images = {}
+    fetched = []
+
+    def fetch_image(url, cancel_event=None):
+        fetched.append(url)
+        return images.get(url)
+
+    monkeypatch.setattr(scraper, "search_images", lambda query, count: list(images))
+    monkeypatch.setattr(scraper, "fetch_image", fetch_image)
+    scraper.images = images
+    scraper.fetched = fetched
+    yield scraper
+    scraper._image_store = None
+    scraper.close()
+
+
+def test_downloads_skip_near_duplicates_within_a_post(scraper):
+    scraper.images.update({
+        "https://a.example/1.jpg": picture(1),
+        "https://b.example/1-large.jpg": picture(1, size=(800, 600), quality=70),
+        "https://c.example/2.jpg": picture(2),
+    })
+    paths = scraper.download_images("query", max_images=3, concurrency=1)
+
+    assert len(paths) == 2
+    assert scraper.image_store.stats()["images"] == 2
+
+
+def test_images_stored_by_earlier_posts_are_not_reused_or_refetched(scraper):
+    scraper.images["https://a.example/1.jpg"] = picture(1)
+    first = scraper.download_images("query", max_images=1)
+    assert len(first) == 1
+
+    scraper.fetched.clear()
+    assert scraper.download_images("query", max_images=1) == []
+    assert scraper.fetched == []  # Known URL, served from the index
+    assert scraper.download_images("query", max_images=1, reuse=True) == first
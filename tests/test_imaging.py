@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from PIL import Image
+
+from imaging import ImageProbe, sniff_format
+
+
+def encode(fmt, size=(640, 480)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 80, 40)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def probe(data, chunk_size=512, **options):
+    """Stream ``data`` through a probe; returns (probe, abort reason or None)."""
+    image_probe = ImageProbe(**options)
+    for start in range(0, len(data), chunk_size):
+        reason = image_probe.feed(data[start:start + chunk_size])
+        if reason or image_probe.done:
+            return image_probe, reason
+    return image_probe, image_probe.finish()
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG", "GIF", "BMP", "WEBP"])
+def test_formats_are_recognized_by_magic_bytes(fmt):
+    data = encode(fmt)
+    assert sniff_format(data[:12]) == fmt
+
+    image_probe, reason = probe(data)
+    assert reason is None
+    assert image_probe.format == fmt
+    assert image_probe.size == (640, 480)
+
+
+@pytest.mark.parametrize("body", [
+    b"<!DOCTYPE html><html><body>Not found</body></html>" * 20,
+    b'{"error": "forbidden"}' + b" " * 100,
+    b"\x00" * 64,
+])
+def test_non_images_are_rejected_from_the_first_bytes(body):
+    image_probe = ImageProbe()
+    assert "not an image" in image_probe.feed(body[:16])
+    assert image_probe.received == 16
+
+
+def test_body_split_inside_the_magic_bytes_is_still_sniffed():
+    data = encode("PNG")
+    image_probe, reason = probe(data, chunk_size=3)
+    assert reason is None
+    assert image_probe.format == "PNG"
+
+
+def test_short_bodies_are_checked_when_the_download_ends():
+    assert "not an image" in probe(b"oops")[1]
+    assert probe(b"\xff\xd8\xff\xe0")[1] is None
+
+
+def test_downloads_over_max_bytes_are_aborted():
+    data = encode("PNG", (800, 800))
+    image_probe = ImageProbe(max_bytes=1000)
+    reasons = [image_probe.feed(data[start:start + 400]) for start in range(0, 1200, 400)]
+    assert reasons[:2] == [None, None]
+    assert "larger than 1000 bytes" in reasons[2]
+
+
+def test_images_below_min_size_are_rejected_from_the_header():
+    data = encode("JPEG", (200, 150))
+    image_probe, reason = probe(data, min_size=(300, 200))
+    assert reason == "too small (200x150)"
+    assert image_probe.received < len(data)
+
+
+def test_probe_gives_up_on_the_size_after_header_bytes():
+    data = b"\xff\xd8\xff" + b"\x00" * 5000  # JPEG magic, but no readable header
+    image_probe, reason = probe(data, header_bytes=1024)
+    assert reason is None
+    assert image_probe.format == "JPEG"
+    assert image_probe.size is None
+    assert image_probe.done
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(workers=1, history=50)
+    yield queue
+    queue.shutdown(wait=True)
+
+
+def wait_until_finished(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.status in (DONE, FAILED, CANCELLED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} still {queue.get(job_id).status}")
+
+
+def blocked_job(started, release):
+    """A job function that reports progress, then waits for ``release``."""
+
+    def run(context):
+        context.update("Menulis artikel", 40)
+        context.stream("Draf sebagian")
+        started.set()
+        while not release.wait(0.01):
+            context.check_cancelled()
+        context.update("Selesai", 90)
+        return "hasil"
+
+    return run
+
+
+def test_job_reports_progress_and_result(queue):
+    started, release = threading.Event(), threading.Event()
+    job_id = queue.submit("Artikel", blocked_job(started, release))
+    assert started.wait(5)
+
+    running = queue.get(job_id)
+    assert (running.status, running.stage, running.progress, running.partial) == (
+        RUNNING, "Menulis artikel", 40, "Draf sebagian"
+    )
+
+    release.set()
+    job = wait_until_finished(queue, job_id)
+    assert (job.status, job.result, job.progress, job.partial) == (DONE, "hasil", 100, "")
+    assert job.elapsed >= 0
+
+
+def test_failures_and_warnings_are_recorded(queue):
+    def run(context):
+        context.warn("Gambar tidak ditemukan")
+        raise ValueError("kunci API tidak valid")
+
+    job = wait_until_finished(queue, queue.submit("Gagal", run))
+    assert job.status == FAILED
+    assert job.error == "kunci API tidak valid"
+    assert job.warnings == ["Gambar tidak ditemukan"]
+
+
+def test_snapshots_are_not_live(queue):
+    started, release = threading.Event(), threading.Event()
+    job_id = queue.submit("Artikel", blocked_job(started, release))
+    assert started.wait(5)
+
+    snapshot = queue.get(job_id)
+    snapshot.warnings.append("diubah")
+    snapshot.progress = 0
+    assert queue.get(job_id).warnings == []
+    assert queue.get(job_id).progress == 40
+    release.set()
+
+
+def test_cancelling_a_running_job_stops_it_at_its_next_check(queue):
+    started, release = threading.Event(), threading.Event()
+    job_id = queue.submit("Artikel", blocked_job(started, release))
+    assert started.wait(5)
+
+    assert queue.cancel(job_id)
+    job = wait_until_finished(queue, job_id)
+    assert job.status == CANCELLED
+    assert job.result is None
+    assert not queue.cancel(job_id)  # Already finished
+
+
+def test_cancelled_queued_jobs_never_start(queue):
+    started, release = threading.Event(), threading.Event()
+    blocker = queue.submit("Pertama", blocked_job(started, release))
+    assert started.wait(5)
+    ran = []
+    waiting = queue.submit("Kedua", lambda context: ran.append(True))
+    assert queue.get(waiting).status == QUEUED
+
+    assert queue.cancel(waiting)
+    assert queue.get(waiting).status == CANCELLED
+    release.set()
+    wait_until_finished(queue, blocker)
+    queue.shutdown(wait=True)
+    assert ran == []
+
+
+def test_stats_list_and_history(queue):
+    queue.history = 2
+    for i in range(3):
+        queue.submit(f"Job {i}", lambda context, i=i: i)
+    wait_until_finished(queue, queue.submit("Job 3", lambda context: 3))  # One worker: runs last
+
+    assert [job.label for job in queue.list()] == ["Job 3", "Job 2"]
+    assert queue.stats()[DONE] == 2
+    assert queue.clear_finished() == 2
+    assert queue.list() == []
+    assert queue.cancel("unknown") is False
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from keypool import ApiKeyPool, KeyPoolExhausted, is_rate_limit_error
+from conftest import StubModel
+
+QUOTA = google_exceptions.ResourceExhausted("Quota exceeded")
+
+
+def test_keys_are_handed_out_round_robin(clock):
+    pool = ApiKeyPool(["a", "b", "c"], requests_per_minute=60)
+    assert [pool.acquire() for _ in range(6)] == ["a", "b", "c", "a", "b", "c"]
+
+
+def test_duplicate_and_empty_keys_are_dropped():
+    assert ApiKeyPool(["a", "", "a", "b"]).keys == ["a", "b"]
+    with pytest.raises(ValueError):
+        ApiKeyPool(["", None])
+
+
+def test_rate_limited_key_is_skipped_until_its_cooldown_ends(clock):
+    pool = ApiKeyPool(["a", "b"], requests_per_minute=60, cooldown=30)
+    assert pool.acquire() == "a"
+    pool.mark_rate_limited("a")
+    assert [pool.acquire() for _ in range(3)] == ["b", "b", "b"]
+
+    clock.advance(30)
+    assert {pool.acquire(), pool.acquire()} == {"a", "b"}
+
+
+def test_cooldown_doubles_on_repeated_limits_and_resets_on_success(clock):
+    pool = ApiKeyPool(["a"], cooldown=10, max_cooldown=25)
+    cooldowns = []
+    for _ in range(3):
+        pool.mark_rate_limited("a")
+        cooldowns.append(pool.stats()[0]["cooling_down"])
+    assert cooldowns == [10, 20, 25]
+
+    pool.mark_success("a")
+    pool.mark_rate_limited("a")
+    assert pool.stats()[0]["cooling_down"] == 10
+
+
+def test_acquire_waits_for_budget_or_gives_up(clock):
+    pool = ApiKeyPool(["a"], requests_per_minute=2)
+    pool.acquire()
+    pool.acquire()
+    assert pool.acquire() == "a"
+    assert clock.slept == pytest.approx(30)
+
+    with pytest.raises(KeyPoolExhausted):
+        pool.acquire(max_wait=5)
+
+
+def test_acquire_async_waits_out_a_cooldown(clock, monkeypatch):
+    async def fake_sleep(seconds):
+        clock.advance(seconds)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    pool = ApiKeyPool(["a"], cooldown=15)
+    pool.mark_rate_limited("a")
+    assert asyncio.run(pool.acquire_async()) == "a"
+
+    pool.mark_rate_limited("a")
+    with pytest.raises(KeyPoolExhausted):
+        asyncio.run(pool.acquire_async(max_wait=1))
+
+
+@pytest.mark.parametrize("error, expected", [
+    (google_exceptions.ResourceExhausted("x"), True),
+    (google_exceptions.TooManyRequests("x"), True),
+    (RuntimeError("429 Too Many Requests"), True),
+    (google_exceptions.ServiceUnavailable("x"), False),
+    (ValueError("bad prompt"), False),
+])
+def test_is_rate_limit_error(error, expected):
+    assert is_rate_limit_error(error) is expected
+
+
+def test_scraper_fails_over_to_the_next_key(stub_scraper):
+    limited, healthy = StubModel(error=QUOTA), StubModel(text="dari kunci b")
+    scraper = stub_scraper({"a": limited, "b": healthy})
+
+    assert scraper._generate("halo", use_cache=False) == "dari kunci b"
+    assert (limited.calls, healthy.calls) == (1, 1)
+    assert scraper.key_pool.stats()[0]["rate_limited"] == 1
+    # The cooling key is skipped on the next call
+    scraper._generate("lagi", use_cache=False)
+    assert (limited.calls, healthy.calls) == (1, 2)
+
+
+def test_scraper_async_fails_over_to_the_next_key(stub_scraper):
+    limited, healthy = StubModel(error=QUOTA), StubModel(text="async b")
+    scraper = stub_scraper({"a": limited, "b": healthy})
+    text = asyncio.run(scraper._generate_async("halo", scraper.models, use_cache=False))
+    assert text == "async b"
+    assert (limited.calls, healthy.calls) == (1, 1)
+
+
+def test_other_errors_are_not_failed_over(stub_scraper):
+    broken, healthy = StubModel(error=google_exceptions.InvalidArgument("bad")), StubModel()
+    scraper = stub_scraper({"a": broken, "b": healthy})
+    with pytest.raises(google_exceptions.InvalidArgument):
+        scraper._generate("halo", use_cache=False)
+    assert healthy.calls == 0
@@ -0,0 +1,94 @@
+from google.api_core import exceptions as google_exceptions
+
+import metrics
+from metrics import MetricsRegistry
+from conftest import StubModel
+
+
+def value(counter, **labels):
+    """Current value of ``counter`` for exactly ``labels``, 0 if never incremented."""
+    return next((v for l, v in counter.samples() if l == labels), 0)
+
+
+def test_counters_aggregate_per_label_set_regardless_of_order():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.")
+    requests.inc(model="m", kind="title")
+    requests.inc(2, kind="title", model="m")
+    requests.inc(kind="article", model="m")
+
+    assert value(requests, model="m", kind="title") == 3
+    assert value(requests, model="m", kind="article") == 1
+
+
+def test_registering_a_name_twice_returns_the_same_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("requests_total", "Requests.")
+    assert registry.counter("requests_total", "Requests.") is first
+
+
+def test_prometheus_export_of_counters():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests by outcome.").inc(outcome="success", model="m")
+
+    assert registry.to_prometheus() == (
+        "# HELP requests_total Requests by outcome.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{model="m",outcome="success"} 1\n'
+    )
+
+
+def test_prometheus_export_of_histograms_has_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", (0.5, 1, 2.5))
+    for seconds in (0.2, 0.5, 0.7, 3):
+        latency.observe(seconds, kind="title")
+
+    lines = registry.to_prometheus().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{kind="title",le="0.5"} 2',
+        'latency_seconds_bucket{kind="title",le="1"} 3',
+        'latency_seconds_bucket{kind="title",le="2.5"} 3',
+        'latency_seconds_bucket{kind="title",le="+Inf"} 4',
+        'latency_seconds_sum{kind="title"} 4.4',
+        'latency_seconds_count{kind="title"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors.").inc(reason='bad "quote"\\path\nnext')
+    assert 'errors_total{reason="bad \\"quote\\"\\\\path\\nnext"} 1' in registry.to_prometheus()
+
+
+class Usage:
+    prompt_token_count = 120
+    candidates_token_count = 480
+
+
+def test_record_model_call_counts_requests_latency_and_tokens():
+    labels = {"model": "test-model", "kind": "metrics-test"}
+    before = value(metrics.tokens_total, direction="output", **labels)
+
+    metrics.record_model_call("test-model", "metrics-test", "success", 0.3, Usage())
+    metrics.record_model_call("test-model", "metrics-test", "error", 1.2)
+
+    assert value(metrics.model_requests, outcome="success", **labels) >= 1
+    assert value(metrics.model_requests, outcome="error", **labels) >= 1
+    assert value(metrics.tokens_total, direction="output", **labels) == before + 480
+    assert "gemini_request_latency_seconds_bucket{" in metrics.registry.to_prometheus()
+
+
+def test_model_calls_are_recorded_by_outcome(stub_scraper):
+    quota = google_exceptions.ResourceExhausted("Quota exceeded")
+    scraper = stub_scraper({"a": StubModel(error=quota), "b": StubModel(text="ok")})
+    labels = {"model": scraper.model_name, "kind": "metrics-outcome"}
+    before = {
+        outcome: value(metrics.model_requests, outcome=outcome, **labels)
+        for outcome in ("success", "rate_limited")
+    }
+
+    assert scraper._generate("prompt", use_cache=False, kind="metrics-outcome") == "ok"
+    assert value(metrics.model_requests, outcome="rate_limited", **labels) == before["rate_limited"] + 1
+    assert value(metrics.model_requests, outcome="success", **labels) == before["success"] + 1
@@ -0,0 +1,124 @@
+import pytest
+
+from post_store import PostStore
+
+
+def make_post(i, **fields):
+    post = {
+        "id": f"post-{i}",
+        "title": f"Judul {i}",
+        "author": "ani" if i % 2 else "budi",
+        "date": f"2024-01-{1 + i % 28:02d}",
+        "excerpt": f"Ringkasan {i}",
+        "content": f"Isi {i}",
+        "language": "id" if i % 3 else "en",
+        "tags": [f"tag{i % 4}"],
+    }
+    post.update(fields)
+    return post
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostStore(str(tmp_path / "posts.sqlite3"))
+    yield store
+    store.close()
+
+
+def ids(posts):
+    return [post["id"] for post in posts]
+
+
+def all_pages(store, limit, **filters):
+    """Walk every page by cursor."""
+    seen, cursor = [], None
+    while True:
+        posts, cursor = store.page(cursor, limit, **filters)
+        seen += ids(posts)
+        if cursor is None:
+            return seen
+
+
+def test_round_trip_keeps_extra_fields(store):
+    store.save(make_post(1, custom={"a": 1}))
+    post = store.get("post-1")
+    assert post["tags"] == ["tag1"] and post["custom"] == {"a": 1}
+    assert "generated_by" not in post  # Fields the post never had stay absent
+
+
+def test_save_updates_but_add_never_overwrites(store):
+    store.save(make_post(1))
+    store.save(make_post(1, title="Baru"))
+    assert store.get("post-1")["title"] == "Baru"
+
+    assert store.add(make_post(1, title="Ditimpa")) is False
+    assert store.get("post-1")["title"] == "Baru"
+    assert store.add(make_post(2)) is True
+
+
+def test_unique_id_appends_a_free_suffix(store):
+    store.save_many([make_post(1), make_post(1, id="post-1-2")])
+    assert store.unique_id("post-1") == "post-1-3"
+    assert store.unique_id("post-9") == "post-9"
+
+
+def test_list_is_newest_first_without_content(store):
+    store.save_many([make_post(i) for i in range(5)])
+    posts = store.list(limit=3)
+    assert ids(posts) == ["post-4", "post-3", "post-2"]
+    assert "content" not in posts[0]
+    assert "content" in store.list(limit=1, with_content=True)[0]
+
+
+def test_same_date_posts_are_ordered_by_insertion(store):
+    store.save_many([make_post(i, date="2024-05-01") for i in range(3)])
+    assert ids(store.list()) == ["post-2", "post-1", "post-0"]
+
+
+def test_filters_count_and_distinct(store):
+    store.save_many([make_post(i) for i in range(12)])
+    assert store.count() == 12
+    assert store.count(author="ani") == 6
+    assert store.count(author="ani", language="en") == 2
+    assert all(post["author"] == "ani" for post in store.list(limit=None, author="ani"))
+    # Empty filter values mean "no filter"
+    assert store.count(author="", language=None) == 12
+    assert store.distinct("language") == ["en", "id"]
+    with pytest.raises(ValueError):
+        store.distinct("title")
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 40])
+@pytest.mark.parametrize("filters", [{}, {"author": "ani"}, {"author": "budi", "language": "id"}])
+def test_cursor_pages_cover_every_post_once(store, limit, filters):
+    store.save_many([make_post(i) for i in range(30)])
+    assert all_pages(store, limit, **filters) == ids(store.list(limit=None, **filters))
+
+
+def test_posts_without_a_date_come_last_across_pages(store):
+    store.save_many([make_post(i, date=None if i % 4 == 0 else "2024-02-01") for i in range(10)])
+    expected = ["post-9", "post-7", "post-6", "post-5", "post-3", "post-2", "post-1", "post-8", "post-4", "post-0"]
+    assert ids(store.list(limit=None)) == expected
+    assert all_pages(store, 3) == expected
+
+
+def test_last_page_has_no_cursor(store):
+    store.save_many([make_post(i) for i in range(5)])
+    first, cursor = store.page(None, 3)
+    rest, end = store.page(cursor, 3)
+    assert ids(first + rest) == ids(store.list(limit=None)) and end is None
+
+
+def test_pages_stay_stable_when_newer_posts_arrive(store):
+    store.save_many([make_post(i) for i in range(6)])
+    first, cursor = store.page(None, 3)
+    store.save(make_post(27))  # Newer than everything
+    assert ids(store.page(cursor, 3)[0]) == ["post-2", "post-1", "post-0"]
+
+
+def test_delete_and_replace_all(store):
+    store.save_many([make_post(i) for i in range(3)])
+    assert store.delete("post-1") is True
+    assert store.delete("post-1") is False
+    store.replace_all([make_post(7)])
+    assert ids(store.all()) == ["post-7"]
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from ratelimit import HostRateLimiter, RateLimitTimeout, TokenBucket
+
+
+def host_stats(limiter, host):
+    return next(s for s in limiter.stats() if s["host"] == host)
+
+
+def test_token_bucket_allows_a_burst_then_refills(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.advance(0.5)
+    assert bucket.try_acquire() == 0
+
+
+def test_hosts_are_limited_independently(clock):
+    limiter = HostRateLimiter(rate=1, burst=2)
+    for _ in range(2):
+        limiter.acquire("https://a.example/1.jpg")
+    limiter.acquire("https://b.example/1.jpg")
+    assert clock.slept == 0
+
+    limiter.acquire("https://a.example/2.jpg")
+    assert clock.slept == pytest.approx(1.0)
+    assert host_stats(limiter, "a.example")["requests"] == 3
+
+
+def test_per_host_rates_override_the_default(clock):
+    limiter = HostRateLimiter(rate=1, burst=1, host_rates={"fast.example": 4})
+    limiter.acquire("https://fast.example/a")
+    limiter.acquire("https://fast.example/b")
+    assert clock.slept == pytest.approx(0.25)
+
+
+def test_acquire_gives_up_after_max_wait(clock):
+    limiter = HostRateLimiter(rate=0.5, burst=1)
+    limiter.acquire("https://a.example/1")
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("https://a.example/2", max_wait=1)
+    assert clock.slept == 0
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_throttling_halves_the_rate_and_cools_the_host_down(clock, status):
+    limiter = HostRateLimiter(rate=4, burst=4, cooldown=2)
+    url = "https://a.example/img.jpg"
+    limiter.acquire(url)
+    limiter.record(url, status)
+    stats = host_stats(limiter, "a.example")
+    assert stats["rate"] == 2
+    assert stats["cooling_down"] == 2
+    assert stats["throttled"] == 1
+
+    limiter.acquire(url)
+    assert clock.slept == pytest.approx(2)
+
+
+def test_repeated_throttles_double_the_cooldown_up_to_the_cap(clock):
+    limiter = HostRateLimiter(rate=4, cooldown=2, max_cooldown=5, min_rate=1)
+    url = "https://a.example/"
+    cooldowns = []
+    for _ in range(3):
+        limiter.record(url, 429)
+        cooldowns.append(host_stats(limiter, "a.example")["cooling_down"])
+    assert cooldowns == [2, 4, 5]
+    assert host_stats(limiter, "a.example")["rate"] == 1  # Never below min_rate
+
+
+def test_retry_after_extends_the_cooldown(clock):
+    limiter = HostRateLimiter(cooldown=2)
+    limiter.record("https://a.example/", 429, retry_after="30")
+    assert host_stats(limiter, "a.example")["cooling_down"] == 30
+
+    limiter.record("https://b.example/", 429, retry_after="Wed, 21 Oct 2026 07:28:00 GMT")
+    assert host_stats(limiter, "b.example")["cooling_down"] == 2
+
+
+def test_successes_restore_the_rate_in_steps(clock):
+    limiter = HostRateLimiter(rate=10)
+    url = "https://a.example/"
+    limiter.record(url, 429)
+    rates = []
+    for _ in range(7):
+        limiter.record(url, 200)
+        rates.append(host_stats(limiter, "a.example")["rate"])
+    assert rates == pytest.approx([6, 7, 8, 9, 10, 10, 10])
+
+
+def test_client_errors_leave_the_rate_alone(clock):
+    limiter = HostRateLimiter(rate=4)
+    limiter.record("https://a.example/", 404)
+    assert host_stats(limiter, "a.example")["rate"] == 4
+    assert host_stats(limiter, "a.example")["throttled"] == 0
+
+
+def test_slots_cap_concurrent_requests_across_hosts():
+    limiter = HostRateLimiter(rate=100, burst=100, max_concurrency=2)
+    with limiter.slot("https://a.example/1"), limiter.slot("https://b.example/1"):
+        with pytest.raises(RateLimitTimeout):
+            with limiter.slot("https://c.example/1", max_wait=0.05):
+                pass
+
+    entered = threading.Event()
+
+    def worker():
+        with limiter.slot("https://c.example/2", max_wait=1):
+            entered.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join(2)
+    assert entered.is_set()
@@ -0,0 +1,67 @@
+import markdown
+
+from render import MarkdownRenderer
+
+
+def html_size(content):
+    return len(markdown.markdown(content).encode("utf-8"))
+
+
+def test_each_document_is_converted_once(monkeypatch):
+    renderer = MarkdownRenderer()
+    conversions = []
+    original = markdown.markdown
+    monkeypatch.setattr(markdown, "markdown", lambda text, **kw: conversions.append(text) or original(text, **kw))
+
+    first = renderer.render("# Judul\n\nIsi **tebal**.")
+    assert renderer.render("# Judul\n\nIsi **tebal**.") == first
+    assert "<strong>tebal</strong>" in first
+    assert conversions == ["# Judul\n\nIsi **tebal**."]
+    assert renderer.stats()["hits"] == 1
+    assert renderer.stats()["misses"] == 1
+
+
+def test_edited_content_is_rendered_again():
+    renderer = MarkdownRenderer()
+    assert renderer.render("versi *satu*") != renderer.render("versi *dua*")
+    assert renderer.stats()["misses"] == 2
+
+
+def test_empty_content_renders_to_nothing():
+    renderer = MarkdownRenderer()
+    assert renderer.render("") == ""
+    assert renderer.render(None) == ""
+    assert renderer.stats()["entries"] == 0
+
+
+def test_least_recently_used_documents_are_evicted_past_max_bytes():
+    docs = [f"Dokumen {i}" for i in range(3)]
+    renderer = MarkdownRenderer(max_bytes=2 * html_size(docs[0]))
+    renderer.render(docs[0])
+    renderer.render(docs[1])
+    renderer.render(docs[0])  # Now most recently used
+    renderer.render(docs[2])  # Evicts docs[1]
+
+    stats = renderer.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= renderer.max_bytes
+
+    renderer.render(docs[0])
+    assert renderer.stats()["hits"] == stats["hits"] + 1
+    renderer.render(docs[1])
+    assert renderer.stats()["misses"] == stats["misses"] + 1
+
+
+def test_documents_larger_than_the_cache_are_not_kept():
+    renderer = MarkdownRenderer(max_bytes=64)
+    html = renderer.render("panjang " * 50)
+    assert html.startswith("<p>panjang")
+    assert renderer.stats()["entries"] == 0
+
+
+def test_clear_resets_entries_and_counters():
+    renderer = MarkdownRenderer()
+    renderer.render("a")
+    renderer.render("a")
+    renderer.clear()
+    assert renderer.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
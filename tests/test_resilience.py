@@ -0,0 +1,218 @@
+import asyncio
+import threading
+
+import grpc
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import resilience
+from resilience import Resilience, RetryPolicy, is_retryable_error
+from conftest import FakeClock
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+
+def flaky(errors, result="ok"):
+    """An attempt function that raises each of ``errors`` in turn, then returns ``result``."""
+    errors = list(errors)
+    timeouts = []
+
+    def fn(timeout):
+        timeouts.append(timeout)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    fn.timeouts = timeouts
+    return fn
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (google_exceptions.ServiceUnavailable("down"), True),
+    (google_exceptions.DeadlineExceeded("slow"), True),
+    (TimeoutError(), True),
+    (ConnectionError(), True),
+    (google_exceptions.ResourceExhausted("quota"), False),
+    (google_exceptions.TooManyRequests("slow down"), False),
+    (google_exceptions.InvalidArgument("bad prompt"), False),
+    (ValueError("503 in the prompt text"), False),
+    (RuntimeError("Service Unavailable"), False),
+])
+def test_errors_are_classified_by_type_not_message(error, retryable):
+    assert is_retryable_error(error) is retryable
+
+
+def test_status_codes_on_unknown_errors_are_honoured():
+    http = RuntimeError()
+    http.code = 502
+    assert is_retryable_error(http)
+
+    grpc_error = RuntimeError()
+    grpc_error.grpc_status_code = grpc.StatusCode.UNAVAILABLE
+    assert is_retryable_error(grpc_error)
+
+    client_error = RuntimeError()
+    client_error.code = 400
+    assert not is_retryable_error(client_error)
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    for attempt in range(8):
+        delays = [policy.backoff(attempt) for _ in range(50)]
+        assert all(0 <= d <= min(5.0, 2 ** attempt) for d in delays)
+    assert len({round(policy.backoff(3), 6) for _ in range(20)}) > 1
+
+
+def test_transient_errors_are_retried_with_backoff(fake_time):
+    res = Resilience(RetryPolicy(deadline=12, max_retries=3, base_delay=1, max_delay=4))
+    fn = flaky([google_exceptions.ServiceUnavailable("down")] * 2)
+
+    assert res.call(fn) == "ok"
+    assert fn.timeouts == [12, 12, 12]  # Every attempt gets the per-attempt deadline
+    assert 0 <= fake_time.slept <= 1 + 2
+    assert res.stats()["retries"] == 2
+    assert res.stats()["failures"] == 0
+
+
+def test_retries_stop_after_max_retries(fake_time):
+    res = Resilience(RetryPolicy(max_retries=2))
+    fn = flaky([google_exceptions.InternalServerError("boom")] * 5)
+
+    with pytest.raises(google_exceptions.InternalServerError):
+        res.call(fn)
+    assert len(fn.timeouts) == 3
+    assert res.stats()["failures"] == 1
+
+
+def test_permanent_and_rate_limit_errors_are_not_retried(fake_time):
+    res = Resilience(RetryPolicy(max_retries=3))
+    for error in (google_exceptions.InvalidArgument("bad"), google_exceptions.ResourceExhausted("quota")):
+        fn = flaky([error])
+        with pytest.raises(type(error)):
+            res.call(fn)
+        assert len(fn.timeouts) == 1
+    assert fake_time.slept == 0
+    assert res.stats()["retries"] == 0
+
+
+def test_async_attempts_are_cut_off_at_the_deadline():
+    res = Resilience(RetryPolicy(deadline=0.05, max_retries=1, base_delay=0))
+    attempts = []
+
+    async def hang(timeout):
+        attempts.append(timeout)
+        await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(res.call_async(hang))
+    assert attempts == [0.05, 0.05]
+    assert res.stats()["retries"] == 1
+
+
+def hedging(**options):
+    """A Resilience that hedges after a 10ms p95 from the first call on."""
+    res = Resilience(RetryPolicy(hedge=True, hedge_min_samples=1, hedge_budget=1.0, **options))
+    res.latency.record("default", 0.01)
+    return res
+
+
+def test_no_hedge_before_enough_latency_samples():
+    res = Resilience(RetryPolicy(hedge=True, hedge_min_samples=20, hedge_budget=1.0))
+    res.counters.update(calls=1)
+    for _ in range(19):
+        res.latency.record("default", 0.01)
+    assert res._hedge_after("default", None) is None
+    res.latency.record("default", 0.01)
+    assert res._hedge_after("default", None) == 0.01
+
+
+def test_slow_primary_is_beaten_by_the_hedge():
+    res = hedging()
+    release = threading.Event()
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            release.wait(5)
+            return "primary"
+        return "backup"
+
+    try:
+        assert res.call(fn) == "backup"
+        assert res.stats()["hedges"] == 1
+        assert res.stats()["hedge_wins"] == 1
+    finally:
+        release.set()
+
+
+def test_fast_primary_fires_no_hedge():
+    res = hedging()
+    assert res.call(lambda timeout: "fast") == "fast"
+    assert res.stats()["hedges"] == 0
+
+
+def test_hedges_stay_within_the_budget():
+    res = hedging()
+    res.policy.hedge_budget = 0.5
+    res.counters.update(calls=10, hedges=5)
+    assert res._hedge_after("default", None) is None
+
+    res.counters.update(calls=11)
+    assert res._hedge_after("default", None) == 0.01
+
+
+def test_no_hedge_while_losers_are_still_running():
+    res = hedging(max_stragglers=1)
+    release = threading.Event()
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            release.wait(5)
+            return "stuck"
+        if len(calls) == 3:
+            threading.Event().wait(0.05)  # Slower than the p95, would normally be hedged
+            return "slow"
+        return "backup"
+
+    try:
+        assert res.call(fn) == "backup"  # Hedged; the first attempt is left running
+        assert res._stragglers == 1
+        assert res.call(fn) == "slow"  # Waits out its own attempt instead of hedging
+        assert res.stats()["hedges"] == 1
+    finally:
+        release.set()
+    res._executor.shutdown(wait=True)
+    assert res._stragglers == 0
+
+
+def test_async_hedge_cancels_the_loser():
+    res = hedging()
+    cancelled = []
+
+    async def fn(timeout):
+        if not cancelled:
+            cancelled.append(False)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled[0] = True
+                raise
+        return "backup"
+
+    async def run():
+        result = await res.call_async(fn)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "backup"
+    assert cancelled == [True]
+    assert res.stats()["hedge_wins"] == 1
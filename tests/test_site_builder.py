@@ -0,0 +1,66 @@
+import pytest
+
+from site_builder import HOME_ROUTE, NOT_FOUND_ROUTE, SiteBuilder
+
+HOSTILE = '<script>alert("x")</script>'
+
+
+def post(**fields):
+    return {
+        "id": "halo-dunia",
+        "title": "Halo Dunia",
+        "date": "2026-01-02",
+        "author": "Admin",
+        "excerpt": "Ringkasan",
+        "content": "# Halo\n\nIsi **post**.",
+        **fields,
+    }
+
+
+@pytest.fixture
+def builder():
+    return SiteBuilder()
+
+
+def test_every_route_is_built(builder):
+    pages = builder.build([
+        post(category="Teknologi", tags=["Python", "AI"]),
+        post(id="kedua", title="Kedua", date="2026-02-01", category="Teknologi"),
+    ])
+    assert set(pages) == {
+        HOME_ROUTE, NOT_FOUND_ROUTE, "/post/halo-dunia", "/post/kedua",
+        "/category/teknologi", "/tag/python", "/tag/ai",
+    }
+    assert pages[HOME_ROUTE].index("Kedua") < pages[HOME_ROUTE].index("Halo Dunia")  # Newest first
+    assert "Kategori · 2 post" in pages["/category/teknologi"]
+    assert "<strong>post</strong>" in pages["/post/halo-dunia"]
+
+
+def test_post_fields_are_escaped(builder):
+    pages = builder.build([post(
+        title=HOSTILE, author=HOSTILE, date=HOSTILE, excerpt=HOSTILE,
+        category=f"Kategori {HOSTILE}", tags=[f"tag {HOSTILE}"],
+    )])
+    for route, page in pages.items():
+        assert HOSTILE not in page, route
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in pages[HOME_ROUTE]
+    assert "<title>&lt;script&gt;" in pages["/post/halo-dunia"]
+
+
+def test_blog_title_is_escaped():
+    pages = SiteBuilder(title="A & B <Blog>", subtitle='"Kutipan"').build([])
+    assert "<title>A &amp; B &lt;Blog&gt;</title>" in pages[HOME_ROUTE]
+    assert "&quot;Kutipan&quot;" in pages[HOME_ROUTE]
+
+
+def test_links_are_percent_encoded_and_attribute_safe(builder):
+    pages = builder.build([post(id='a"b c<d>')])
+    assert '/post/a"b c<d>' in pages  # Routes stay raw; only the links are encoded
+    assert 'href="/post/a%22b%20c%3Cd%3E"' in pages[HOME_ROUTE]
+
+
+def test_posts_without_optional_fields_still_render(builder):
+    bare = {"id": "tanpa-apa-apa", "content": "Isi"}
+    pages = builder.build([bare, post(category="!!!", tags=["", "???"])])
+    assert "/post/tanpa-apa-apa" in pages
+    assert not any(route.startswith(("/category/", "/tag/")) for route in pages)
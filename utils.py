@@ -4,9 +4,14 @@ Utility functions for the blog system.
 
 import re
 import os
+import html
 import logging
-from urllib.parse import urlparse
-from typing import List, Optional
+from urllib.parse import urlparse, quote
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rendered width of images in the post column
+IMAGE_SIZES = "(max-width: 600px) 100vw, 600px"
+IMAGE_STYLE = "width: 100%; max-width: 600px; height: auto; border-radius: 8px; margin: 1.5rem 0; box-shadow: 0 4px 8px rgba(0,0,0,0.1);"
 
 def clean_filename(filename: str) -> str:
     """Clean filename for safe file operations."""
@@ -71,6 +76,76 @@ def extract_excerpt_from_content(content: str, max_length: int = 200) -> str:
     
     return excerpt.strip() or clean_content[:max_length] + "..."
 
+def split_title_from_markdown(content: str, default_title: str) -> Tuple[str, str]:
+    """Split generated markdown into (title, body) using its first heading or short line."""
+    lines = content.split('\n')
+    title = default_title
+    content_start = 0
+    
+    for i, line in enumerate(lines):
+        if line.strip():
+            # Check if it's a heading
+            if line.startswith('#'):
+                title = line.replace('#', '').strip()
+                content_start = i + 1
+                break
+            elif len(line.strip()) < 100:  # Likely a title
+                title = line.strip()
+                content_start = i + 1
+                break
+    
+    # Get content without title
+    return title, '\n'.join(lines[content_start:]).strip()
+
+def responsive_image(description: Dict[str, Any], base_url: str, images_dir: str = "images") -> Dict[str, Any]:
+    """Turn a ``write_variants`` description into an image entry with public srcset URLs."""
+    def url(path: str) -> str:
+        relative = os.path.relpath(path, images_dir).replace(os.sep, '/')
+        return f"{base_url.rstrip('/')}/{quote(relative)}"
+    
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for variant in description["variants"]:
+        by_type.setdefault(variant["type"], []).append(variant)
+    
+    sources = [
+        {"type": mime, "srcset": ", ".join(f"{url(v['path'])} {v['width']}w" for v in variants)}
+        for mime, variants in by_type.items()
+    ]
+    # The last format (JPEG) is the fallback every browser understands
+    fallback = sorted(by_type[sources[-1]["type"]], key=lambda v: v["width"])
+    return {
+        "src": url(fallback[-1]["path"]),
+        "width": description["width"],
+        "height": description["height"],
+        "srcset": sources[-1]["srcset"],
+        "sources": sources[:-1],
+    }
+
+def build_image_html(image: Any, alt: str) -> str:
+    """
+    Build lazy-loaded ``<img>`` (or ``<picture>``) markup for a post image.
+    
+    ``image`` is either a URL or a dict with ``src`` and optionally ``width``,
+    ``height``, ``srcset`` and ``sources`` (extra formats such as WebP).
+    """
+    if isinstance(image, str):
+        image = {"src": image}
+    attrs = [f'src="{html.escape(image["src"])}"', f'alt="{html.escape(alt)}"']
+    if image.get("srcset"):
+        attrs += [f'srcset="{html.escape(image["srcset"])}"', f'sizes="{IMAGE_SIZES}"']
+    if image.get("width") and image.get("height"):
+        attrs += [f'width="{int(image["width"])}"', f'height="{int(image["height"])}"']
+    attrs += ['loading="lazy"', 'decoding="async"', f'style="{IMAGE_STYLE}"']
+    img = f'<img {" ".join(attrs)}>'
+    
+    if not image.get("sources"):
+        return img
+    sources = "".join(
+        f'<source type="{source["type"]}" srcset="{html.escape(source["srcset"])}" sizes="{IMAGE_SIZES}">'
+        for source in image["sources"]
+    )
+    return f"<picture>{sources}{img}</picture>"
+
 def generate_post_id(title: str) -> str:
     """Generate URL-friendly post ID from title."""
     # Convert to lowercase and replace spaces with hyphens
@@ -0,0 +1,29 @@
+// Blog Worker untuk Cloudflare - halaman dibaca dari Workers KV (binding PAGES)
+// Semua halaman di-render saat build (site_builder.py); script ini tidak pernah berubah.
+//   page:<route>  -> HTML lengkap, mis. page:/, page:/post/<id>, page:/tag/<slug>
+//   manifest      -> route -> hash, dipakai deploy untuk mengunggah yang berubah saja
+
+const HEADERS = { 'Content-Type': 'text/html; charset=utf-8' };
+
+export default {
+  async fetch(request, env) {
+    const route = routeFor(new URL(request.url).pathname);
+    const page = route === null ? null : await env.PAGES.get('page:' + route);
+    if (page !== null) {
+      return new Response(page, { headers: HEADERS });
+    }
+
+    const notFound = await env.PAGES.get('page:/404');
+    return new Response(notFound || '404 Not Found', { status: 404, headers: HEADERS });
+  }
+};
+
+function routeFor(pathname) {
+  let path;
+  try {
+    path = decodeURIComponent(pathname);
+  } catch (e) {
+    return null;
+  }
+  return path.length > 1 ? path.replace(/\/+$/, '') : path;
+}